@@ -1,13 +1,35 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_file
 import requests
-from bs4 import BeautifulSoup
 import json
 import os
 from dotenv import load_dotenv
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
 import google.generativeai as genai
 import base64
-from components.scoringModel import predict_score, train_from_user_data, train_dummy_model
+import copy
+import queue
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from components.htmlParser import make_soup, visible_text
+from components.scoringModel import predict_score, predict_scores, extract_features_from_soup, train_from_user_data, ensure_model, model_version
+from components.siteCrawler import crawl_site, select_representative_pages
+from components.jobQueue import JobManager, validate_callback_url
+from components.observationScorer import load_scorer, blend_scores
+from components.uploadHandling import MAX_REQUEST_BYTES, MAX_UPLOAD_BYTES, UploadTooLarge, read_upload
+from components.admissionControl import AdmissionController, admission_limited
+from components.categoryClassifier import CATEGORY_CONFIDENCE_THRESHOLD, CategoryClassifier, LabelStore
+from components.requestProfiler import RequestProfiler, profiled
+from components.deadline import Deadline, FETCH_TIMEOUT_CAP, call_with_timeout
+from components.sectionCache import SectionCache, split_sections, section_texts, changed_components
+from components.pageChunks import merge_analyses, pack_chunks
+from components.analysisHistory import AnalysisHistory, parse_time
+from components.featureStore import FeatureStore
+from components.similarityIndex import SimilarityIndex, simhash
 
 
 load_dotenv()
@@ -28,14 +50,51 @@ else:
 
 print("Initializing scoring model...")
 try:
-    if os.path.exists("components/score_model.pkl"):
-        os.remove("components/score_model.pkl")
-    train_dummy_model()
-    print("Scoring model created successfully")
+    # Keep a model saved by train_model.py or /train-model; only bootstrap when there is none
+    if ensure_model():
+        print("Scoring model created successfully")
+    else:
+        print("Using the existing scoring model")
 except Exception as e:
     print(f"Error creating scoring model: {str(e)}")
 
+# Site crawl limits; requests may ask for fewer pages but never more than the cap
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", 50))
+CRAWL_MAX_WORKERS = int(os.getenv("CRAWL_MAX_WORKERS", 8))
+CRAWL_LLM_PAGES = int(os.getenv("CRAWL_LLM_PAGES", 3))
+# Page fetches per crawl, counting errors, redirects and duplicates
+CRAWL_MAX_FETCHES = int(os.getenv("CRAWL_MAX_FETCHES", CRAWL_MAX_PAGES * 3))
+
+# Long pages are analyzed in section-aligned chunks when full-page analysis
+# is on (per request with "full_page", or for every request here)
+FULL_PAGE_ANALYSIS = os.getenv("FULL_PAGE_ANALYSIS", "false").lower() in ("1", "true", "yes")
+MAP_REDUCE_CONCURRENCY = int(os.getenv("MAP_REDUCE_CONCURRENCY", 4))
+
+# Reverse proxies in front of the app whose X-Forwarded-For entries are trusted;
+# admission control keys clients on the resulting remote address
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 0))
+
+# Admission control per analysis route; crawls fan out into many fetches
+# and LLM calls, so far fewer of them may run at once
+admission = {
+    "components": AdmissionController("components"),
+    "crawl": AdmissionController("crawl", max_concurrent=2, max_queue=4, client_concurrent=1, client_queue=1),
+    "train-model": AdmissionController("train-model", max_concurrent=2, max_queue=8)
+}
+
+observation_scorer = load_scorer()
+
+request_profiler = RequestProfiler()
+
+# Local category model trained on the labels the LLM has assigned so far
+category_classifier = CategoryClassifier()
+category_labels = LabelStore()
+
 app = Flask(__name__)
+if TRUSTED_PROXY_COUNT:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_COUNT)
+# Werkzeug refuses larger bodies before parsing or spooling any of them
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
 
 # Configure CORS to be more specific in production
 if os.getenv('RAILWAY_ENVIRONMENT') == 'production':
@@ -53,7 +112,8 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "api_key": api_key_status,
-        "environment": os.getenv('RAILWAY_ENVIRONMENT', 'development')
+        "environment": os.getenv('RAILWAY_ENVIRONMENT', 'development'),
+        "admission": {name: controller.stats() for name, controller in admission.items()}
     })
 
 @app.route('/demo-data', methods=['GET', 'POST'])
@@ -129,24 +189,56 @@ def demo_data():
         "website_score": 65.5
     })
 
-def fetch_website_content(url):
+def generate(model, contents, timeout=None):
+    """
+    model.generate_content(contents), raising TimeoutError after timeout seconds
+    
+    The pinned google-generativeai has no per-call timeout option, so the
+    limit is enforced around the call instead of passed to it.
+    """
+    return call_with_timeout(lambda: model.generate_content(contents), timeout)
+
+def fetch_website_content(url, timeout=10):
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10)
+        response = requests.get(url, headers=headers, timeout=timeout)
         response.raise_for_status()
         return response.text
     except Exception as e:
         raise Exception(f"Error fetching website: {str(e)}")
 
-def determine_website_category(content):
-    """Use Gemini API to determine website category."""
+def extract_text_content(html):
+    """Strip scripts and styles and return the visible text of an HTML document"""
+    return extract_text_from_soup(make_soup(html))
+
+def extract_text_from_soup(soup):
+    """Strip scripts and styles from a parsed document (in place) and return its visible text"""
+    return visible_text(soup)
+
+CATEGORY_API_ERROR = "Unknown (API Error)"
+
+def determine_website_category(content, timeout=None):
+    """
+    Determine the website category, locally when the classifier is confident
+    
+    Otherwise Gemini is asked, and its answer is recorded as a training
+    label for the local classifier.
+    """
     if not has_valid_api_key:
         return "Unknown (Demo Mode)"
         
     try:
         limited_content = content[:2000]
+        
+        try:
+            local_category, confidence = category_classifier.predict(limited_content)
+            if local_category and confidence >= CATEGORY_CONFIDENCE_THRESHOLD:
+                return local_category
+        except Exception as e:
+            print(f"Error in local category classifier: {str(e)}")
+        
         model = genai.GenerativeModel('gemini-2.0-flash')
         prompt = f"""
         You are an expert web analyst. Identify the most likely category of this website.
@@ -158,18 +250,74 @@ def determine_website_category(content):
         Return ONLY the category name, nothing else.
         """
         
-        response = model.generate_content(prompt)
+        response = generate(model, prompt, timeout)
         
         category = response.text.strip()
+        
+        try:
+            category_labels.record(limited_content, category)
+        except Exception as e:
+            print(f"Error recording category label: {str(e)}")
         return category
     except Exception as e:
         print(f"Error determining website category: {str(e)}")
-        return "Unknown (API Error)"
+        return CATEGORY_API_ERROR
+
+COMPONENTS = ["cta", "visual_hierarchy", "copy_effectiveness", "trust_signals"]
+
+COMPONENT_INSTRUCTIONS = {
+    "cta": "CTA (Call to Action): Identify all CTAs and evaluate their effectiveness.",
+    "visual_hierarchy": "Visual Hierarchy: Analyze how content is visually prioritized and structured.",
+    "copy_effectiveness": "Copy Effectiveness: Evaluate the quality, clarity and persuasiveness of the text.",
+    "trust_signals": "Trust Signals: Identify elements that build trust (testimonials, certifications, etc)."
+}
 
-def extract_website_components(content, category):
-    """Use Gemini API to extract website components and evaluate them."""
+COMPONENT_LABELS = {
+    "cta": "CTA",
+    "visual_hierarchy": "Visual Hierarchy",
+    "copy_effectiveness": "Copy Effectiveness",
+    "trust_signals": "Trust Signals"
+}
+
+# Generic suggestions returned when the LLM call fails or its answer cannot be parsed
+FALLBACK_SUGGESTIONS = {
+    "cta": {
+        "high_priority": ["Improve CTA visibility", "Make CTA messaging more compelling"],
+        "additional": ["Test different CTA colors"]
+    },
+    "visual_hierarchy": {
+        "high_priority": ["Improve content organization", "Enhance key element visibility"],
+        "additional": ["Add more whitespace between sections"]
+    },
+    "copy_effectiveness": {
+        "high_priority": ["Clarify value proposition", "Make headlines more compelling"],
+        "additional": ["Simplify complex sentences"]
+    },
+    "trust_signals": {
+        "high_priority": ["Add customer testimonials", "Display security badges"],
+        "additional": ["Include company credentials or awards"]
+    }
+}
+
+def select_components(result, components):
+    """Keep only the requested components of an analysis or suggestions dict"""
+    return {key: value for key, value in result.items() if key in components}
+
+def fallback_suggestions(components=None):
+    return copy.deepcopy(select_components(FALLBACK_SUGGESTIONS, components or COMPONENTS))
+
+def extract_website_components(content, category, components=None, timeout=None, part=None):
+    """
+    Use Gemini API to extract website components and evaluate them.
+    
+    components limits the prompt (and the result) to a subset of COMPONENTS;
+    by default all four are analyzed in one call. part is (index, total)
+    when content is one chunk of a longer page; the chunk is sent whole and
+    the LLM is told not to report components missing from it.
+    """
+    components = components or COMPONENTS
     if not has_valid_api_key:
-        return {
+        return select_components({
             "cta": {"observations": [
                 "Multiple CTAs are present but lack visual distinction", 
                 "The primary CTA is not visually prominent enough",
@@ -190,30 +338,37 @@ def extract_website_components(content, category):
                 "Missing trust badges and security indicators",
                 "Social proof elements are insufficient"
             ]}
-        }
+        }, components)
 
     try:
-        limited_content = content[:3000]
+        limited_content = content if part else content[:3000]
         model = genai.GenerativeModel('gemini-2.0-flash')
         
+        if part:
+            scope = (f"This is part {part[0]} of {part[1]} of the page. Only report what appears in this part, "
+                     "and return an empty observations list for a component that does not appear in it.")
+        else:
+            scope = "If any component is missing, note this as well."
+        
+        instructions = "\n        ".join(
+            f"{n}. {COMPONENT_INSTRUCTIONS[component]}" for n, component in enumerate(components, 1)
+        )
+        structure = ",\n            ".join(
+            f'"{component}": {{ "observations": [list of findings as simple strings] }}' for component in components
+        )
+        
         prompt = f"""
         You are an expert web analyst specializing in UX and conversion optimization.
         
         Analyze this {category} website content and extract the following components:
         
-        1. CTA (Call to Action): Identify all CTAs and evaluate their effectiveness.
-        2. Visual Hierarchy: Analyze how content is visually prioritized and structured.
-        3. Copy Effectiveness: Evaluate the quality, clarity and persuasiveness of the text.
-        4. Trust Signals: Identify elements that build trust (testimonials, certifications, etc).
+        {instructions}
         
-        For each category, provide detailed observations. If any component is missing, note this as well.
+        For each category, provide detailed observations. {scope}
         
         Format your response as JSON with the following structure:
         {{
-            "cta": {{ "observations": [list of findings as simple strings] }},
-            "visual_hierarchy": {{ "observations": [list of findings as simple strings] }},
-            "copy_effectiveness": {{ "observations": [list of findings as simple strings] }},
-            "trust_signals": {{ "observations": [list of findings as simple strings] }}
+            {structure}
         }}
         
         Website content:
@@ -222,7 +377,7 @@ def extract_website_components(content, category):
         Respond with ONLY the properly formatted JSON, nothing else. Each observation must be a simple string, not an object.
         """
         
-        response = model.generate_content(prompt)
+        response = generate(model, prompt, timeout)
         
         try:
             analysis = json.loads(response.text)
@@ -234,27 +389,53 @@ def extract_website_components(content, category):
                 json_str = text[start_idx:end_idx]
                 analysis = json.loads(json_str)
             else:
-                analysis = {
+                analysis = select_components({
                     "cta": {"observations": ["Unable to analyze CTAs"]},
                     "visual_hierarchy": {"observations": ["Unable to analyze visual hierarchy"]},
                     "copy_effectiveness": {"observations": ["Unable to analyze copy"]},
                     "trust_signals": {"observations": ["Unable to analyze trust signals"]}
-                }
+                }, components)
                 
         return analysis
     except Exception as e:
         print(f"Error extracting website components: {str(e)}")
-        return {
+        return select_components({
             "cta": {"observations": ["Error analyzing CTAs: API unavailable"]},
             "visual_hierarchy": {"observations": ["Error analyzing visual hierarchy: API unavailable"]},
             "copy_effectiveness": {"observations": ["Error analyzing copy: API unavailable"]},
             "trust_signals": {"observations": ["Error analyzing trust signals: API unavailable"]}
-        }
+        }, components)
+
+def extract_components_map_reduce(chunks, category, components=None, timeout=None):
+    """
+    Analyze every chunk of a long page concurrently and merge the results
+    
+    At most MAP_REDUCE_CONCURRENCY chunk calls run at once, so the latency
+    is about that of one chunk for typical pages.
+    """
+    components = components or COMPONENTS
+    with ThreadPoolExecutor(max_workers=max(1, min(MAP_REDUCE_CONCURRENCY, len(chunks)))) as executor:
+        analyses = list(executor.map(
+            lambda item: extract_website_components(item[1], category, components, timeout, (item[0], len(chunks))),
+            enumerate(chunks, 1)
+        ))
+    return merge_analyses(analyses, components, COMPONENT_LABELS)
 
-def generate_suggestions(analysis, category):
-    """Generate prioritized improvement suggestions based on analysis."""
+def extract_components(content, category, components=None, timeout=None, chunks=None):
+    """Map-reduce over chunks when the page was split into several, otherwise one call on the text"""
+    if chunks and len(chunks) > 1 and has_valid_api_key:
+        return extract_components_map_reduce(chunks, category, components, timeout)
+    return extract_website_components(content, category, components, timeout)
+
+def generate_suggestions(analysis, category, components=None, timeout=None):
+    """
+    Generate prioritized improvement suggestions based on analysis.
+    
+    components limits the suggestions to a subset of COMPONENTS.
+    """
+    components = components or COMPONENTS
     if not has_valid_api_key:
-        return {
+        return select_components({
             "cta": {
                 "high_priority": [
                     "Redesign primary CTA with contrasting colors and increased size",
@@ -295,10 +476,17 @@ def generate_suggestions(analysis, category):
                     "Add social proof elements throughout the site"
                 ]
             }
-        }
+        }, components)
         
     try:
         analysis_json = json.dumps(analysis)
+        labels = ", ".join(COMPONENT_LABELS[component] for component in components)
+        structure = ",\n            ".join(
+            f'''"{component}": {{
+                "high_priority": [2 highest impact suggestions as simple strings],
+                "additional": [remaining suggestions as simple strings]
+            }}''' for component in components
+        )
         
         model = genai.GenerativeModel('gemini-2.0-flash')
         
@@ -309,7 +497,7 @@ def generate_suggestions(analysis, category):
         
         {analysis_json}
         
-        Generate specific, actionable improvement suggestions for each component (CTA, Visual Hierarchy, Copy Effectiveness, Trust Signals).
+        Generate specific, actionable improvement suggestions for each component ({labels}).
         
         For each component:
         1. Provide at least 3 specific suggestions
@@ -318,22 +506,7 @@ def generate_suggestions(analysis, category):
         
         Format your response as JSON with the following structure:
         {{
-            "cta": {{
-                "high_priority": [2 highest impact suggestions as simple strings],
-                "additional": [remaining suggestions as simple strings]
-            }},
-            "visual_hierarchy": {{
-                "high_priority": [2 highest impact suggestions as simple strings],
-                "additional": [remaining suggestions as simple strings]
-            }},
-            "copy_effectiveness": {{
-                "high_priority": [2 highest impact suggestions as simple strings],
-                "additional": [remaining suggestions as simple strings]
-            }},
-            "trust_signals": {{
-                "high_priority": [2 highest impact suggestions as simple strings],
-                "additional": [remaining suggestions as simple strings]
-            }}
+            {structure}
         }}
         
         IMPORTANT: Each suggestion MUST be a simple string, not an object. Do not include impact ratings inside the arrays.
@@ -341,7 +514,7 @@ def generate_suggestions(analysis, category):
         Respond with ONLY the properly formatted JSON, nothing else.
         """
         
-        response = model.generate_content(prompt)
+        response = generate(model, prompt, timeout)
         
         try:
             suggestions = json.loads(response.text)
@@ -353,24 +526,7 @@ def generate_suggestions(analysis, category):
                 json_str = text[start_idx:end_idx]
                 suggestions = json.loads(json_str)
             else:
-                suggestions = {
-                    "cta": {
-                        "high_priority": ["Improve CTA visibility", "Make CTA messaging more compelling"],
-                        "additional": ["Test different CTA colors"]
-                    },
-                    "visual_hierarchy": {
-                        "high_priority": ["Improve content organization", "Enhance key element visibility"],
-                        "additional": ["Add more whitespace between sections"]
-                    },
-                    "copy_effectiveness": {
-                        "high_priority": ["Clarify value proposition", "Make headlines more compelling"],
-                        "additional": ["Simplify complex sentences"]
-                    },
-                    "trust_signals": {
-                        "high_priority": ["Add customer testimonials", "Display security badges"],
-                        "additional": ["Include company credentials or awards"]
-                    }
-                }
+                suggestions = fallback_suggestions(components)
         for section in suggestions:
             if 'high_priority' in suggestions[section]:
                 suggestions[section]['high_priority'] = [
@@ -387,26 +543,11 @@ def generate_suggestions(analysis, category):
         return suggestions
     except Exception as e:
         print(f"Error generating suggestions: {str(e)}")
-        return {
-            "cta": {
-                "high_priority": ["Improve CTA visibility", "Make CTA messaging more compelling"],
-                "additional": ["Test different CTA colors"]
-            },
-            "visual_hierarchy": {
-                "high_priority": ["Improve content organization", "Enhance key element visibility"],
-                "additional": ["Add more whitespace between sections"]
-            },
-            "copy_effectiveness": {
-                "high_priority": ["Clarify value proposition", "Make headlines more compelling"],
-                "additional": ["Simplify complex sentences"]
-            },
-            "trust_signals": {
-                "high_priority": ["Add customer testimonials", "Display security badges"],
-                "additional": ["Include company credentials or awards"]
-            }
-        }
+        return fallback_suggestions(components)
 
 @app.route('/components', methods=['POST'])
+@admission_limited(admission, "components")
+@profiled(request_profiler, "components")
 def analyze_website():
     """Main route to analyze a website from URL or HTML."""
     try:
@@ -415,75 +556,562 @@ def analyze_website():
             print("No valid API key, returning demo data")
             return demo_data()
             
-        data = request.json
+        data = read_request_payload()
 
-        if 'url' in data:
-            content = fetch_website_content(data['url'])
-            source = data['url']
+        if not any(key in data for key in ('url', 'html', 'image')):
+            return jsonify({"error": "Either URL, HTML, or image is required"}), 400
 
-            soup = BeautifulSoup(content, 'html.parser')
-            for script in soup(["script", "style"]):
-                script.extract()
-            text_content = soup.get_text(separator=" ", strip=True)
+        deadline = Deadline.from_headers(request.headers)
+        if wants_stream(data) and ('url' in data or 'html' in data):
+            return stream_response(stream_analysis(data, deadline))
 
-            website_score = predict_score(html=content)
-            
-            return process_text_content(text_content, source, website_score)
-        elif 'html' in data:
-            content = data['html']
-            source = "HTML input"
+        result = run_analysis(data, deadline)
+        record_components_history(data, result, deadline)
+        return jsonify(result)
+    
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"Request exceeds the {app.config['MAX_CONTENT_LENGTH']} byte limit"}), 413
+    except Exception as e:
+        print(f"Error in analyze_website: {str(e)}")
+        return jsonify({"error": str(e), "fallback": "Using demo data due to error", "demo": True}), 200
 
-            soup = BeautifulSoup(content, 'html.parser')
-            for script in soup(["script", "style"]):
-                script.extract()
-            text_content = soup.get_text(separator=" ", strip=True)
+def run_analysis(data, deadline=None, on_stage=None):
+    """
+    Run the full fetch/score/LLM pipeline for a /components payload
+    
+    Shared by /components, its streaming mode and the job workers. With a
+    budgeted deadline the result reports which stages were skipped to stay
+    within it. on_stage, when given, is called with each stage event of an
+    HTML or URL analysis as soon as that stage finishes. Raises ValueError
+    when the payload has no URL, HTML or image.
+    """
+    deadline = deadline or Deadline()
+    incremental = data.get('incremental', True)
+    reuse_similar = data.get('reuse_similar', True)
+    full_page = data.get('full_page', FULL_PAGE_ANALYSIS)
+    if 'url' in data:
+        content = fetch_website_content(data['url'], deadline.stage_timeout("fetch", cap=FETCH_TIMEOUT_CAP))
+        return analyze_html(content, data['url'], data['url'] if incremental else None, deadline, reuse_similar, full_page,
+                            on_stage)
+    elif 'html' in data:
+        page_url = data.get('page_url') if incremental else None
+        return analyze_html(data['html'], "HTML input", page_url, deadline, reuse_similar, full_page, on_stage)
+    elif 'image' in data:
+        image_data = data['image']
+        if isinstance(image_data, str) and ';base64,' in image_data:
+            image_data = image_data.split(';base64,')[1]
+        image_parts = [{"mime_type": data.get('image_mime_type', "image/jpeg"), "data": image_data}]
+        return analyze_image_content(image_parts, "Image input", deadline=deadline)
+    raise ValueError("Either URL, HTML, or image is required")
 
-            website_score = predict_score(html=content)
-            
-            return process_text_content(text_content, source, website_score)
-        elif 'image' in data:
+job_manager = JobManager(run_analysis)
+try:
+    job_manager.start()
+except Exception as e:
+    print(f"Error resuming unfinished jobs: {str(e)}")
+section_cache = SectionCache()
+analysis_history = AnalysisHistory()
+feature_store = FeatureStore()
+similarity_index = SimilarityIndex()
 
-            image_data = data['image']
-            if ';base64,' in image_data:
+def is_reusable(analysis):
+    """Fallback observations from a failed LLM call must not be cached"""
+    for component_analysis in analysis.values():
+        for observation in component_analysis.get('observations', []):
+            if str(observation).startswith(("Error analyzing", "Unable to analyze")):
+                return False
+    return True
 
-                image_data = image_data.split(';base64,')[1]
+def analysis_failed(analysis):
+    return not is_reusable(analysis)
 
-            image_parts = [{"mime_type": "image/jpeg", "data": image_data}]
-            
-            website_score = None  
-            
-            return process_image_content(image_parts, "Image input", website_score)
-        else:
-            return jsonify({"error": "Either URL, HTML, or image is required"}), 400
+def suggestions_failed(components=None):
+    """run_stage check: the suggestions are the generic fallback, not an answer"""
+    return lambda suggestions: suggestions == fallback_suggestions(components)
+
+def emit(on_stage, stage, **fields):
+    """Report a finished stage to a streaming listener, if there is one"""
+    if on_stage:
+        on_stage(dict(stage=stage, **fields))
+
+def emit_components(on_stage, analysis):
+    for component in COMPONENTS:
+        if component in analysis:
+            emit(on_stage, "component", component=component, analysis=analysis[component])
+
+def analyze_html(html, source, page_key=None, deadline=None, reuse_similar=True, full_page=False, on_stage=None):
+    """
+    Score and analyze an HTML page, parsing it only once
+    
+    With a page_key (the page URL), the page's sections are fingerprinted
+    and compared with the last analysis of the same page. Only components
+    whose sections changed are sent to the LLM again; the cached
+    observations and suggestions are reused for the rest.
+    
+    A page seen for the first time reuses the analysis of a near-duplicate
+    page (a templated or localized variant) when one is similar enough.
+    
+    With full_page, text beyond the usual prompt prefix is analyzed in
+    section-aligned chunks instead of being cut off.
+    """
+    deadline = deadline or Deadline()
+    soup = make_soup(html)
+    features = extract_features_from_soup(soup)
+    website_score = predict_score(features=features)
+    emit(on_stage, "score", source=source, website_score=website_score, features=features)
+    sections = split_sections(soup)
+    chunks = pack_chunks(section_texts(soup)) if full_page else None
+    text_content = extract_text_from_soup(soup)
+    
+    if not has_valid_api_key:
+        return dict(analyze_text_content(text_content, source, website_score, deadline, on_stage=on_stage),
+                    features=features)
+    if not page_key:
+        return dict(analyze_new_page(text_content, source, website_score, deadline, reuse_similar, chunks=chunks,
+                                     on_stage=on_stage),
+                    features=features)
+    
+    cached = section_cache.get(page_key)
+    if cached is None:
+        result = analyze_new_page(text_content, source, website_score, deadline, reuse_similar, page_key, chunks,
+                                  on_stage)
+        reanalyzed = [] if 'near_duplicate' in result else list(COMPONENTS)
+    else:
+        changed = [component for component in COMPONENTS if component in changed_components(cached['sections'], sections)]
+        category = cached['category']
+        emit(on_stage, "category", category=category)
+        analysis = dict(cached['analysis'])
+        suggestions = dict(cached['suggestions'])
+        if changed:
+            for component in changed:
+                analysis.pop(component, None)
+                suggestions.pop(component, None)
+            analysis.update(deadline.run_stage(
+                "components",
+                lambda timeout: extract_components(text_content, category, changed, timeout, chunks),
+                {},
+                analysis_failed
+            ))
+            fresh = [component for component in changed if component in analysis]
+            if fresh and "components" not in deadline.skipped:
+                suggestions.update(deadline.run_stage(
+                    "suggestions",
+                    lambda timeout: generate_suggestions(select_components(analysis, fresh), category, fresh, timeout),
+                    {},
+                    suggestions_failed(fresh)
+                ))
+            elif fresh:
+                deadline.skipped.append("suggestions")
+        emit_components(on_stage, analysis)
+        emit(on_stage, "suggestions", suggestions=suggestions)
+        result = apply_observation_score({
+            "source": source,
+            "category": category,
+            "analysis": analysis,
+            "suggestions": suggestions,
+            "website_score": website_score
+        })
+        if deadline.budget is not None:
+            result.update(deadline.report())
+        reanalyzed = changed
     
+    if is_reusable(result['analysis']) and not deadline.skipped:
+        section_cache.put(page_key, sections, result['category'], result['analysis'], result['suggestions'])
+    
+    result['incremental'] = {
+        "reanalyzed": reanalyzed,
+        "reused": [component for component in COMPONENTS if component not in reanalyzed]
+    }
+    result['features'] = features
+    return result
+
+def analyze_new_page(text_content, source, website_score, deadline, reuse_similar=True, page_key=None, chunks=None,
+                     on_stage=None):
+    """
+    Analyze a page with no earlier analysis of its own
+    
+    If a stored page is at least SIMILARITY_THRESHOLD similar, its analysis
+    is returned with this page's source and feature score and no LLM call
+    is made. Otherwise the full chain runs and its result is indexed.
+    """
+    fingerprint = simhash(text_content)
+    if reuse_similar:
+        try:
+            match = similarity_index.find(fingerprint)
+        except Exception as e:
+            print(f"Error searching similar pages: {str(e)}")
+            match = None
+        if match:
+            emit(on_stage, "category", category=match['category'])
+            emit_components(on_stage, match['analysis'])
+            emit(on_stage, "suggestions", suggestions=match['suggestions'])
+            return apply_observation_score({
+                "source": source,
+                "category": match['category'],
+                "analysis": match['analysis'],
+                "suggestions": match['suggestions'],
+                "website_score": website_score,
+                "near_duplicate": {"page": match['page_key'], "similarity": round(match['similarity'], 3)}
+            })
+    
+    result = analyze_text_content(text_content, source, website_score, deadline, chunks, on_stage)
+    if is_reusable(result['analysis']) and not deadline.skipped:
+        try:
+            similarity_index.add(fingerprint, page_key, result['category'], result['analysis'], result['suggestions'])
+        except Exception as e:
+            print(f"Error indexing page for similarity: {str(e)}")
+    return result
+
+def record_components_history(data, result, deadline):
+    record_history("components", result, data.get('url') or data.get('page_url'), result.get('features'), {
+        "total_seconds": round(deadline.elapsed(), 3),
+        "skipped_stages": list(deadline.skipped)
+    })
+
+def record_history(kind, result, url=None, features=None, timings=None):
+    """
+    Store a result in the analysis history and add its history_id to the result
+    
+    The feature vector also goes to the columnar feature store, keyed
+    history:<id>, for bulk re-scoring when the model changes.
+    """
+    try:
+        result['history_id'] = analysis_history.record(kind, result, url, features, model_version(), timings)
+        if features is not None:
+            feature_store.append([f"history:{result['history_id']}"], [features])
     except Exception as e:
-        print(f"Error in analyze_website: {str(e)}")
-        return jsonify({"error": str(e), "fallback": "Using demo data due to error", "demo": True}), 200
+        print(f"Error recording analysis history: {str(e)}")
 
-def process_text_content(text_content, source, website_score=None):
-    """Process text content for analysis"""
+@app.route('/history', methods=['GET'])
+def list_history():
+    """
+    Stored analyses, newest first, without re-running them
+    
+    Filters: domain, category, since/until (epoch seconds or ISO 8601),
+    min_score/max_score and kind ("components" or "train-model"). Pages
+    hold up to limit items; pass next_cursor back as cursor for the next.
+    """
+    try:
+        args = request.args
+        number = lambda name, cast=float: cast(args[name]) if args.get(name) else None
+        page = analysis_history.query(
+            domain=args.get('domain'),
+            category=args.get('category'),
+            since=parse_time(args['since']) if args.get('since') else None,
+            until=parse_time(args['until']) if args.get('until') else None,
+            min_score=number('min_score'),
+            max_score=number('max_score'),
+            kind=args.get('kind'),
+            limit=number('limit', int) or 50,
+            cursor=number('cursor', int)
+        )
+    except ValueError as e:
+        return jsonify({"error": f"Invalid history filter: {str(e)}"}), 400
+    return jsonify(page)
+
+@app.route('/history/<int:history_id>', methods=['GET'])
+def get_history(history_id):
+    """One stored analysis with its full result and feature vector"""
+    record = analysis_history.get(history_id)
+    if record is None:
+        return jsonify({"error": "History entry not found"}), 404
+    return jsonify(record)
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue an analysis and return its job id immediately"""
+    data = request.json
+    
+    if not data or not any(key in data for key in ('url', 'html', 'image')):
+        return jsonify({"error": "Either URL, HTML, or image is required"}), 400
+    
+    callback_url = data.pop('callback_url', None)
+    if callback_url:
+        try:
+            validate_callback_url(callback_url)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    
+    try:
+        job_id = job_manager.submit(data, callback_url)
+    except Exception as e:
+        print(f"Error creating job: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}"
+    }), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Return the status of a job and, once finished, its result"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route('/profiles', methods=['GET'])
+def list_profiles():
+    """List saved request profiles, newest first; requires X-Profile-Token"""
+    if not request_profiler.authorized(request.headers):
+        return jsonify({"error": "Profiling access denied"}), 403
+    return jsonify({"profiles": request_profiler.list()})
+
+@app.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """
+    Return a saved request profile; requires X-Profile-Token
+
+    ?format=text gives a pstats listing and ?format=pstats the raw dump for
+    tools such as snakeviz; the default is the JSON summary.
+    """
+    if not request_profiler.authorized(request.headers):
+        return jsonify({"error": "Profiling access denied"}), 403
 
-    category = determine_website_category(text_content)
+    output_format = request.args.get('format', 'json')
+    if output_format == 'pstats':
+        path = request_profiler.path(profile_id, '.prof')
+        if path:
+            return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                             download_name=f"{profile_id}.prof")
+    elif output_format == 'text':
+        report = request_profiler.text_report(profile_id)
+        if report is not None:
+            return Response(report, mimetype='text/plain')
+    else:
+        summary = request_profiler.load(profile_id)
+        if summary is not None:
+            return jsonify(summary)
+    return jsonify({"error": "Profile not found"}), 404
+
+def analyze_text_content(text_content, source, website_score=None, deadline=None, chunks=None, on_stage=None):
+    """
+    Run the category, components and suggestions chain and return the result dict
+    
+    With a budgeted deadline, stages that no longer fit are skipped in
+    reverse order of value: suggestions first, then the component analysis.
+    A stage whose LLM call failed or timed out is reported as skipped too,
+    and no suggestions are generated from failed component analysis. The
+    result then carries skipped_stages and degraded flags.
+    
+    chunks, when given, are analyzed map-reduce style instead of the text
+    prefix. on_stage receives each stage's event as it finishes.
+    """
+    deadline = deadline or Deadline()
+
+    category = deadline.run_stage(
+        "category",
+        lambda timeout: determine_website_category(text_content, timeout),
+        "Unknown (Skipped)",
+        lambda category: category == CATEGORY_API_ERROR
+    )
+    emit(on_stage, "category", category=category)
     
-    components_analysis = extract_website_components(text_content, category)
+    components_analysis = deadline.run_stage(
+        "components",
+        lambda timeout: extract_components(text_content, category, timeout=timeout, chunks=chunks),
+        {},
+        analysis_failed
+    )
+    emit_components(on_stage, components_analysis)
     
-    suggestions = generate_suggestions(components_analysis, category)
+    if components_analysis and "components" not in deadline.skipped:
+        suggestions = deadline.run_stage(
+            "suggestions",
+            lambda timeout: generate_suggestions(components_analysis, category, timeout=timeout),
+            {},
+            suggestions_failed()
+        )
+    else:
+        deadline.skipped.append("suggestions")
+        suggestions = {}
+    emit(on_stage, "suggestions", suggestions=suggestions)
     
-    result = {
+    result = apply_observation_score({
         "source": source,
         "category": category,
         "analysis": components_analysis,
         "suggestions": suggestions,
         "website_score": website_score
-    }
+    })
+    if chunks and len(chunks) > 1:
+        result['chunks_analyzed'] = len(chunks)
+    if deadline.budget is not None:
+        result.update(deadline.report())
+    return result
+
+def apply_observation_score(result):
+    """Attach the observation score and blend it into website_score (OBSERVATION_SCORE_WEIGHT)"""
+    observation_score = observation_scorer.score(result['analysis'])
+    result['observation_score'] = observation_score
+    result['website_score'] = blend_scores(result['website_score'], observation_score)
+    return result
+
+def process_text_content(text_content, source, website_score=None):
+    """Process text content for analysis"""
+    return jsonify(analyze_text_content(text_content, source, website_score))
+
+def _form_value(value):
+    """Form fields and query parameters arrive as strings; map flags back to booleans"""
+    if isinstance(value, str) and value.lower() in ('true', '1', 'false', '0'):
+        return value.lower() in ('true', '1')
+    return value
+
+def read_request_payload():
+    """
+    Build the analysis payload from a JSON, multipart or raw binary request
     
-    return jsonify(result)
+    Multipart "image"/"html" files and raw image/* or text/html bodies are
+    read once into bytes under MAX_UPLOAD_BYTES, without base64 encoding.
+    Other fields come from the form or the query string. A body declared
+    larger than MAX_CONTENT_LENGTH is refused before any of it is read.
+    """
+    mimetype = request.mimetype or ''
+    max_request = app.config['MAX_CONTENT_LENGTH']
+    if request.content_length is not None and request.content_length > max_request:
+        raise UploadTooLarge(max_request)
+    
+    if mimetype == 'multipart/form-data':
+        data = {key: _form_value(value) for key, value in request.form.items()}
+        for field in ('html', 'image'):
+            upload = request.files.get(field)
+            if upload:
+                data[field] = read_upload(upload.stream, MAX_UPLOAD_BYTES)
+                if field == 'image':
+                    data['image_mime_type'] = upload.mimetype or "image/jpeg"
+        return data
+    
+    if mimetype.startswith('image/') or mimetype == 'text/html':
+        data = {key: _form_value(value) for key, value in request.args.items()}
+        body = read_upload(request.stream, MAX_UPLOAD_BYTES, request.content_length)
+        if mimetype == 'text/html':
+            data['html'] = body
+        else:
+            data['image'] = body
+            data['image_mime_type'] = mimetype
+        return data
+    
+    return request.json
 
-def process_image_content(image_parts, source, website_score=None):
-    """Process image content for analysis"""
+def wants_stream(data):
+    """Streaming is requested with "stream": true, ?stream=1 or an NDJSON Accept header"""
+    if data.get('stream') or request.args.get('stream') in ('1', 'true'):
+        return True
+    return 'application/x-ndjson' in request.headers.get('Accept', '')
+
+def stream_response(events):
+    """Send each event as one JSON line, flushed as soon as it is produced"""
+    def generate():
+        for event in events:
+            yield json.dumps(event) + "\n"
+    response = Response(generate(), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def stream_analysis(data, deadline):
+    """
+    Yield the stages of a /components analysis as they complete
+    
+    The pipeline is the one behind the blocking response (section cache,
+    near-duplicate reuse, deadline, observation blending and history); it
+    runs on a worker thread and reports each stage as soon as it finishes.
+    The score comes first since it needs no LLM call. The last event is
+    "done" with the complete result, or "error".
+    """
+    events = queue.Queue()
+    
+    def work():
+        try:
+            result = run_analysis(data, deadline, on_stage=events.put)
+            record_components_history(data, result, deadline)
+            events.put({"stage": "done", "result": result})
+        except Exception as e:
+            print(f"Error in stream_analysis: {str(e)}")
+            events.put({"stage": "error", "error": str(e)})
+    
+    threading.Thread(target=work, daemon=True).start()
+    while True:
+        event = events.get()
+        yield event
+        if event["stage"] in ("done", "error"):
+            return
+
+@app.route('/crawl', methods=['POST'])
+@admission_limited(admission, "crawl")
+def crawl_website():
+    """Crawl same-domain pages from a root URL, score them all and analyze a representative subset"""
+    try:
+        data = request.json
+        
+        if not data or 'url' not in data:
+            return jsonify({"error": "Missing required field: url"}), 400
+        
+        try:
+            max_pages = max(1, min(int(data.get('max_pages', CRAWL_MAX_PAGES)), CRAWL_MAX_PAGES))
+            llm_pages = max(0, min(int(data.get('llm_pages', CRAWL_LLM_PAGES)), max_pages))
+        except (TypeError, ValueError):
+            return jsonify({"error": "max_pages and llm_pages must be integers"}), 400
+        
+        crawl = crawl_site(data['url'], max_pages=max_pages, max_workers=CRAWL_MAX_WORKERS,
+                           max_fetches=CRAWL_MAX_FETCHES)
+        pages = crawl['pages']
+        if not pages:
+            return jsonify({
+                "error": "No pages could be fetched",
+                "errors": crawl['errors'],
+                "blocked": crawl['blocked']
+            }), 502
+        
+        features = [page['features'] for page in pages]
+        scores = predict_scores(features)
+        
+        representatives = select_representative_pages(pages, scores, llm_pages)
+        if representatives:
+            with ThreadPoolExecutor(max_workers=len(representatives)) as executor:
+                analyses = list(executor.map(
+                    lambda i: analyze_text_content(pages[i]['text'], pages[i]['url'], scores[i]),
+                    representatives
+                ))
+        else:
+            analyses = []
+        
+        categories = Counter(analysis['category'] for analysis in analyses)
+        
+        return jsonify({
+            "source": data['url'],
+            "category": categories.most_common(1)[0][0] if categories else None,
+            "site_score": sum(scores) / len(scores),
+            "score_summary": {
+                "min": min(scores),
+                "max": max(scores),
+                "median": statistics.median(scores),
+                "pages_scored": len(scores)
+            },
+            "pages": [
+                {"url": page['url'], "website_score": score, "features": page_features, "analyzed": i in representatives}
+                for i, (page, score, page_features) in enumerate(zip(pages, scores, features))
+            ],
+            "analyses": analyses,
+            "duplicates": crawl['duplicates'],
+            "errors": crawl['errors'],
+            "blocked": crawl['blocked'],
+            "fetches": crawl['fetches']
+        })
+    
+    except Exception as e:
+        print(f"Error in crawl_website: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+def analyze_image_content(image_parts, source, website_score=None, deadline=None):
+    """Run the screenshot analysis chain and return the result dict"""
     if not has_valid_api_key:
         # Return demo data for image analysis
-        return jsonify({
+        return {
             "source": "Image input (Demo Mode)",
             "category": "E-commerce",
             "analysis": {
@@ -552,7 +1180,7 @@ def process_image_content(image_parts, source, website_score=None):
             },
             "website_score": 68.5,
             "demo": True
-        })
+        }
         
     try:
         model = genai.GenerativeModel('gemini-2.0-flash')
@@ -568,8 +1196,12 @@ def process_image_content(image_parts, source, website_score=None):
         }
 # env update
         category_prompt = "You are an expert web analyst. Identify the most likely category of this website screenshot (e.g. e-commerce, blog, SaaS, portfolio, etc.). Return ONLY the category name, nothing else."
-        category_response = model.generate_content([category_prompt, image_part])
-        category = category_response.text.strip()
+        deadline = deadline or Deadline()
+        category = deadline.run_stage(
+            "category",
+            lambda timeout: generate(model, [category_prompt, image_part], timeout).text.strip(),
+            "Unknown (Skipped)"
+        )
         
         components_prompt = f"""
         You are an expert web analyst specializing in UX and conversion optimization.
@@ -594,49 +1226,37 @@ def process_image_content(image_parts, source, website_score=None):
         Respond with ONLY the properly formatted JSON, nothing else. Each observation must be a simple string, not an object.
         """
         
-        components_response = model.generate_content([components_prompt, image_part])
-        
-        try:
-            analysis = json.loads(components_response.text)
-        except json.JSONDecodeError:
-            text = components_response.text
-            start_idx = text.find('{')
-            end_idx = text.rfind('}') + 1
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = text[start_idx:end_idx]
-                analysis = json.loads(json_str)
-            else:
-               
-                analysis = {
+        def analyze_components(timeout):
+            text = generate(model, [components_prompt, image_part], timeout).text
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError:
+                start_idx = text.find('{')
+                end_idx = text.rfind('}') + 1
+                if start_idx >= 0 and end_idx > start_idx:
+                    return json.loads(text[start_idx:end_idx])
+                return {
                     "cta": {"observations": ["Unable to analyze CTAs from image"]},
                     "visual_hierarchy": {"observations": ["Unable to analyze visual hierarchy from image"]},
                     "copy_effectiveness": {"observations": ["Unable to analyze copy from image"]},
                     "trust_signals": {"observations": ["Unable to analyze trust signals from image"]}
                 }
         
-        suggestions = generate_suggestions(analysis, category)
-        
-        total_observations = sum(len(analysis[key]['observations']) for key in analysis)
-        positive_observations = 0
-        negative_observations = 0
-        for section in analysis:
-            for observation in analysis[section]['observations']:
-                lower_obs = observation.lower()
-                if "unable to analyze" in lower_obs:
-                    continue
-                if any(term in lower_obs for term in ["missing", "lack", "no ", "poor", "weak", "confusing", "unclear", 
-                                                     "ineffective", "absent", "could be", "should be", "not"]):
-                    negative_observations += 1
-                elif any(term in lower_obs for term in ["clear", "effective", "good", "strong", "well", "present", 
-                                                      "prominent", "visible", "professional"]):
-                    positive_observations += 1
-        informative_observations = positive_observations + negative_observations
-        if informative_observations > 0:
-            image_based_score = 50 + (30 * (positive_observations / informative_observations - 0.5))
-            image_based_score = min(100, max(0, image_based_score))
+        analysis = deadline.run_stage("components", analyze_components, {}, analysis_failed)
+        
+        if analysis and "components" not in deadline.skipped:
+            suggestions = deadline.run_stage(
+                "suggestions",
+                lambda timeout: generate_suggestions(analysis, category, timeout=timeout),
+                {},
+                suggestions_failed()
+            )
         else:
-            image_based_score = 50
-        website_score = image_based_score
+            deadline.skipped.append("suggestions")
+            suggestions = {}
+        
+        image_based_score = observation_scorer.score(analysis)
+        website_score = blend_scores(website_score, image_based_score)
 
         result = {
             "source": source,
@@ -645,12 +1265,14 @@ def process_image_content(image_parts, source, website_score=None):
             "suggestions": suggestions,
             "website_score": website_score
         }
+        if deadline.budget is not None:
+            result.update(deadline.report())
         
-        return jsonify(result)
+        return result
     except Exception as e:
         print(f"Error processing image: {str(e)}")
         # Return demo data in case of error
-        return jsonify({
+        return {
             "source": "Image input (Error Fallback)",
             "category": "Website",
             "analysis": {
@@ -680,9 +1302,15 @@ def process_image_content(image_parts, source, website_score=None):
             "website_score": 50,
             "demo": True,
             "error": str(e)
-        })
+        }
+
+def process_image_content(image_parts, source, website_score=None):
+    """Process image content for analysis"""
+    return jsonify(analyze_image_content(image_parts, source, website_score))
 
 @app.route('/train-model', methods=['POST'])
+@admission_limited(admission, "train-model")
+@profiled(request_profiler, "train-model")
 def train_scoring_model():
     """Endpoint to train the scoring model with user data and feedback"""
     if not has_valid_api_key:
@@ -706,15 +1334,22 @@ def train_scoring_model():
 
         user_feedback = data.get('user_feedback', {})
 
+        started = time.monotonic()
         result = train_from_user_data(html, user_score, user_feedback)
         
-        return jsonify({
+        response = {
             "success": True,
             "message": "Model trained successfully",
             "old_score": result["old_score"],
             "new_score": result["new_score"],
             "model_updated": result["model_updated"]
-        })
+        }
+        entry = dict(response, source="Training input", website_score=result["new_score"],
+                     user_score=user_score, user_feedback=user_feedback)
+        record_history("train-model", entry, data.get('page_url'), result["features"],
+                       {"total_seconds": round(time.monotonic() - started, 3)})
+        response["history_id"] = entry.get("history_id")
+        return jsonify(response)
         
     except Exception as e:
         print(f"Error training model: {str(e)}")
@@ -0,0 +1,183 @@
+"""
+Score a local corpus of saved HTML pages without going through the HTTP API.
+
+Features are extracted in parallel by a process pool, scored in large
+batches with a single model call each, and appended to a CSV or JSONL file
+as they finish. Re-running the same command resumes after the last page
+that was written.
+
+Usage:
+    python bulk_score.py CORPUS_DIR_OR_TARBALL --output results.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tarfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from components.featureStore import FeatureStore
+from components.scoringModel import FEATURE_NAMES, extract_features_from_html, load_model, predict_scores
+
+HTML_EXTENSIONS = ('.html', '.htm')
+FIELDS = ["id"] + FEATURE_NAMES + ["website_score", "error"]
+
+def iter_documents(corpus):
+    """
+    Yield (doc_id, path, content) for every HTML file in a directory or tarball
+
+    Directory entries are read by the workers, so content is None; tarball
+    members can only be read sequentially and are read here.
+    """
+    if os.path.isdir(corpus):
+        for root, dirs, files in os.walk(corpus):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(HTML_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, corpus), path, None
+    elif tarfile.is_tarfile(corpus):
+        with tarfile.open(corpus) as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(HTML_EXTENSIONS):
+                    yield member.name, None, archive.extractfile(member).read()
+    else:
+        raise ValueError(f"{corpus} is neither a directory nor a tar archive")
+
+def extract_document(item):
+    """Process-pool worker: returns (doc_id, features, error)"""
+    doc_id, path, content = item
+    try:
+        if content is None:
+            with open(path, 'rb') as f:
+                content = f.read()
+        return doc_id, extract_features_from_html(content), None
+    except Exception as e:
+        return doc_id, None, str(e)
+
+def load_completed_ids(output, output_format):
+    """Read the ids already written so a rerun skips them; drops a partially written last line"""
+    if not os.path.exists(output):
+        return set()
+
+    with open(output, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+    completed = set()
+    with open(output, newline='') as f:
+        if output_format == 'csv':
+            for row in csv.DictReader(f):
+                completed.add(row["id"])
+        else:
+            for line in f:
+                if line.strip():
+                    completed.add(json.loads(line)["id"])
+    return completed
+
+class ResultWriter:
+    """Appends scored rows to CSV or JSONL and flushes after every batch"""
+
+    def __init__(self, output, output_format):
+        self.output_format = output_format
+        is_new = not os.path.exists(output) or os.path.getsize(output) == 0
+        self.file = open(output, 'a', newline='')
+        if output_format == 'csv':
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            if is_new:
+                self.writer.writeheader()
+
+    def write(self, rows):
+        for row in rows:
+            if self.output_format == 'csv':
+                self.writer.writerow(row)
+            else:
+                self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+def iter_batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def score_batch(batch, model):
+    """Score the successfully extracted documents of a batch with one predict call"""
+    scored = [entry for entry in batch if entry[2] is None]
+    scores = predict_scores([features for _, features, _ in scored], model=model)
+    score_by_id = {doc_id: score for (doc_id, _, _), score in zip(scored, scores)}
+
+    rows = []
+    for doc_id, features, error in batch:
+        row = {"id": doc_id, "website_score": score_by_id.get(doc_id), "error": error}
+        row.update(dict(zip(FEATURE_NAMES, features or [None] * len(FEATURE_NAMES))))
+        rows.append(row)
+    return rows
+
+def score_corpus(corpus, output, output_format='jsonl', workers=None, batch_size=2000, chunksize=32, feature_store=None):
+    """
+    Extract, score and write every not-yet-scored document; returns (scored, skipped, failed)
+    
+    With a feature_store directory the extracted vectors are also appended
+    there, so later models can re-score the corpus without re-parsing it.
+    """
+    completed = load_completed_ids(output, output_format)
+    pending = (item for item in iter_documents(corpus) if item[0] not in completed)
+
+    model = load_model()
+    store = FeatureStore(feature_store) if feature_store else None
+    writer = ResultWriter(output, output_format)
+    scored = failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Submit one batch at a time so a large tarball is never fully in memory
+            for batch in iter_batches(pending, batch_size):
+                results = list(executor.map(extract_document, batch, chunksize=chunksize))
+                rows = score_batch(results, model)
+                writer.write(rows)
+                if store:
+                    extracted = [(doc_id, features) for doc_id, features, error in results if error is None]
+                    store.append([doc_id for doc_id, _ in extracted], [features for _, features in extracted])
+                scored += len(rows)
+                failed += sum(1 for row in rows if row["error"])
+    finally:
+        writer.close()
+
+    return scored, len(completed), failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-score saved HTML pages with the landing page model")
+    parser.add_argument("corpus", help="Directory of .html files or a tar archive of them")
+    parser.add_argument("--output", required=True, help="Results file; rerunning resumes it")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Output format (default: from the file extension)")
+    parser.add_argument("--workers", type=int, default=None, help="Feature extraction processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Rows per predict call and per write")
+    parser.add_argument("--chunksize", type=int, default=32, help="Documents handed to a worker at a time")
+    parser.add_argument("--feature-store", help="Also append the feature vectors to this feature store directory")
+    args = parser.parse_args(argv)
+
+    output_format = args.format or ('csv' if args.output.lower().endswith('.csv') else 'jsonl')
+
+    start = time.time()
+    scored, skipped, failed = score_corpus(
+        args.corpus, args.output, output_format,
+        workers=args.workers, batch_size=args.batch_size, chunksize=args.chunksize,
+        feature_store=args.feature_store
+    )
+    print(f"Scored {scored} documents ({failed} failed, {skipped} already done) in {time.time() - start:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
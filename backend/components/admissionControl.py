@@ -0,0 +1,176 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from functools import wraps
+
+from flask import jsonify, request
+
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", 8))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 16))
+ADMISSION_CLIENT_CONCURRENT = int(os.getenv("ADMISSION_CLIENT_CONCURRENT", 2))
+ADMISSION_CLIENT_QUEUE = int(os.getenv("ADMISSION_CLIENT_QUEUE", 4))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 10))
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries the HTTP status and Retry-After"""
+
+    def __init__(self, status, message, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+class _Ticket:
+    """A queued request; compared by identity so removing one never drops another"""
+    __slots__ = ("granted",)
+
+    def __init__(self):
+        self.granted = False
+
+class AdmissionController:
+    """
+    Concurrency limits with a bounded, fair wait queue for one route
+
+    At most max_concurrent requests run at once, and at most
+    client_concurrent of them for the same client. Requests over the limit
+    wait in a per-client queue; freed slots go round-robin across clients
+    so one heavy caller cannot starve the others. A client with
+    client_queue requests already waiting is rejected with 429, a full
+    global queue or a wait longer than queue_timeout with 503.
+
+    Limits apply per process, so the effective totals are multiplied by the
+    number of gunicorn workers.
+    """
+
+    def __init__(self, name, max_concurrent=ADMISSION_MAX_CONCURRENT, max_queue=ADMISSION_MAX_QUEUE,
+                 client_concurrent=ADMISSION_CLIENT_CONCURRENT, client_queue=ADMISSION_CLIENT_QUEUE,
+                 queue_timeout=ADMISSION_QUEUE_TIMEOUT):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.client_concurrent = client_concurrent
+        self.client_queue = client_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.client_active = defaultdict(int)
+        self.waiting = OrderedDict()
+        self.queued = 0
+        self.average_duration = 1.0
+        self._cond = threading.Condition()
+
+    def _dispatch(self):
+        """Hand free slots to waiting requests, one client at a time in round-robin order"""
+        while self.active < self.max_concurrent and self.waiting:
+            for client, tickets in self.waiting.items():
+                if self.client_active[client] < self.client_concurrent:
+                    ticket = tickets.popleft()
+                    if tickets:
+                        self.waiting.move_to_end(client)
+                    else:
+                        del self.waiting[client]
+                    self.queued -= 1
+                    self.active += 1
+                    self.client_active[client] += 1
+                    ticket.granted = True
+                    break
+            else:
+                return
+
+    def _remove(self, client, ticket):
+        tickets = self.waiting.get(client)
+        if tickets is not None and ticket in tickets:
+            tickets.remove(ticket)
+            self.queued -= 1
+            if not tickets:
+                del self.waiting[client]
+
+    def retry_after(self):
+        """Seconds until a slot is likely to be free, from the recent average request duration"""
+        backlog = self.queued + 1
+        return max(1, math.ceil(self.average_duration * backlog / self.max_concurrent))
+
+    def acquire(self, client):
+        with self._cond:
+            ticket = _Ticket()
+            self.waiting.setdefault(client, deque()).append(ticket)
+            self.queued += 1
+            self._dispatch()
+            if ticket.granted:
+                return time.monotonic()
+
+            if len(self.waiting[client]) > self.client_queue:
+                self._remove(client, ticket)
+                raise AdmissionRejected(429, "Too many concurrent requests from this client", self.retry_after())
+            if self.queued > self.max_queue:
+                self._remove(client, ticket)
+                raise AdmissionRejected(503, "Server is at capacity", self.retry_after())
+
+            deadline = time.monotonic() + self.queue_timeout
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._remove(client, ticket)
+                    raise AdmissionRejected(503, "Timed out waiting for capacity", self.retry_after())
+                self._cond.wait(remaining)
+            return time.monotonic()
+
+    def release(self, client, started_at):
+        with self._cond:
+            self.active -= 1
+            self.client_active[client] -= 1
+            if self.client_active[client] <= 0:
+                del self.client_active[client]
+            duration = time.monotonic() - started_at
+            self.average_duration = 0.8 * self.average_duration + 0.2 * duration
+            self._dispatch()
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {"active": self.active, "queued": self.queued, "clients_waiting": len(self.waiting)}
+
+def client_identity():
+    """
+    The caller's address, which clients cannot choose per request
+
+    Client-supplied headers are ignored: a client rotating them would get a
+    fresh per-client quota every time. Behind a reverse proxy, the app
+    resolves X-Forwarded-For through ProxyFix (TRUSTED_PROXY_COUNT) before
+    remote_addr is read here.
+    """
+    return request.remote_addr or 'unknown'
+
+def admission_limited(controllers, name):
+    """
+    Route decorator applying the AdmissionController registered as controllers[name]
+
+    The controller is looked up per request so it can be reconfigured at
+    runtime. Streamed responses hold their slot until the stream is closed.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            controller = controllers[name]
+            client = client_identity()
+            try:
+                started_at = controller.acquire(client)
+            except AdmissionRejected as e:
+                response = jsonify({"error": str(e), "retry_after": e.retry_after})
+                response.status_code = e.status
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
+
+            try:
+                response = view(*args, **kwargs)
+            except Exception:
+                controller.release(client, started_at)
+                raise
+
+            if getattr(response, 'is_streamed', False):
+                response.call_on_close(lambda: controller.release(client, started_at))
+            else:
+                controller.release(client, started_at)
+            return response
+        return wrapper
+    return decorator
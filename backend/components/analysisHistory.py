@@ -0,0 +1,145 @@
+import json
+import os
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+from components.sqliteConnection import connect
+
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "data/history.sqlite3")
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 500
+
+SUMMARY_COLUMNS = "id, kind, source, url, domain, category, website_score, model_version, timings, created_at"
+
+def domain_of(url):
+    """Lower-case host without a leading www., or None for a missing or relative URL"""
+    if not url:
+        return None
+    host = (urlparse(url).hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return host or None
+
+def parse_time(value):
+    """Epoch seconds or an ISO 8601 timestamp; raises ValueError otherwise"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+class AnalysisHistory:
+    """
+    Every analysis and training result, queryable without re-running it
+
+    Rows keep the full result plus the columns reports filter on: domain,
+    category, website_score and created_at, each indexed. Listing uses
+    keyset pagination on the row id, newest first, so deep pages stay cheap.
+    """
+
+    def __init__(self, db_path=HISTORY_DB_PATH):
+        self.db_path = os.path.abspath(db_path)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    source TEXT,
+                    url TEXT,
+                    domain TEXT,
+                    category TEXT,
+                    category_key TEXT,
+                    website_score REAL,
+                    features TEXT,
+                    model_version TEXT,
+                    timings TEXT,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_domain ON analyses (domain, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_category ON analyses (category_key, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_score ON analyses (website_score)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_created ON analyses (created_at)")
+
+    def _connect(self):
+        return connect(self.db_path)
+
+    def record(self, kind, result, url=None, features=None, model_version=None, timings=None):
+        """Store one result; returns its history id"""
+        category = result.get('category')
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """INSERT INTO analyses (kind, source, url, domain, category, category_key, website_score,
+                                         features, model_version, timings, result, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    kind, result.get('source'), url, domain_of(url), category,
+                    category.strip().lower() if category else None,
+                    result.get('website_score'),
+                    json.dumps(features) if features is not None else None,
+                    model_version,
+                    json.dumps(timings or {}),
+                    json.dumps(result),
+                    time.time()
+                )
+            )
+            return cursor.lastrowid
+
+    def _summary(self, row):
+        keys = [column.strip() for column in SUMMARY_COLUMNS.split(',')]
+        summary = dict(zip(keys, row))
+        summary['timings'] = json.loads(summary['timings']) if summary['timings'] else {}
+        return summary
+
+    def query(self, domain=None, category=None, since=None, until=None, min_score=None, max_score=None,
+              kind=None, limit=HISTORY_PAGE_SIZE, cursor=None):
+        """
+        Summaries matching every given filter, newest first
+
+        Returns:
+            dict: {"items": [...], "next_cursor": id to pass as cursor for the next page, or None}
+        """
+        clauses = []
+        params = []
+        for clause, value in (
+            ("domain = ?", domain_of(domain if '://' in domain else f"http://{domain}") if domain else None),
+            ("category_key = ?", category.strip().lower() if category else None),
+            ("created_at >= ?", since),
+            ("created_at < ?", until),
+            ("website_score >= ?", min_score),
+            ("website_score <= ?", max_score),
+            ("kind = ?", kind),
+            ("id < ?", cursor)
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+
+        limit = max(1, min(int(limit), HISTORY_MAX_PAGE_SIZE))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM analyses {where} ORDER BY id DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+
+        items = [self._summary(row) for row in rows[:limit]]
+        return {"items": items, "next_cursor": items[-1]["id"] if len(rows) > limit else None}
+
+    def get(self, history_id):
+        """Full stored record, including the result and feature vector, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {SUMMARY_COLUMNS}, features, result FROM analyses WHERE id = ?", (history_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        record = self._summary(row[:-2])
+        record['features'] = json.loads(row[-2]) if row[-2] else None
+        record['result'] = json.loads(row[-1])
+        return record
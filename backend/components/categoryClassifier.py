@@ -0,0 +1,171 @@
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+import joblib
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+
+from components.sqliteConnection import connect
+
+CATEGORY_LABELS_DB_PATH = os.getenv("CATEGORY_LABELS_DB_PATH", "data/category_labels.sqlite3")
+CATEGORY_MODEL_PATH = os.getenv("CATEGORY_MODEL_PATH", "data/category_model.pkl")
+CATEGORY_CONFIDENCE_THRESHOLD = float(os.getenv("CATEGORY_CONFIDENCE_THRESHOLD", 0.8))
+CATEGORY_TEXT_CHARS = 2000
+
+def normalize_category(label):
+    """Key under which spellings such as "E-commerce", "ecommerce." and "Ecommerce" are one class"""
+    return re.sub(r"[^a-z0-9]", "", label.lower())
+
+class LabelStore:
+    """Categories the LLM has assigned, with the text it saw, for training the local classifier"""
+
+    def __init__(self, db_path=CATEGORY_LABELS_DB_PATH):
+        self.db_path = os.path.abspath(db_path)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS category_labels (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    text TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return connect(self.db_path)
+
+    def record(self, text, label):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO category_labels (text, label, created_at) VALUES (?, ?, ?)",
+                (text[:CATEGORY_TEXT_CHARS], label.strip(), time.time())
+            )
+
+    def labelled(self):
+        """All (texts, labels) collected so far, oldest first"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT text, label FROM category_labels ORDER BY id").fetchall()
+        return [row[0] for row in rows], [row[1] for row in rows]
+
+class CategoryClassifier:
+    """
+    Hashed word n-gram logistic regression over page text
+
+    Predicts the normalized category key and reports it with the spelling
+    the LLM used most often for it. With no trained model every prediction
+    has zero confidence, so callers always fall back to the LLM.
+    """
+
+    def __init__(self, model_path=CATEGORY_MODEL_PATH):
+        self.model_path = model_path
+        self.pipeline = None
+        self.display = {}
+        self.loaded_mtime = None
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Load the model file if it changed since the last load, so retraining needs no restart"""
+        try:
+            mtime = os.path.getmtime(self.model_path)
+        except OSError:
+            return
+        if mtime == self.loaded_mtime:
+            return
+        with self._lock:
+            if mtime == self.loaded_mtime:
+                return
+            try:
+                bundle = joblib.load(self.model_path)
+                self.pipeline = bundle["pipeline"]
+                self.display = bundle["display"]
+                self.loaded_mtime = mtime
+            except Exception as e:
+                print(f"Error loading category classifier: {str(e)}")
+
+    def predict(self, text):
+        """
+        Returns:
+            tuple: (category label or None, confidence from 0-1)
+        """
+        self.reload()
+        if self.pipeline is None:
+            return None, 0.0
+        probabilities = self.pipeline.predict_proba([text[:CATEGORY_TEXT_CHARS]])[0]
+        best = probabilities.argmax()
+        key = self.pipeline.classes_[best]
+        return self.display.get(key, key), float(probabilities[best])
+
+def build_pipeline():
+    return make_pipeline(
+        HashingVectorizer(n_features=2 ** 18, ngram_range=(1, 2), alternate_sign=False, strip_accents='unicode'),
+        LogisticRegression(max_iter=1000, C=10)
+    )
+
+def train_classifier(texts, labels, model_path=CATEGORY_MODEL_PATH, min_examples=5,
+                     threshold=CATEGORY_CONFIDENCE_THRESHOLD, test_size=0.2, seed=42):
+    """
+    Train and save a classifier from collected labels
+
+    Categories with fewer than min_examples pages are left to the LLM. The
+    report gives held-out accuracy overall and on the predictions confident
+    enough to skip the LLM, and how often that happens (coverage).
+
+    Returns:
+        dict: Training report
+    """
+    keys = [normalize_category(label) for label in labels]
+    spellings = defaultdict(Counter)
+    for key, label in zip(keys, labels):
+        spellings[key][label.strip()] += 1
+    counts = Counter(keys)
+    kept = [(text, key) for text, key in zip(texts, keys) if key and counts[key] >= min_examples]
+    classes = sorted({key for _, key in kept})
+    if len(classes) < 2:
+        raise ValueError(f"Need at least two categories with {min_examples} or more labelled pages")
+
+    kept_texts = [text for text, _ in kept]
+    kept_keys = [key for _, key in kept]
+    train_texts, test_texts, train_keys, test_keys = train_test_split(
+        kept_texts, kept_keys, test_size=max(test_size, len(classes) / len(kept_texts)),
+        random_state=seed, stratify=kept_keys
+    )
+
+    pipeline = build_pipeline().fit(train_texts, train_keys)
+    probabilities = pipeline.predict_proba(test_texts)
+    predicted = pipeline.classes_[probabilities.argmax(axis=1)]
+    confident = probabilities.max(axis=1) >= threshold
+    correct = predicted == test_keys
+
+    start = time.perf_counter()
+    for text in test_texts[:200]:
+        pipeline.predict_proba([text])
+    latency_ms = (time.perf_counter() - start) * 1000 / min(len(test_texts), 200)
+
+    # Refit on everything now that the held-out numbers are known
+    pipeline = build_pipeline().fit(kept_texts, kept_keys)
+    display = {key: spellings[key].most_common(1)[0][0] for key in classes}
+    directory = os.path.dirname(os.path.abspath(model_path))
+    os.makedirs(directory, exist_ok=True)
+    # Write then rename, so a running service never loads a half-written file
+    joblib.dump({"pipeline": pipeline, "display": display}, model_path + ".tmp")
+    os.replace(model_path + ".tmp", model_path)
+
+    return {
+        "examples": len(kept_texts),
+        "categories": {display[key]: counts[key] for key in classes},
+        "threshold": threshold,
+        "accuracy": float(correct.mean()),
+        "confident_accuracy": float(correct[confident].mean()) if confident.any() else None,
+        "coverage": float(confident.mean()),
+        "predict_ms": round(latency_ms, 3)
+    }
@@ -0,0 +1,117 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REQUEST_BUDGET_SECONDS = float(os.getenv("REQUEST_BUDGET_SECONDS", 30))
+MAX_REQUEST_BUDGET_SECONDS = float(os.getenv("MAX_REQUEST_BUDGET_SECONDS", 120))
+BUDGET_HEADER = 'X-Request-Budget-Ms'
+
+# stage: (share of the remaining budget it may use, seconds it needs to be worth starting)
+# Shares below 1 keep a reserve for the stages that follow.
+STAGE_BUDGETS = {
+    "fetch": (0.3, 0.5),
+    "category": (0.25, 1.0),
+    "components": (0.6, 2.0),
+    "suggestions": (1.0, 2.0)
+}
+FETCH_TIMEOUT_CAP = 10
+# Threads that run timed calls; a call that overran keeps its thread until it returns
+STAGE_CALL_THREADS = int(os.getenv("STAGE_CALL_THREADS", 32))
+
+_call_executor = ThreadPoolExecutor(max_workers=STAGE_CALL_THREADS, thread_name_prefix="stage-call")
+
+def call_with_timeout(func, timeout=None):
+    """
+    Return func(), or raise TimeoutError once timeout seconds have passed
+
+    The call runs on a worker thread and is abandoned, not interrupted, when
+    it overruns. Without a timeout func runs inline.
+    """
+    if timeout is None:
+        return func()
+    future = _call_executor.submit(func)
+    try:
+        return future.result(timeout=max(timeout, 0))
+    except TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Call did not finish within {timeout:.1f}s")
+
+class Deadline:
+    """
+    Time budget for one request, split across the pipeline stages
+
+    A Deadline without a budget never expires and imposes no timeouts, so
+    callers can always pass one through.
+    """
+
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.started = time.monotonic()
+        self.skipped = []
+
+    @classmethod
+    def from_headers(cls, headers):
+        """Budget from X-Request-Budget-Ms, else REQUEST_BUDGET_SECONDS; capped at MAX_REQUEST_BUDGET_SECONDS"""
+        budget = REQUEST_BUDGET_SECONDS
+        value = headers.get(BUDGET_HEADER)
+        if value:
+            try:
+                budget = float(value) / 1000
+            except ValueError:
+                print(f"Ignoring invalid {BUDGET_HEADER} header: {value}")
+        return cls(max(0, min(budget, MAX_REQUEST_BUDGET_SECONDS)))
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def remaining(self):
+        if self.budget is None:
+            return float('inf')
+        return max(0, self.budget - self.elapsed())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def can_run(self, stage):
+        return self.remaining() >= STAGE_BUDGETS[stage][1]
+
+    def stage_timeout(self, stage, cap=None):
+        """Seconds the stage may take, or None when there is no budget and no cap"""
+        if self.budget is None:
+            return cap
+        timeout = self.remaining() * STAGE_BUDGETS[stage][0]
+        return min(timeout, cap) if cap is not None else timeout
+
+    def run_stage(self, stage, func, fallback, failed=None):
+        """
+        Run func(timeout) for a stage, or record the stage as skipped
+
+        A stage is skipped when too little budget is left to start it, when
+        func raises (a timeout included) or when the budget ran out while it
+        was running; the fallback is returned instead. A result that
+        failed(result) flags as an error placeholder is returned as is, but
+        the stage is still reported as skipped.
+        """
+        if not self.can_run(stage):
+            self.skipped.append(stage)
+            return fallback
+        try:
+            result = func(self.stage_timeout(stage))
+        except Exception as e:
+            print(f"Error in {stage} stage: {str(e)}")
+            self.skipped.append(stage)
+            return fallback
+        if self.expired():
+            self.skipped.append(stage)
+            return fallback
+        if failed is not None and failed(result):
+            self.skipped.append(stage)
+        return result
+
+    def report(self):
+        return {
+            "budget_seconds": self.budget,
+            "elapsed_seconds": round(self.elapsed(), 3),
+            "skipped_stages": list(self.skipped),
+            "degraded": bool(self.skipped)
+        }
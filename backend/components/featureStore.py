@@ -0,0 +1,169 @@
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from components.scoringModel import FEATURE_NAMES
+
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", "data/features")
+RESCORE_CHUNK_ROWS = int(os.getenv("RESCORE_CHUNK_ROWS", 1000000))
+DTYPE = np.float32
+
+class FeatureStore:
+    """
+    Append-only columnar store of page feature vectors
+
+    Each feature is a raw float32 file (<name>.f32) that can be memory
+    mapped, and ids.txt holds one row id per line. Appends from several
+    processes are serialized with a file lock so the columns stay aligned,
+    and rows only count once state.json is updated after every column and
+    id has been written.
+
+    Re-scores are written next to it as scores/<model version>.f32, one
+    float32 per row in the same order.
+    """
+
+    def __init__(self, directory=FEATURE_STORE_DIR):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(os.path.join(self.directory, "scores"), exist_ok=True)
+
+    def _column_path(self, name):
+        return os.path.join(self.directory, f"{name}.f32")
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.directory, ".lock"), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _state(self):
+        """Committed row count and ids.txt length; anything past them is an unfinished append"""
+        try:
+            with open(os.path.join(self.directory, "state.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"rows": 0, "ids_bytes": 0}
+
+    def _commit(self, state):
+        path = os.path.join(self.directory, "state.json")
+        with open(path + ".tmp", 'w') as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
+
+    def rows(self):
+        """Number of committed rows"""
+        return self._state()["rows"]
+
+    def append(self, ids, features):
+        """
+        Append rows; features is a list of 5-value vectors in FEATURE_NAMES order
+
+        Vectors with a different length are padded or truncated like
+        predict_scores does.
+        """
+        if not len(ids):
+            return
+        X = np.zeros((len(ids), len(FEATURE_NAMES)), dtype=DTYPE)
+        for row, vector in enumerate(features):
+            values = list(vector)[:len(FEATURE_NAMES)]
+            X[row, :len(values)] = values
+        id_lines = "".join(str(row_id).replace("\n", " ") + "\n" for row_id in ids).encode()
+
+        with self._locked():
+            state = self._state()
+            for column, name in enumerate(FEATURE_NAMES):
+                with open(self._column_path(name), 'ab') as f:
+                    f.truncate(state["rows"] * DTYPE().itemsize)
+                    f.write(np.ascontiguousarray(X[:, column]).tobytes())
+            with open(os.path.join(self.directory, "ids.txt"), 'ab') as f:
+                f.truncate(state["ids_bytes"])
+                f.write(id_lines)
+            self._commit({"rows": state["rows"] + len(ids), "ids_bytes": state["ids_bytes"] + len(id_lines)})
+
+    def ids(self):
+        state = self._state()
+        path = os.path.join(self.directory, "ids.txt")
+        if not state["rows"]:
+            return []
+        with open(path, 'rb') as f:
+            return f.read(state["ids_bytes"]).decode().splitlines()
+
+    def columns(self, rows=None):
+        """Memory-mapped feature columns, trimmed to the committed rows or to a row count read earlier"""
+        if rows is None:
+            rows = self.rows()
+        if rows == 0:
+            return {name: np.zeros(0, dtype=DTYPE) for name in FEATURE_NAMES}
+        return {name: np.memmap(self._column_path(name), dtype=DTYPE, mode='r', shape=(rows,))
+                for name in FEATURE_NAMES}
+
+    def iter_chunks(self, chunk_rows=RESCORE_CHUNK_ROWS, rows=None):
+        """
+        Yield (start, X) with X a (rows, 5) float32 matrix, chunk_rows rows at a time
+
+        Pass rows to read a snapshot taken earlier; rows appended since are left out.
+        """
+        mapped = self.columns(rows)
+        columns = [mapped[name] for name in FEATURE_NAMES]
+        rows = len(columns[0])
+        for start in range(0, rows, chunk_rows):
+            yield start, np.column_stack([column[start:start + chunk_rows] for column in columns])
+
+    def scores_path(self, version):
+        return os.path.join(self.directory, "scores", f"{version}.f32")
+
+    def scores(self, version):
+        """Memory-mapped scores written by a re-score with that model version, or None"""
+        path = self.scores_path(version)
+        if not os.path.exists(path):
+            return None
+        rows = os.path.getsize(path) // DTYPE().itemsize
+        if rows == 0:
+            return np.zeros(0, dtype=DTYPE)
+        return np.memmap(path, dtype=DTYPE, mode='r', shape=(rows,))
+
+def rescore(store, model, version, chunk_rows=RESCORE_CHUNK_ROWS):
+    """
+    Score every stored row with one vectorized predict per chunk
+
+    Scores are clamped to 0-100 like predict_scores and written to
+    scores/<version>.f32 together with a JSON summary. The file is
+    written under a temporary name and renamed, so readers never see a
+    partial re-score.
+
+    Returns:
+        dict: Summary with the model version, row count and timing
+    """
+    started = time.perf_counter()
+    rows = store.rows()
+    path = store.scores_path(version)
+    temporary = path + ".tmp"
+
+    if rows:
+        output = np.memmap(temporary, dtype=DTYPE, mode='w+', shape=(rows,))
+        # Rows appended while this runs are left for the next re-score
+        for start, X in store.iter_chunks(chunk_rows, rows):
+            output[start:start + len(X)] = np.clip(model.predict(X), 0, 100)
+        output.flush()
+        del output
+    else:
+        open(temporary, 'wb').close()
+    os.replace(temporary, path)
+
+    seconds = time.perf_counter() - started
+    summary = {
+        "model_version": version,
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds) if seconds else None,
+        "created_at": time.time()
+    }
+    with open(path[:-len(".f32")] + ".json", 'w') as f:
+        json.dump(summary, f)
+    return summary
@@ -0,0 +1,41 @@
+import os
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+REFERENCE_BACKEND = "html.parser"
+# Scoring features were validated with html.parser, so a fast backend is opt-in:
+# install it, check it with parser_parity.py, then set its name (or "auto" for
+# the fastest installed one). Any BeautifulSoup tree builder name is accepted.
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", REFERENCE_BACKEND)
+# C-accelerated backends, fastest first
+FAST_BACKENDS = ("lxml",)
+
+def backend_available(backend):
+    return builder_registry.lookup(backend) is not None
+
+def resolve_backend(backend=PARSER_BACKEND):
+    """
+    Tree builder to parse with, falling back to the pure-Python reference
+
+    Returns:
+        str: A backend name BeautifulSoup accepts
+    """
+    if backend == "auto":
+        return next((name for name in FAST_BACKENDS if backend_available(name)), REFERENCE_BACKEND)
+    if backend_available(backend):
+        return backend
+    print(f"Error loading HTML parser backend {backend}: not installed, using {REFERENCE_BACKEND}")
+    return REFERENCE_BACKEND
+
+BACKEND = resolve_backend()
+
+def make_soup(html, backend=None):
+    """Parse HTML with the backend chosen at startup, or the given one"""
+    return BeautifulSoup(html, backend or BACKEND)
+
+def visible_text(soup):
+    """Strip scripts and styles from a parsed document (in place) and return its visible text"""
+    for script in soup(["script", "style"]):
+        script.extract()
+    return soup.get_text(separator=" ", strip=True)
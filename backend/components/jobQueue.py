@@ -0,0 +1,289 @@
+import ipaddress
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlparse
+
+import requests
+
+from components.sqliteConnection import connect
+
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "data/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+CALLBACK_TIMEOUT = 10
+# Comma-separated hosts callbacks may go to (subdomains included); when
+# unset, any host that resolves only to public addresses is allowed
+CALLBACK_ALLOWED_HOSTS = [host.strip().lower() for host in os.getenv("CALLBACK_ALLOWED_HOSTS", "").split(",") if host.strip()]
+
+def validate_callback_url(url):
+    """
+    Raise ValueError unless url is an http(s) URL the service may POST to
+
+    Callbacks must not reach loopback, private, link-local or other
+    non-public addresses such as cloud metadata endpoints.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ValueError("callback_url must be an http(s) URL")
+    host = parsed.hostname.lower()
+    if CALLBACK_ALLOWED_HOSTS:
+        if not any(host == allowed or host.endswith(f".{allowed}") for allowed in CALLBACK_ALLOWED_HOSTS):
+            raise ValueError(f"callback_url host {host} is not allowed")
+        return
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port or 443, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError):
+        raise ValueError(f"callback_url host {host} cannot be resolved")
+    for address in addresses:
+        if not ipaddress.ip_address(address.split('%')[0]).is_global:
+            raise ValueError(f"callback_url host {host} resolves to a non-public address")
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class JobStore:
+    """SQLite-backed job records shared by the web process and the worker processes"""
+
+    def __init__(self, db_path=JOBS_DB_PATH):
+        self.db_path = os.path.abspath(db_path)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    callback_url TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    worker_pid INTEGER,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, definition in (("worker_pid", "INTEGER"), ("attempts", "INTEGER NOT NULL DEFAULT 0")):
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+
+    def _connect(self):
+        return connect(self.db_path)
+
+    def create(self, payload, callback_url=None):
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, payload, callback_url, created_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(payload), callback_url, time.time())
+            )
+        return job_id
+
+    def claim(self, job_id):
+        """Move a queued job to running in this process; returns False if another worker already took it"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET status = 'running', started_at = ?, worker_pid = ?, attempts = attempts + 1
+                   WHERE id = ? AND status = 'queued'""",
+                (time.time(), os.getpid(), job_id)
+            )
+            return cursor.rowcount == 1
+
+    def finish(self, job_id, result=None, error=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (
+                    "failed" if error else "completed",
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id
+                )
+            )
+
+    def get(self, job_id, include_payload=False):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"]
+        }
+        if include_payload:
+            job["payload"] = json.loads(row["payload"])
+            job["callback_url"] = row["callback_url"]
+        return job
+
+    def queued_ids(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at").fetchall()
+        return [row[0] for row in rows]
+
+    def recover_orphans(self, max_attempts=JOB_MAX_ATTEMPTS):
+        """
+        Requeue running jobs whose worker process has died
+
+        A job that has already been tried max_attempts times is marked
+        failed instead, so a page that crashes its worker is not retried
+        forever. Returns the requeued job ids.
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, worker_pid, attempts FROM jobs WHERE status = 'running'").fetchall()
+            requeued = []
+            for job_id, pid, attempts in rows:
+                if pid and _process_alive(pid):
+                    continue
+                if attempts >= max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ? AND status = 'running'",
+                        (f"Worker process died {attempts} times while running this job", time.time(), job_id)
+                    )
+                else:
+                    conn.execute("UPDATE jobs SET status = 'queued', worker_pid = NULL WHERE id = ? AND status = 'running'",
+                                 (job_id,))
+                    requeued.append(job_id)
+        return requeued
+
+def _send_callback(callback_url, job):
+    try:
+        # Checked again at send time: the host's DNS may have changed since submission
+        validate_callback_url(callback_url)
+        requests.post(callback_url, json=job, timeout=CALLBACK_TIMEOUT, allow_redirects=False)
+    except Exception as e:
+        print(f"Error sending job callback to {callback_url}: {str(e)}")
+
+def execute_job(db_path, job_id, runner):
+    """Worker-process entry point: claim the job, run the pipeline and record the outcome"""
+    store = JobStore(db_path)
+    if not store.claim(job_id):
+        return
+
+    job = store.get(job_id, include_payload=True)
+    try:
+        store.finish(job_id, result=runner(job["payload"]))
+    except Exception as e:
+        print(f"Error running job {job_id}: {str(e)}")
+        store.finish(job_id, error=str(e))
+
+    if job["callback_url"]:
+        _send_callback(job["callback_url"], store.get(job_id))
+
+class JobManager:
+    """
+    Runs jobs on a local process pool so analyses do not occupy web workers
+
+    Workers are started with spawn, not fork: the web process runs threads
+    and holds live API clients that must not be copied into a child. start()
+    resumes jobs left queued, or running in a worker that has since died,
+    by an earlier run; claim() makes sure each job only runs once even if
+    several web workers resume it. A pool broken by a crashed worker is
+    replaced and its jobs are recovered the same way.
+    """
+
+    def __init__(self, runner, db_path=JOBS_DB_PATH, max_workers=JOB_WORKERS):
+        self.runner = runner
+        self.store = JobStore(db_path)
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._broken = set()
+        self._broken_lock = threading.Lock()
+
+    def _executor_locked(self):
+        # A pool created before this process was forked belongs to the parent
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _submit_locked(self, job_ids):
+        for attempt in range(2):
+            executor = self._executor_locked()
+            try:
+                for job_id in job_ids:
+                    future = executor.submit(execute_job, self.store.db_path, job_id, self.runner)
+                    future.add_done_callback(lambda future, executor=executor: self._check_pool(future, executor))
+                return
+            except BrokenProcessPool:
+                print("Job worker pool is broken; starting a new one")
+                self._executor = None
+        raise RuntimeError("Job worker pool could not be started")
+
+    def _check_pool(self, future, executor):
+        if future.cancelled() or not isinstance(future.exception(), BrokenProcessPool):
+            return
+        with self._broken_lock:
+            if executor in self._broken:
+                return
+            self._broken.add(executor)
+        # Recover on a separate thread; this callback runs on the pool's own management thread
+        threading.Thread(target=self._replace_pool, args=(executor,), daemon=True).start()
+
+    def _replace_pool(self, broken):
+        print("A job worker died; starting a new pool and recovering its jobs")
+        broken.shutdown(wait=True)
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+            self._resume_locked()
+        with self._broken_lock:
+            self._broken.discard(broken)
+
+    def _resume_locked(self):
+        self.store.recover_orphans()
+        job_ids = self.store.queued_ids()
+        if job_ids:
+            self._submit_locked(job_ids)
+
+    def start(self):
+        """Resume unfinished jobs; does nothing inside a pool worker that imported the app"""
+        if multiprocessing.parent_process() is not None:
+            return
+        with self._lock:
+            self._resume_locked()
+
+    def submit(self, payload, callback_url=None):
+        job_id = self.store.create(payload, callback_url)
+        with self._lock:
+            self._submit_locked([job_id])
+        return job_id
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
@@ -0,0 +1,113 @@
+import os
+import pickle
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+
+TARGET_MAE = float(os.getenv("MODEL_TARGET_MAE", 2.0))
+LATENCY_BUDGET_MS = float(os.getenv("MODEL_LATENCY_BUDGET_MS", 2.0))
+
+# Ordered roughly from smallest to largest; selection re-sorts by measured size
+CANDIDATE_GRID = [
+    {"n_estimators": n_estimators, "max_depth": max_depth, "min_samples_leaf": min_samples_leaf}
+    for n_estimators in (5, 10, 25, 50, 100)
+    for max_depth in (4, 6, 8, None)
+    for min_samples_leaf in (1, 5)
+]
+
+def model_size(model):
+    """Total decision nodes across the forest, the main driver of memory and predict time"""
+    return int(sum(estimator.tree_.node_count for estimator in model.estimators_))
+
+def fit_candidate(params, X_train, y_train, X_test, y_test, seed=42):
+    """Fit one candidate and score it on the held-out rows; runs in a joblib worker"""
+    model = RandomForestRegressor(random_state=seed, n_jobs=1, **params)
+    model.fit(X_train, y_train)
+    predictions = np.clip(model.predict(X_test), 0, 100)
+    return {
+        "params": params,
+        "model": model,
+        "mae": float(mean_absolute_error(y_test, predictions)),
+        "r2": float(r2_score(y_test, predictions)),
+        "nodes": model_size(model)
+    }
+
+def measure_latency(model, X, repeats=50):
+    """
+    Per-row inference latency in milliseconds
+
+    Returns the median time of a single-row predict, which is how the API
+    scores pages, and the amortized per-row time of one batched predict.
+    """
+    row = X[:1]
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    model.predict(X)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "single_row_ms": float(np.median(timings) * 1000),
+        "batch_row_ms": float(batch_seconds * 1000 / len(X))
+    }
+
+def search_models(X, y, grid=None, n_jobs=-1, test_size=0.2, seed=42, latency_repeats=50):
+    """
+    Fit every candidate in the grid in parallel and measure each one
+
+    Fitting is spread across cores with joblib. Latency is measured
+    afterwards, one model at a time, so the timings are not skewed by the
+    other fits competing for the same cores.
+
+    Returns:
+        list: One result dict per candidate, including the fitted model
+    """
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=seed)
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(fit_candidate)(params, X_train, y_train, X_test, y_test, seed) for params in (grid or CANDIDATE_GRID)
+    )
+
+    for result in results:
+        result.update(measure_latency(result["model"], X_test, repeats=latency_repeats))
+        result["bytes"] = len(pickle.dumps(result["model"]))
+    return results
+
+def select_model(results, target_mae=TARGET_MAE, latency_budget_ms=LATENCY_BUDGET_MS):
+    """
+    Pick the smallest model that meets the accuracy target and the latency budget
+
+    If no candidate meets both, the most accurate one is returned and the
+    selection is marked as not meeting its targets.
+
+    Returns:
+        tuple: (selected result dict, whether it met both targets)
+    """
+    eligible = [
+        result for result in results
+        if result["mae"] <= target_mae and result["single_row_ms"] <= latency_budget_ms
+    ]
+    if eligible:
+        return min(eligible, key=lambda result: (result["nodes"], result["single_row_ms"], result["mae"])), True
+    return min(results, key=lambda result: (result["mae"], result["nodes"])), False
+
+def build_report(results, selected, targets_met, dataset, target_mae=TARGET_MAE, latency_budget_ms=LATENCY_BUDGET_MS):
+    """JSON-serializable summary of the search, with the candidates ordered by size"""
+    def summary(result):
+        return {key: value for key, value in result.items() if key != "model"}
+
+    return {
+        "dataset": dataset,
+        "target_mae": target_mae,
+        "latency_budget_ms": latency_budget_ms,
+        "targets_met": targets_met,
+        "selected": summary(selected),
+        "candidates": [summary(result) for result in sorted(results, key=lambda result: result["nodes"])]
+    }
@@ -0,0 +1,117 @@
+import json
+import os
+import re
+from bisect import bisect_right
+
+OBSERVATION_WEIGHTS_PATH = os.getenv("OBSERVATION_WEIGHTS_PATH")
+OBSERVATION_SCORE_WEIGHT = float(os.getenv("OBSERVATION_SCORE_WEIGHT", 0.0))
+
+NEGATIVE_TERMS = {
+    "missing": 1.0, "lack": 1.0, "no ": 1.0, "poor": 1.0, "weak": 1.0, "confusing": 1.0, "unclear": 1.0,
+    "ineffective": 1.0, "absent": 1.0, "could be": 1.0, "should be": 1.0, "not": 1.0
+}
+POSITIVE_TERMS = {
+    "clear": 1.0, "effective": 1.0, "good": 1.0, "strong": 1.0, "well": 1.0, "present": 1.0,
+    "prominent": 1.0, "visible": 1.0, "professional": 1.0
+}
+SKIPPED_OBSERVATION = "unable to analyze"
+
+def _compile(terms):
+    # Longest terms first so the alternation reports the most specific match
+    return re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)))
+
+class ObservationScorer:
+    """
+    Keyword sentiment score for LLM observations
+
+    Each observation counts as negative if it contains any negative term,
+    otherwise as positive if it contains any positive term, and is weighted
+    by the heaviest matching term. The score is
+    base + spread * (positive / (positive + negative) - 0.5), so with the
+    default unit weights it matches the original screenshot heuristic.
+    """
+
+    def __init__(self, negative_terms=None, positive_terms=None, base=50, spread=30):
+        self.negative_terms = {term.lower(): weight for term, weight in (negative_terms or NEGATIVE_TERMS).items()}
+        self.positive_terms = {term.lower(): weight for term, weight in (positive_terms or POSITIVE_TERMS).items()}
+        self.base = base
+        self.spread = spread
+        self._negative = _compile(self.negative_terms)
+        self._positive = _compile(self.positive_terms)
+
+    def _match_weights(self, pattern, weights, blob, offsets, count):
+        """Scan the joined observations once and keep the heaviest match per observation"""
+        matched = [0.0] * count
+        for match in pattern.finditer(blob):
+            index = bisect_right(offsets, match.start()) - 1
+            matched[index] = max(matched[index], weights[match.group(0)])
+        return matched
+
+    def score_many(self, analyses):
+        """
+        Score many analyses in one pass over all of their observations
+
+        Args:
+            analyses: List of analysis dicts ({component: {"observations": [...]}})
+
+        Returns:
+            list: One score from 0-100 per analysis
+        """
+        owners = []
+        texts = []
+        for position, analysis in enumerate(analyses):
+            for component_analysis in analysis.values():
+                for observation in component_analysis.get('observations', []):
+                    lower_obs = str(observation).lower()
+                    if SKIPPED_OBSERVATION in lower_obs:
+                        continue
+                    owners.append(position)
+                    texts.append(lower_obs)
+
+        offsets = []
+        cursor = 0
+        for text in texts:
+            offsets.append(cursor)
+            cursor += len(text) + 1
+        blob = "\n".join(texts)
+
+        negative = self._match_weights(self._negative, self.negative_terms, blob, offsets, len(texts))
+        positive = self._match_weights(self._positive, self.positive_terms, blob, offsets, len(texts))
+
+        totals = [[0.0, 0.0] for _ in analyses]
+        for position, negative_weight, positive_weight in zip(owners, negative, positive):
+            if negative_weight:
+                totals[position][1] += negative_weight
+            elif positive_weight:
+                totals[position][0] += positive_weight
+
+        scores = []
+        for positive_total, negative_total in totals:
+            informative = positive_total + negative_total
+            if informative > 0:
+                score = self.base + self.spread * (positive_total / informative - 0.5)
+                scores.append(min(100, max(0, score)))
+            else:
+                scores.append(self.base)
+        return scores
+
+    def score(self, analysis):
+        return self.score_many([analysis])[0]
+
+def blend_scores(model_score, observation_score, weight=OBSERVATION_SCORE_WEIGHT):
+    """Mix the feature model score with the observation score; weight 0 keeps the model score"""
+    if model_score is None:
+        return observation_score
+    return max(0, min(100, (1 - weight) * model_score + weight * observation_score))
+
+def load_scorer(weights_path=OBSERVATION_WEIGHTS_PATH):
+    """Build a scorer from a {"negative": {...}, "positive": {...}} JSON file, or the defaults"""
+    if not weights_path:
+        return ObservationScorer()
+    try:
+        with open(weights_path) as f:
+            config = json.load(f)
+        return ObservationScorer(config.get('negative'), config.get('positive'))
+    except Exception as e:
+        print(f"Error loading observation weights: {str(e)}, using defaults")
+        return ObservationScorer()
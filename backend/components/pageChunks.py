@@ -0,0 +1,126 @@
+import os
+import re
+
+CHUNK_CHARS = int(os.getenv("CHUNK_CHARS", 3000))
+MAP_REDUCE_MAX_CHUNKS = int(os.getenv("MAP_REDUCE_MAX_CHUNKS", 8))
+MAP_REDUCE_MAX_OBSERVATIONS = int(os.getenv("MAP_REDUCE_MAX_OBSERVATIONS", 8))
+FALLBACK_PREFIXES = ("Error analyzing", "Unable to analyze")
+
+WORD_PATTERN = re.compile(r"\w+")
+
+def _split_long(text, limit):
+    """Split one oversized section at word boundaries"""
+    pieces = []
+    current = []
+    size = 0
+    for word in text.split():
+        if current and size + len(word) + 1 > limit:
+            pieces.append(" ".join(current))
+            current = []
+            size = 0
+        current.append(word)
+        size += len(word) + 1
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+def _fit_budget(sections, budget):
+    """
+    Trim sections so that together they fit in budget characters
+
+    The tails of the longest sections go first: every section is cut to an
+    equal share of the budget, and the room short sections leave is shared
+    among the long ones. Each section keeps its heading and opening text.
+    """
+    if sum(len(text) + 1 for text in sections) <= budget:
+        return list(sections)
+    remaining = budget
+    cap = None
+    lengths = sorted(len(text) + 1 for text in sections)
+    for index, length in enumerate(lengths):
+        share = remaining // (len(lengths) - index)
+        if length > share:
+            cap = max(share - 1, 0)
+            break
+        remaining -= length
+    trimmed = []
+    for text in sections:
+        if len(text) > cap:
+            cut = text[:cap + 1]
+            text = cut.rsplit(" ", 1)[0] if " " in cut else text[:cap]
+        if text:
+            trimmed.append(text)
+    return trimmed
+
+def pack_chunks(sections, chunk_chars=CHUNK_CHARS, max_chunks=MAP_REDUCE_MAX_CHUNKS):
+    """
+    Group consecutive section texts into chunks of at most chunk_chars
+
+    Sections are never split unless a single one is larger than a chunk.
+    When the page holds more than max_chunks chunks of text, sections are
+    trimmed first (see _fit_budget), so both the chunk size and the text
+    sent per page stay bounded.
+    """
+    limit = chunk_chars
+    if max_chunks:
+        sections = _fit_budget(sections, max_chunks * chunk_chars)
+
+    chunks = []
+    current = []
+    size = 0
+    for text in sections:
+        for piece in (_split_long(text, limit) if len(text) > limit else [text]):
+            if current and size + len(piece) + 1 > limit:
+                chunks.append("\n".join(current))
+                current = []
+                size = 0
+            current.append(piece)
+            size += len(piece) + 1
+    if current:
+        chunks.append("\n".join(current))
+    # Sections that do not fill their chunk can leave a little text past the cap
+    return chunks[:max_chunks] if max_chunks else chunks
+
+def _words(observation):
+    return set(WORD_PATTERN.findall(str(observation).lower()))
+
+def _is_duplicate(words, kept, threshold):
+    for other in kept:
+        union = words | other
+        if union and len(words & other) / len(union) >= threshold:
+            return True
+    return False
+
+def merge_analyses(analyses, components, missing_labels=None, max_observations=MAP_REDUCE_MAX_OBSERVATIONS,
+                   similarity_threshold=0.7):
+    """
+    Merge per-chunk analyses into one analysis
+
+    Observations are kept in chunk order and dropped when their words
+    overlap an already kept one by at least similarity_threshold (Jaccard).
+    Fallback observations from failed chunks only survive when every chunk
+    failed for that component, so the result is still recognized as
+    failed. A component no chunk mentioned gets a "not found" observation.
+    """
+    merged = {}
+    for component in components:
+        kept = []
+        kept_words = []
+        fallbacks = []
+        for analysis in analyses:
+            for observation in analysis.get(component, {}).get('observations', []):
+                if str(observation).startswith(FALLBACK_PREFIXES):
+                    fallbacks.append(observation)
+                    continue
+                words = _words(observation)
+                if not _is_duplicate(words, kept_words, similarity_threshold):
+                    kept.append(observation)
+                    kept_words.append(words)
+
+        if not kept and fallbacks:
+            kept = fallbacks[:1]
+        elif not kept:
+            label = (missing_labels or {}).get(component, component)
+            kept = [f"No {label} elements were found on the page"]
+        merged[component] = {"observations": kept[:max_observations]}
+    return merged
@@ -0,0 +1,207 @@
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from functools import wraps
+
+from flask import current_app, request
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0.0))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 50))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 40))
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Pipeline stages, matched against (file, function) entries of the profile.
+# Times are cumulative, so a stage includes everything it calls.
+STAGES = {
+    "html_parse": [("bs4/__init__.py", "__init__")],
+    "section_split": [("sectionCache.py", "split_sections")],
+    "feature_extraction": [("scoringModel.py", "extract_features_from_soup")],
+    "model_load": [("scoringModel.py", "load_model")],
+    "model_predict": [("sklearn/ensemble/_forest.py", "predict")],
+    "json": [("json/__init__.py", "loads"), ("json/__init__.py", "dumps")],
+    "llm_wait": [("generativeai/generative_models.py", "generate_content")]
+}
+
+class RequestProfiler:
+    """
+    Opt-in CPU and allocation profiles for individual requests
+
+    A request is profiled when it carries X-Profile-Token matching
+    PROFILE_TOKEN, or when it is picked by PROFILE_SAMPLE_RATE. Only one
+    request is profiled at a time; others run normally. Each profile is
+    saved under PROFILE_DIR as a JSON summary plus the raw pstats dump, and
+    the response carries its id in X-Profile-Id.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, token=PROFILE_TOKEN, sample_rate=PROFILE_SAMPLE_RATE,
+                 keep=PROFILE_KEEP, top_n=PROFILE_TOP_N):
+        self.directory = os.path.abspath(directory)
+        self.token = token
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.top_n = top_n
+        self._lock = threading.Lock()
+
+    def authorized(self, headers):
+        supplied = headers.get(PROFILE_HEADER, '')
+        return bool(self.token) and hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def wanted(self, headers):
+        return self.authorized(headers) or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def run(self, route, func, *args, **kwargs):
+        """Call func under the profiler; returns (result, profile id or None)"""
+        if not self._lock.acquire(blocking=False):
+            return func(*args, **kwargs), None
+
+        started_tracing = not tracemalloc.is_tracing()
+        try:
+            if started_tracing:
+                tracemalloc.start(10)
+            tracemalloc.reset_peak()
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                wall_seconds = time.perf_counter() - started
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                if started_tracing:
+                    tracemalloc.stop()
+
+            try:
+                profile_id = self.save(route, profiler, snapshot, peak, wall_seconds)
+            except Exception as e:
+                print(f"Error saving request profile: {str(e)}")
+                profile_id = None
+            return result, profile_id
+        finally:
+            self._lock.release()
+
+    def summarize(self, route, profiler, snapshot, peak, wall_seconds):
+        stats = pstats.Stats(profiler)
+        stages = {stage: 0.0 for stage in STAGES}
+        functions = []
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+            normalized = filename.replace(os.sep, '/')
+            for stage, matchers in STAGES.items():
+                if any(normalized.endswith(suffix) and name == function for suffix, function in matchers):
+                    stages[stage] += cumulative
+            functions.append({
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "own_seconds": round(own, 6),
+                "cumulative_seconds": round(cumulative, 6)
+            })
+        functions.sort(key=lambda entry: entry["cumulative_seconds"], reverse=True)
+
+        allocations = [
+            {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics('lineno')[:self.top_n]
+        ]
+
+        return {
+            "route": route,
+            "path": request.path,
+            "method": request.method,
+            "content_length": request.content_length,
+            "created_at": time.time(),
+            "wall_seconds": round(wall_seconds, 6),
+            "stages": {stage: round(seconds, 6) for stage, seconds in stages.items()},
+            "functions": functions[:self.top_n],
+            "peak_memory_bytes": peak,
+            "allocations": allocations
+        }
+
+    def save(self, route, profiler, snapshot, peak, wall_seconds):
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = uuid.uuid4().hex
+        summary = self.summarize(route, profiler, snapshot, peak, wall_seconds)
+        summary["id"] = profile_id
+        profiler.dump_stats(os.path.join(self.directory, f"{profile_id}.prof"))
+        with open(os.path.join(self.directory, f"{profile_id}.json"), 'w') as f:
+            json.dump(summary, f)
+        self.prune()
+        return profile_id
+
+    def prune(self):
+        """Keep only the newest PROFILE_KEEP profiles"""
+        summaries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in summaries[:max(0, len(summaries) - self.keep)]:
+            profile_id = entry.name[:-len('.json')]
+            for suffix in ('.json', '.prof'):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def path(self, profile_id, suffix='.json'):
+        """File of a saved profile, or None for an unknown or malformed id"""
+        if not PROFILE_ID_PATTERN.match(profile_id or ''):
+            return None
+        path = os.path.join(self.directory, profile_id + suffix)
+        return path if os.path.exists(path) else None
+
+    def load(self, profile_id):
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def list(self):
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                summary = self.load(entry.name[:-len('.json')])
+                if summary:
+                    profiles.append({key: summary[key] for key in ("id", "route", "path", "created_at", "wall_seconds")})
+        return sorted(profiles, key=lambda summary: summary["created_at"], reverse=True)
+
+    def text_report(self, profile_id, sort='cumulative'):
+        """Human-readable pstats listing of a saved profile"""
+        path = self.path(profile_id, '.prof')
+        if path is None:
+            return None
+        output = io.StringIO()
+        pstats.Stats(path, stream=output).sort_stats(sort).print_stats(self.top_n)
+        return output.getvalue()
+
+def profiled(profiler, route):
+    """
+    Route decorator that profiles the view when the request opts in
+
+    Streamed responses are profiled only up to the point the stream starts.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not profiler.wanted(request.headers):
+                return view(*args, **kwargs)
+            response, profile_id = profiler.run(route, view, *args, **kwargs)
+            response = current_app.make_response(response)
+            if profile_id:
+                response.headers['X-Profile-Id'] = profile_id
+            return response
+        return wrapper
+    return decorator
@@ -1,30 +1,51 @@
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 import joblib
+import hashlib
 import os
-from bs4 import BeautifulSoup
+from components.htmlParser import make_soup
 
 MODEL_PATH = "components/score_model.pkl"
 
+FEATURE_NAMES = ["cta_count", "hierarchy_score", "p_count", "lists", "testimonials"]
+FEATURE_WEIGHTS = [8, 7, 5, 5, 10]
+# (low, high) for each synthetic feature column, high exclusive as in np.random.randint
+FEATURE_RANGES = [(0, 6), (0, 15), (1, 20), (0, 4), (0, 2)]
+
+def generate_synthetic_dataset(n_samples=100, seed=42, noise=0.0):
+    """
+    Generate synthetic (features, score) training rows in one vectorized pass
+    
+    Args:
+        n_samples: Number of rows to generate
+        seed: Random seed, so the same arguments always give the same data
+        noise: Standard deviation of Gaussian noise added to the scores
+        
+    Returns:
+        tuple: (X, y) arrays of shape (n_samples, 5) and (n_samples,)
+    """
+    rng = np.random.RandomState(seed)
+    lows = np.array([low for low, _ in FEATURE_RANGES])
+    highs = np.array([high for _, high in FEATURE_RANGES])
+    X = rng.randint(lows, highs, size=(n_samples, len(FEATURE_RANGES))).astype(float)
+
+    base_score = 40
+    weighted_sum = X.dot(FEATURE_WEIGHTS)
+    max_possible = np.array(FEATURE_WEIGHTS).dot([5, 15, 20, 3, 1])
+    y = base_score + (weighted_sum / max_possible) * 60
+    if noise:
+        y = np.clip(y + rng.normal(0, noise, n_samples), 0, 100)
+    
+    return X, y
+
+# A small forest is enough for the 100-row bootstrap data; train_model.py selects the production model
+DUMMY_MODEL_PARAMS = {"n_estimators": 10, "max_depth": 8}
+
 def train_dummy_model():
     """Create a realistic dummy model with sensible weightings"""
-    np.random.seed(42)
-    X = np.zeros((100, 5))
-    for i in range(100):
-        X[i, 0] = np.random.randint(0, 6)   
-        X[i, 1] = np.random.randint(0, 15)  
-        X[i, 2] = np.random.randint(1, 20)  
-        X[i, 3] = np.random.randint(0, 4)    
-        X[i, 4] = np.random.randint(0, 2)    
-
-    weights = [8, 7, 5, 5, 10]
-    base_score = 40  
-    
-    weighted_sum = X.dot(weights)
-    max_possible = np.array(weights).dot([5, 15, 20, 3, 1])  
-    y = base_score + (weighted_sum / max_possible) * 60  
-    
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
+    X, y = generate_synthetic_dataset(100, seed=42)
+    
+    model = RandomForestRegressor(random_state=42, **DUMMY_MODEL_PARAMS)
     model.fit(X, y)
     
     os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
@@ -32,15 +53,44 @@ def train_dummy_model():
     
     return model
 
+def ensure_model():
+    """
+    Train the dummy model only when no model has been saved yet
+    
+    Returns:
+        bool: Whether a dummy model was created
+    """
+    if os.path.exists(MODEL_PATH):
+        return False
+    train_dummy_model()
+    return True
+
 def load_model():
     if not os.path.exists(MODEL_PATH):
         return train_dummy_model()
     return joblib.load(MODEL_PATH)
 
+_model_versions = {}
+
+def model_version(path=None):
+    """Short content hash of the saved model, so results can be tied to the model that scored them"""
+    path = path or MODEL_PATH
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _model_versions:
+        with open(path, 'rb') as f:
+            _model_versions[key] = hashlib.sha256(f.read()).hexdigest()[:12]
+    return _model_versions[key]
+
 def extract_features_from_html(html):
     """Extract website features from HTML content"""
-    soup = BeautifulSoup(html, 'html.parser')
-    
+    return extract_features_from_soup(make_soup(html))
+
+def extract_features_from_soup(soup):
+    """Extract website features from an already parsed document"""
     ctas = soup.find_all(['button', 'a'])
     cta_count = len(ctas)
     
@@ -90,6 +140,34 @@ def predict_score(features=None, html=None):
     
     return max(0, min(100, score))
 
+def predict_scores(features_list, model=None):
+    """
+    Predict landing page scores for many pages with a single model call
+    
+    Args:
+        features_list: List of pre-extracted feature lists
+        model: Optional already loaded model, for callers scoring many batches
+        
+    Returns:
+        scores: List of float scores from 0-100, in input order
+    """
+    if not features_list:
+        return []
+        
+    if model is None:
+        model = load_model()
+    X = np.array(features_list, dtype=float).reshape(len(features_list), -1)
+    
+    if X.shape[1] != 5:
+        if X.shape[1] < 5:
+            X = np.pad(X, ((0, 0), (0, 5 - X.shape[1])), 'constant')
+        else:
+            X = X[:, :5]
+    
+    scores = model.predict(X)
+    
+    return [max(0, min(100, float(score))) for score in scores]
+
 def train_from_user_data(html, user_score, user_feedback=None):
     """
     Train the model with user-provided data and feedback
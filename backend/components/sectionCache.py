@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import re
+import time
+
+from bs4 import Comment, NavigableString, Tag
+
+from components.sqliteConnection import connect
+
+SECTION_CACHE_DB_PATH = os.getenv("SECTION_CACHE_DB_PATH", "data/sections.sqlite3")
+
+SECTION_HEADINGS = ('h1', 'h2', 'h3')
+CTA_TAGS = ('a', 'button')
+SKIPPED_TAGS = ('script', 'style', 'noscript', 'template')
+TRUST_PATTERN = re.compile(
+    r"testimonial|review|rated|rating|guarantee|secure|certified|trusted|award|customers|clients|partners|★",
+    re.IGNORECASE
+)
+
+def _digest(value):
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()[:16]
+
+def _iter_sections(soup):
+    """Walk the page once, yielding each heading-delimited section's heading, visible text and CTAs"""
+    current = {"heading": "", "level": None, "text": [], "ctas": []}
+    root = soup.body or soup
+    for node in root.descendants:
+        if isinstance(node, Tag):
+            if node.name in SECTION_HEADINGS:
+                yield current
+                current = {"heading": node.get_text(" ", strip=True), "level": node.name, "text": [], "ctas": []}
+            elif node.name in CTA_TAGS:
+                current["ctas"].append(f"{node.get_text(' ', strip=True)}->{node.get('href', '')}")
+        elif isinstance(node, NavigableString) and not isinstance(node, Comment):
+            if node.parent is not None and node.parent.name in SKIPPED_TAGS:
+                continue
+            text = node.strip()
+            if text:
+                current["text"].append(text)
+    yield current
+
+def split_sections(soup):
+    """
+    Split a parsed page into heading-delimited sections
+
+    Each section records the heading that opens it, a fingerprint of its
+    text and CTA labels, and which analysis components it feeds.
+    """
+    sections = []
+    for section in _iter_sections(soup):
+        text = " ".join(section["text"])
+        if not text and not section["heading"] and not section["ctas"]:
+            continue
+        components = ["copy_effectiveness"]
+        if section["ctas"]:
+            components.append("cta")
+        if TRUST_PATTERN.search(text):
+            components.append("trust_signals")
+        sections.append({
+            "heading": section["heading"],
+            "level": section["level"],
+            "fingerprint": _digest("\x1f".join([section["heading"], text, "|".join(section["ctas"])])),
+            "components": components
+        })
+    return sections
+
+def section_texts(soup):
+    """Visible text of each section, in page order; the heading text opens its section"""
+    texts = []
+    for section in _iter_sections(soup):
+        text = " ".join(section["text"])
+        if text:
+            texts.append(text)
+    return texts
+
+def outline_fingerprint(sections):
+    """Fingerprint of the heading structure, which is what drives visual hierarchy"""
+    return _digest("|".join(f"{section['level']}:{section['heading']}" for section in sections))
+
+def changed_components(old_sections, new_sections):
+    """Return the components whose underlying sections were added, removed or edited"""
+    old_prints = [section["fingerprint"] for section in old_sections]
+    new_prints = [section["fingerprint"] for section in new_sections]
+
+    changed = set()
+    for section in old_sections:
+        if section["fingerprint"] not in new_prints:
+            changed.update(section["components"])
+    for section in new_sections:
+        if section["fingerprint"] not in old_prints:
+            changed.update(section["components"])
+    if outline_fingerprint(old_sections) != outline_fingerprint(new_sections):
+        changed.add("visual_hierarchy")
+    return changed
+
+class SectionCache:
+    """Last analysis of each page, with its section fingerprints, keyed by URL"""
+
+    def __init__(self, db_path=SECTION_CACHE_DB_PATH):
+        self.db_path = os.path.abspath(db_path)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS page_sections (
+                    page_key TEXT PRIMARY KEY,
+                    sections TEXT NOT NULL,
+                    category TEXT,
+                    analysis TEXT NOT NULL,
+                    suggestions TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return connect(self.db_path)
+
+    def get(self, page_key):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT sections, category, analysis, suggestions FROM page_sections WHERE page_key = ?",
+                (page_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "sections": json.loads(row[0]),
+            "category": row[1],
+            "analysis": json.loads(row[2]),
+            "suggestions": json.loads(row[3])
+        }
+
+    def put(self, page_key, sections, category, analysis, suggestions):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO page_sections VALUES (?, ?, ?, ?, ?, ?)",
+                (page_key, json.dumps(sections), category, json.dumps(analysis), json.dumps(suggestions), time.time())
+            )
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from components.sqliteConnection import connect
+
+SIMILARITY_DB_PATH = os.getenv("SIMILARITY_DB_PATH", "data/similarity.sqlite3")
+SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", 0.92))
+SIMILARITY_MIN_TOKENS = int(os.getenv("SIMILARITY_MIN_TOKENS", 50))
+SIMHASH_BITS = 64
+# Pages within SIMHASH_BANDS - 1 differing bits always share a band, so
+# lookups are exact for thresholds down to 1 - (SIMHASH_BANDS - 1) / 64
+SIMHASH_BANDS = 6
+SHINGLE_SIZE = 3
+
+WORD_PATTERN = re.compile(r"\w+")
+
+def shingles(text, size=SHINGLE_SIZE):
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+def simhash(text):
+    """
+    64-bit SimHash of the text's word shingles, or None for very short texts
+
+    Texts that differ in a few words differ in only a few bits.
+    """
+    tokens = shingles(text)
+    if len(tokens) < SIMILARITY_MIN_TOKENS:
+        return None
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big') for token in set(tokens)],
+        dtype=np.uint64
+    )
+    bits = (hashes[:, None] >> np.arange(SIMHASH_BITS, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(hashes)
+    value = 0
+    for position in np.flatnonzero(votes > 0):
+        value |= 1 << int(position)
+    return value
+
+def similarity(first, second):
+    """Share of SimHash bits two pages agree on, from 0 to 1"""
+    return 1 - bin(first ^ second).count("1") / SIMHASH_BITS
+
+def band_values(value, bands=SIMHASH_BANDS):
+    """Split a SimHash into bands of nearly equal width; returns [(band, band value)]"""
+    edges = np.linspace(0, SIMHASH_BITS, bands + 1).astype(int)
+    return [(band, (value >> int(start)) & ((1 << int(end - start)) - 1))
+            for band, (start, end) in enumerate(zip(edges[:-1], edges[1:]))]
+
+def _signed(value):
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+class SimilarityIndex:
+    """
+    Analyses of past pages, findable by text similarity
+
+    Each page's SimHash is split into bands and every band is indexed, so a
+    lookup only compares against pages sharing at least one band instead of
+    scanning the whole store.
+    """
+
+    def __init__(self, db_path=SIMILARITY_DB_PATH, threshold=SIMILARITY_THRESHOLD):
+        self.db_path = os.path.abspath(db_path)
+        self.threshold = threshold
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS similar_pages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    page_key TEXT,
+                    simhash INTEGER NOT NULL,
+                    category TEXT,
+                    analysis TEXT NOT NULL,
+                    suggestions TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS similar_page_bands (
+                    band INTEGER NOT NULL,
+                    value INTEGER NOT NULL,
+                    page_id INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_similar_page_bands ON similar_page_bands (band, value)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_similar_pages_key ON similar_pages (page_key)")
+
+    def _connect(self):
+        return connect(self.db_path)
+
+    def find(self, value):
+        """
+        Most similar stored page at or above the threshold
+
+        Returns:
+            dict: The stored analysis with page_key and similarity, or None
+        """
+        if value is None:
+            return None
+        bands = band_values(value)
+        clause = " OR ".join("(band = ? AND value = ?)" for _ in bands)
+        params = [item for pair in bands for item in pair]
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""SELECT id, page_key, simhash, category, analysis, suggestions FROM similar_pages
+                    WHERE id IN (SELECT page_id FROM similar_page_bands WHERE {clause})""",
+                params
+            ).fetchall()
+
+        best = None
+        for page_id, page_key, stored, category, analysis, suggestions in rows:
+            score = similarity(value, stored % (1 << 64))
+            if score >= self.threshold and (best is None or score > best["similarity"]):
+                best = {
+                    "page_key": page_key,
+                    "similarity": score,
+                    "category": category,
+                    "analysis": json.loads(analysis),
+                    "suggestions": json.loads(suggestions)
+                }
+        return best
+
+    def add(self, value, page_key, category, analysis, suggestions):
+        """Store an analysis; a page_key replaces that page's earlier entry"""
+        if value is None:
+            return
+        with self._connect() as conn:
+            if page_key:
+                old = [row[0] for row in conn.execute("SELECT id FROM similar_pages WHERE page_key = ?", (page_key,))]
+                conn.executemany("DELETE FROM similar_page_bands WHERE page_id = ?", [(page_id,) for page_id in old])
+                conn.execute("DELETE FROM similar_pages WHERE page_key = ?", (page_key,))
+            cursor = conn.execute(
+                "INSERT INTO similar_pages (page_key, simhash, category, analysis, suggestions, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (page_key, _signed(value), category, json.dumps(analysis), json.dumps(suggestions), time.time())
+            )
+            conn.executemany(
+                "INSERT INTO similar_page_bands (band, value, page_id) VALUES (?, ?, ?)",
+                [(band, band_value, cursor.lastrowid) for band, band_value in band_values(value)]
+            )
@@ -0,0 +1,215 @@
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib import robotparser
+from urllib.parse import urljoin, urldefrag, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from components.htmlParser import make_soup, visible_text
+from components.scoringModel import extract_features_from_soup
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Fetches allowed per returned page when no explicit budget is given; errors,
+# redirects and duplicates all use up fetches without adding pages
+FETCHES_PER_PAGE = 3
+
+# Links to these are never landing pages, so they are not worth a fetch
+SKIPPED_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico',
+    '.css', '.js', '.json', '.xml', '.zip', '.gz', '.mp4', '.mp3', '.woff', '.woff2'
+)
+
+def create_session(pool_size):
+    """Create a requests session whose connection pool matches the crawl concurrency"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT})
+    return session
+
+def _host(url):
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+def normalize_url(url):
+    """Drop fragments and normalize an empty path so the same page is only queued once"""
+    url, _ = urldefrag(url)
+    parsed = urlparse(url)
+    path = parsed.path or '/'
+    normalized = f"{parsed.scheme}://{parsed.netloc.lower()}{path}"
+    if parsed.query:
+        normalized += f"?{parsed.query}"
+    return normalized
+
+def load_robots(session, root_url, timeout):
+    """Fetch and parse robots.txt for the crawl root; unreachable files allow everything"""
+    parsed = urlparse(root_url)
+    parser = robotparser.RobotFileParser()
+    parser.set_url(f"{parsed.scheme}://{parsed.netloc}/robots.txt")
+    try:
+        response = session.get(parser.url, timeout=timeout)
+        if response.status_code in (401, 403):
+            parser.disallow_all = True
+        elif response.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(response.text.splitlines())
+    except Exception as e:
+        print(f"Could not fetch robots.txt for {root_url}: {str(e)}")
+        parser.allow_all = True
+    return parser
+
+def discover_links(soup, base_url, host):
+    """Return same-domain page links found in a parsed document"""
+    links = []
+    for anchor in soup.find_all('a', href=True):
+        href = anchor['href'].strip()
+        if not href or href.startswith(('mailto:', 'tel:', 'javascript:')):
+            continue
+        url = normalize_url(urljoin(base_url, href))
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or _host(url) != host:
+            continue
+        if parsed.path.lower().endswith(SKIPPED_EXTENSIONS):
+            continue
+        links.append(url)
+    return links
+
+def _fetch_page(session, url, host, robots, timeout):
+    """Fetch one page; returns (url, final_url, html, error, blocked)"""
+    try:
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        final_url = normalize_url(response.url or url)
+        if final_url != url:
+            if _host(final_url) != host:
+                return url, final_url, None, f"Redirected off-site to {final_url}", False
+            if not robots.can_fetch(USER_AGENT, final_url):
+                return url, final_url, None, None, True
+        if 'html' not in response.headers.get('Content-Type', 'text/html'):
+            return url, final_url, None, "Not an HTML page", False
+        return url, final_url, response.text, None, False
+    except Exception as e:
+        return url, url, None, str(e), False
+
+def _parse_page(url, html, host):
+    """Parse a page once and derive its features, links and visible text from the same soup"""
+    soup = make_soup(html)
+    features = extract_features_from_soup(soup)
+    links = discover_links(soup, url, host)
+    text = visible_text(soup)
+    return features, text, links
+
+def crawl_site(root_url, max_pages=20, max_workers=8, timeout=10, max_fetches=None):
+    """
+    Crawl same-domain pages breadth-first starting from a root URL
+
+    Args:
+        root_url: URL the crawl starts from
+        max_pages: Maximum number of unique pages to return
+        max_workers: Number of pages fetched concurrently
+        timeout: Per-request timeout in seconds
+        max_fetches: Maximum number of page fetches, whatever they return;
+                     defaults to FETCHES_PER_PAGE per page
+
+    Returns:
+        dict: Unique pages (url, text, features), duplicate pages, fetch
+              errors, URLs disallowed by robots.txt and the fetch count
+    """
+    if max_fetches is None:
+        max_fetches = max_pages * FETCHES_PER_PAGE
+    root_url = normalize_url(root_url)
+    host = _host(root_url)
+    session = create_session(max_workers)
+    robots = load_robots(session, root_url, timeout)
+
+    pages = []
+    duplicates = []
+    errors = []
+    blocked = []
+    seen_urls = {root_url}
+    seen_content = {}
+    fetched_urls = set()
+    fetches = 0
+    frontier = deque([root_url])
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while frontier and len(pages) < max_pages and fetches < max_fetches:
+                # Only fill the slots still open; anything left over stays queued
+                # for the next round in case this batch yields errors or duplicates
+                batch = []
+                slots = min(max_pages - len(pages), max_fetches - fetches)
+                while frontier and len(batch) < slots:
+                    url = frontier.popleft()
+                    if robots.can_fetch(USER_AGENT, url):
+                        batch.append(url)
+                    else:
+                        blocked.append(url)
+                fetches += len(batch)
+
+                fetch = lambda u: _fetch_page(session, u, host, robots, timeout)
+                for url, final_url, html, error, is_blocked in executor.map(fetch, batch):
+                    if is_blocked:
+                        blocked.append(final_url)
+                        continue
+                    if error:
+                        errors.append({"url": url, "error": error})
+                        continue
+                    if final_url in fetched_urls:
+                        duplicates.append({"url": url, "duplicate_of": final_url})
+                        continue
+                    seen_urls.add(final_url)
+                    fetched_urls.add(final_url)
+
+                    features, text, links = _parse_page(final_url, html, host)
+                    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+                    if digest in seen_content:
+                        # Same content as a page already crawled, so its links are too
+                        duplicates.append({"url": final_url, "duplicate_of": seen_content[digest]})
+                        continue
+                    if len(pages) < max_pages:
+                        seen_content[digest] = final_url
+                        pages.append({"url": final_url, "text": text, "features": features})
+
+                    for link in links:
+                        if link not in seen_urls:
+                            seen_urls.add(link)
+                            frontier.append(link)
+    finally:
+        session.close()
+
+    return {
+        "pages": pages,
+        "duplicates": duplicates,
+        "errors": errors,
+        "blocked": blocked,
+        "fetches": fetches
+    }
+
+def select_representative_pages(pages, scores, limit):
+    """
+    Pick a subset of pages that spans the score range for the LLM stages
+
+    The root page is always included; the rest are spread evenly over the
+    pages ordered by score so both weak and strong pages get analyzed.
+    """
+    if limit <= 0 or not pages:
+        return []
+    if len(pages) <= limit:
+        return list(range(len(pages)))
+
+    selected = [0]
+    ranked = sorted(range(1, len(pages)), key=lambda i: scores[i])
+    remaining = limit - 1
+    if remaining > 0:
+        step = (len(ranked) - 1) / max(remaining - 1, 1)
+        for n in range(remaining):
+            index = ranked[int(round(n * step))] if remaining > 1 else ranked[len(ranked) // 2]
+            if index not in selected:
+                selected.append(index)
+    return selected
@@ -0,0 +1,19 @@
+import sqlite3
+from contextlib import contextmanager
+
+@contextmanager
+def connect(db_path, timeout=30):
+    """
+    Connection that commits on success and is always closed on exit
+
+    sqlite3 connections are only freed by the cyclic garbage collector, so
+    relying on `with sqlite3.connect(...)` leaves them open. Job workers
+    forked with open connections then close them from the child and break
+    the parent's locks ("disk I/O error").
+    """
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", 1024 * 1024))
+# Largest whole request body: an image and an HTML file at the upload limit plus form fields
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", 2 * MAX_UPLOAD_BYTES + 1024 * 1024))
+CHUNK_SIZE = 64 * 1024
+
+class UploadTooLarge(Exception):
+    """Raised when an uploaded image or HTML document exceeds MAX_UPLOAD_BYTES"""
+
+    def __init__(self, limit):
+        super().__init__(f"Upload exceeds the {limit} byte limit")
+        self.limit = limit
+
+def spool_stream(stream, limit=MAX_UPLOAD_BYTES, declared_length=None):
+    """
+    Copy a request body into a spooled buffer in fixed-size chunks
+
+    Small bodies stay in memory, larger ones spill to a temporary file, so
+    a large upload is never held as several in-memory copies. The declared
+    Content-Length is checked before anything is read.
+    """
+    if declared_length is not None and declared_length > limit:
+        raise UploadTooLarge(limit)
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    total = 0
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > limit:
+                raise UploadTooLarge(limit)
+            spooled.write(chunk)
+    except Exception:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return spooled
+
+def read_upload(stream, limit=MAX_UPLOAD_BYTES, declared_length=None):
+    """
+    Read an upload into a single bytes object, enforcing the size limit
+
+    Unseekable streams such as a raw request body are read in CHUNK_SIZE
+    pieces, and reading stops as soon as the limit is passed.
+    """
+    if hasattr(stream, 'seek') and hasattr(stream, 'tell'):
+        try:
+            # Multipart files are already spooled by werkzeug; measure instead of copying
+            stream.seek(0, os.SEEK_END)
+            size = stream.tell()
+            stream.seek(0)
+            if size > limit:
+                raise UploadTooLarge(limit)
+            return stream.read()
+        except (OSError, ValueError):
+            pass
+
+    if declared_length is not None and declared_length > limit:
+        raise UploadTooLarge(limit)
+    body = bytearray()
+    while True:
+        chunk = stream.read(min(CHUNK_SIZE, limit + 1 - len(body)))
+        if not chunk:
+            return bytes(body)
+        body += chunk
+        if len(body) > limit:
+            raise UploadTooLarge(limit)
@@ -0,0 +1,134 @@
+"""
+Check that a fast HTML parser backend gives the same results as html.parser.
+
+Every page of a corpus is parsed with both the candidate backend and the
+reference html.parser. The script compares the scoring feature vectors and
+the extracted visible text, and reports pages outside the tolerances and
+the parse time of each backend. It exits with status 1 if any page differs.
+
+The service parses with html.parser unless PARSER_BACKEND names another
+backend. Fast backends are not in requirements.txt; install one and run
+this check on a corpus of production pages before switching to it.
+
+Usage:
+    pip install lxml
+    python parser_parity.py CORPUS_DIR_OR_TARBALL --backend lxml
+"""
+
+import argparse
+import json
+import sys
+import time
+from difflib import SequenceMatcher
+
+from bulk_score import iter_documents
+from components.htmlParser import REFERENCE_BACKEND, backend_available, make_soup, resolve_backend, visible_text
+from components.scoringModel import FEATURE_NAMES, extract_features_from_soup
+
+# Largest allowed absolute difference of any feature
+FEATURE_TOLERANCE = 0
+# Smallest allowed word-level similarity of the extracted texts, from 0 to 1
+TEXT_SIMILARITY = 0.99
+
+def parse(html, backend):
+    """Returns (features, text, seconds) for one backend"""
+    started = time.perf_counter()
+    soup = make_soup(html, backend)
+    features = extract_features_from_soup(soup)
+    text = visible_text(soup)
+    return features, text, time.perf_counter() - started
+
+def text_similarity(first, second):
+    if first == second:
+        return 1.0
+    return SequenceMatcher(None, first.split(), second.split(), autojunk=False).ratio()
+
+def compare_document(html, backend, reference=REFERENCE_BACKEND,
+                     feature_tolerance=FEATURE_TOLERANCE, min_text_similarity=TEXT_SIMILARITY):
+    """
+    Parse one page with both backends
+
+    Returns:
+        dict: Feature differences, text similarity, timings and whether the page is within tolerance
+    """
+    features, text, seconds = parse(html, backend)
+    reference_features, reference_text, reference_seconds = parse(html, reference)
+    differences = {name: value - expected
+                   for name, value, expected in zip(FEATURE_NAMES, features, reference_features)
+                   if abs(value - expected) > feature_tolerance}
+    similarity = text_similarity(text, reference_text)
+    return {
+        "matches": not differences and similarity >= min_text_similarity,
+        "feature_differences": differences,
+        "text_similarity": round(similarity, 4),
+        "seconds": seconds,
+        "reference_seconds": reference_seconds
+    }
+
+def check_corpus(corpus, backend, reference=REFERENCE_BACKEND,
+                 feature_tolerance=FEATURE_TOLERANCE, min_text_similarity=TEXT_SIMILARITY):
+    """
+    Compare every page of a directory or tarball
+
+    Returns:
+        dict: Page counts, the mismatching pages and total parse time per backend
+    """
+    pages = 0
+    seconds = reference_seconds = 0.0
+    mismatches = []
+    for doc_id, path, content in iter_documents(corpus):
+        if content is None:
+            with open(path, 'rb') as f:
+                content = f.read()
+        result = compare_document(content, backend, reference, feature_tolerance, min_text_similarity)
+        pages += 1
+        seconds += result["seconds"]
+        reference_seconds += result["reference_seconds"]
+        if not result["matches"]:
+            mismatches.append({
+                "id": doc_id,
+                "feature_differences": result["feature_differences"],
+                "text_similarity": result["text_similarity"]
+            })
+
+    return {
+        "backend": backend,
+        "reference": reference,
+        "pages": pages,
+        "mismatched": len(mismatches),
+        "mismatches": mismatches,
+        "seconds": round(seconds, 3),
+        "reference_seconds": round(reference_seconds, 3),
+        "speedup": round(reference_seconds / seconds, 2) if seconds else None
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare an HTML parser backend against html.parser on a corpus")
+    parser.add_argument("corpus", help="Directory of .html/.htm files or a tar archive of them")
+    parser.add_argument("--backend", default=resolve_backend("auto"),
+                        help="Backend to check (default: the fastest installed one)")
+    parser.add_argument("--reference", default=REFERENCE_BACKEND, help="Backend to compare against")
+    parser.add_argument("--feature-tolerance", type=float, default=FEATURE_TOLERANCE,
+                        help="Largest allowed absolute difference of any feature")
+    parser.add_argument("--text-similarity", type=float, default=TEXT_SIMILARITY,
+                        help="Smallest allowed similarity of the extracted texts, 0-1")
+    parser.add_argument("--report", help="Also write the full JSON report to this file")
+    args = parser.parse_args(argv)
+
+    for backend in (args.backend, args.reference):
+        if not backend_available(backend):
+            print(f"HTML parser backend {backend} is not installed")
+            return 2
+
+    report = check_corpus(args.corpus, args.backend, args.reference, args.feature_tolerance, args.text_similarity)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    for mismatch in report["mismatches"]:
+        print(f"{mismatch['id']}: features {mismatch['feature_differences']}, text similarity {mismatch['text_similarity']}")
+    print(f"{report['mismatched']} of {report['pages']} pages differ; {args.backend} {report['seconds']}s, "
+          f"{args.reference} {report['reference_seconds']}s")
+    return 1 if report["mismatched"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Re-score every stored feature vector with the current scoring model.
+
+Feature vectors are kept in a columnar store (see
+components/featureStore.py) by the service and by bulk_score.py, so a new
+model can be applied to the whole history without re-fetching or
+re-parsing a single page. Scores are written per model version.
+
+Usage:
+    python rescore.py --import-history
+"""
+
+import argparse
+import json
+import sys
+
+import joblib
+
+from components.analysisHistory import HISTORY_DB_PATH
+from components.featureStore import FEATURE_STORE_DIR, RESCORE_CHUNK_ROWS, FeatureStore, rescore
+from components.scoringModel import MODEL_PATH, model_version
+from components.sqliteConnection import connect
+
+def import_history(store, db_path=HISTORY_DB_PATH, batch_size=10000):
+    """Copy feature vectors from the analysis history that the store does not have yet; returns the count"""
+    known = set(store.ids())
+    imported = 0
+    with connect(db_path) as conn:
+        cursor = conn.execute("SELECT id, features FROM analyses WHERE features IS NOT NULL ORDER BY id")
+        while True:
+            rows = [(f"history:{row_id}", json.loads(features)) for row_id, features in cursor.fetchmany(batch_size)]
+            if not rows:
+                break
+            rows = [row for row in rows if row[0] not in known]
+            store.append([row_id for row_id, _ in rows], [features for _, features in rows])
+            imported += len(rows)
+    return imported
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score stored feature vectors with the current model")
+    parser.add_argument("--store", default=FEATURE_STORE_DIR, help="Feature store directory")
+    parser.add_argument("--model", default=MODEL_PATH, help="Model file to score with")
+    parser.add_argument("--chunk-rows", type=int, default=RESCORE_CHUNK_ROWS, help="Rows per predict call")
+    parser.add_argument("--import-history", action="store_true", help="First add vectors from the analysis history")
+    parser.add_argument("--history-db", default=HISTORY_DB_PATH, help="Analysis history to import from")
+    args = parser.parse_args(argv)
+
+    store = FeatureStore(args.store)
+    if args.import_history:
+        print(f"Imported {import_history(store, args.history_db)} vectors from the analysis history")
+
+    summary = rescore(store, joblib.load(args.model), model_version(args.model), args.chunk_rows)
+    print(json.dumps(summary))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
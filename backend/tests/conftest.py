@@ -0,0 +1,102 @@
+import importlib
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The service imports its modules as `components.*` relative to backend/
+sys.path.insert(0, BACKEND_DIR)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Stands in for genai.GenerativeModel and answers each prompt type with canned JSON"""
+
+    prompts = []
+    contents = []
+    options = []
+    lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def generate_content(self, contents, **kwargs):
+        # google-generativeai 0.3.1 (as pinned) only knows these keyword arguments
+        unknown = set(kwargs) - {"generation_config", "safety_settings", "stream"}
+        if unknown:
+            raise ValueError(f"Unknown field for GenerateContentRequest: {', '.join(sorted(unknown))}")
+        prompt = contents if isinstance(contents, str) else contents[0]
+        with self.lock:
+            self.prompts.append(prompt)
+            self.contents.append(contents)
+            self.options.append(kwargs)
+        requested = [key for key in ("cta", "visual_hierarchy", "copy_effectiveness", "trust_signals")
+                     if f'"{key}"' in prompt]
+        if "Return ONLY the category name" in prompt:
+            return FakeResponse("SaaS")
+        if "high_priority" in prompt:
+            return FakeResponse(json.dumps({
+                key: {"high_priority": [f"Improve {key}", "Test it"], "additional": ["Iterate"]}
+                for key in requested
+            }))
+        return FakeResponse(json.dumps({
+            key: {"observations": [f"{key} is clear", f"{key} is missing detail"]} for key in requested
+        }))
+
+
+class ConstantModel:
+    def predict(self, X):
+        return [60.0 for _ in range(len(X))]
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """Import backend/app.py without touching the repo's model file or the real Gemini API"""
+    os.environ["GEMINI_API_KEY"] = ""
+    previous = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("app"))
+    try:
+        module = importlib.import_module("app")
+    finally:
+        os.chdir(previous)
+    return module
+
+
+@pytest.fixture
+def analyzer(app_module, monkeypatch, tmp_path):
+    from components import scoringModel
+    from components.admissionControl import AdmissionController
+    from components.analysisHistory import AnalysisHistory
+    from components.featureStore import FeatureStore
+    from components.categoryClassifier import CategoryClassifier, LabelStore
+    from components.sectionCache import SectionCache
+    from components.similarityIndex import SimilarityIndex
+
+    FakeGenerativeModel.prompts = []
+    FakeGenerativeModel.contents = []
+    FakeGenerativeModel.options = []
+    monkeypatch.setattr(app_module, "section_cache", SectionCache(str(tmp_path / "sections.sqlite3")))
+    monkeypatch.setattr(app_module, "analysis_history", AnalysisHistory(str(tmp_path / "history.sqlite3")))
+    monkeypatch.setattr(app_module, "feature_store", FeatureStore(str(tmp_path / "features")))
+    monkeypatch.setattr(app_module, "similarity_index", SimilarityIndex(str(tmp_path / "similarity.sqlite3")))
+    monkeypatch.setattr(app_module, "category_labels", LabelStore(str(tmp_path / "labels.sqlite3")))
+    monkeypatch.setattr(app_module, "category_classifier", CategoryClassifier(str(tmp_path / "category_model.pkl")))
+    for name in list(app_module.admission):
+        monkeypatch.setitem(app_module.admission, name, AdmissionController(name))
+    monkeypatch.setattr(app_module, "has_valid_api_key", True)
+    monkeypatch.setattr(app_module.genai, "GenerativeModel", FakeGenerativeModel)
+    monkeypatch.setattr(scoringModel, "load_model", lambda: ConstantModel())
+    return app_module
+
+
+@pytest.fixture
+def client(analyzer):
+    return analyzer.app.test_client()
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+
+from components.admissionControl import AdmissionController, AdmissionRejected
+
+
+def start_waiter(controller, client, order):
+    """Queue a request on a thread and record when it is admitted"""
+    admitted = threading.Event()
+
+    def run():
+        started_at = controller.acquire(client)
+        order.append(client)
+        admitted.set()
+        release.wait(5)
+        controller.release(client, started_at)
+
+    release = threading.Event()
+    threading.Thread(target=run, daemon=True).start()
+    return admitted, release
+
+
+def wait_until(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.005)
+
+
+def test_admits_up_to_limits():
+    controller = AdmissionController("t", max_concurrent=2, max_queue=0, client_concurrent=2, client_queue=1)
+
+    first = controller.acquire("a")
+    controller.acquire("b")
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("c")
+    assert rejected.value.status == 503
+    assert rejected.value.retry_after >= 1
+
+    controller.release("a", first)
+    controller.acquire("c")
+
+
+def test_per_client_queue_limit_returns_429():
+    controller = AdmissionController("t", max_concurrent=1, max_queue=10, client_concurrent=1, client_queue=1,
+                                     queue_timeout=5)
+    held = controller.acquire("heavy")
+    order = []
+    start_waiter(controller, "heavy", order)
+    wait_until(lambda: controller.queued == 1)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("heavy")
+    assert rejected.value.status == 429
+
+    controller.release("heavy", held)
+    wait_until(lambda: order == ["heavy"])
+
+
+def test_queue_timeout_returns_503():
+    controller = AdmissionController("t", max_concurrent=1, max_queue=5, queue_timeout=0.05)
+    controller.acquire("a")
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("b")
+    assert rejected.value.status == 503
+    assert controller.queued == 0
+
+
+def test_free_slots_are_shared_round_robin():
+    controller = AdmissionController("t", max_concurrent=1, max_queue=10, client_concurrent=1, client_queue=5,
+                                     queue_timeout=5)
+    held = controller.acquire("setup")
+    order = []
+    releases = []
+    for client in ["heavy", "heavy", "heavy", "light"]:
+        admitted, release = start_waiter(controller, client, order)
+        releases.append(release)
+        wait_until(lambda: controller.queued == len(releases))
+
+    controller.release("setup", held)
+    wait_until(lambda: len(order) == 1)
+    for release in releases:
+        release.set()
+    wait_until(lambda: len(order) == 4)
+
+    # light is served right after the first heavy request, not behind all three
+    assert order == ["heavy", "light", "heavy", "heavy"]
+
+
+def test_routes_reject_with_retry_after(client, analyzer, monkeypatch):
+    busy = AdmissionController("components", max_concurrent=1, max_queue=0)
+    busy.acquire("someone")
+    monkeypatch.setitem(analyzer.admission, "components", busy)
+
+    response = client.post('/components', json={"html": "<p>x</p>"}, environ_base={"REMOTE_ADDR": "10.0.0.1"})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert response.get_json()["retry_after"] == 1
+
+
+def test_completed_requests_free_their_slot(client, analyzer):
+    client.post('/components', json={"html": "<p>x</p>"})
+
+    assert analyzer.admission["components"].stats() == {"active": 0, "queued": 0, "clients_waiting": 0}
+
+
+def test_streamed_responses_hold_their_slot_until_closed(client, analyzer):
+    controller = analyzer.admission["components"]
+
+    response = client.post('/components?stream=1', json={"html": "<h1>x</h1>"}, environ_base={"REMOTE_ADDR": "10.0.0.2"})
+    assert controller.stats()["active"] == 1
+    response.get_data()
+    response.close()
+
+    assert controller.stats()["active"] == 0
+
+
+def test_rotating_client_headers_share_one_quota(client, analyzer, monkeypatch):
+    limited = AdmissionController("components", max_concurrent=10, max_queue=10, client_concurrent=1, client_queue=0)
+    limited.acquire("10.0.0.3")
+    monkeypatch.setitem(analyzer.admission, "components", limited)
+
+    for i in range(3):
+        response = client.post('/components', json={"html": "<p>x</p>"}, environ_base={"REMOTE_ADDR": "10.0.0.3"},
+                               headers={"X-Client-Id": f"client-{i}", "X-Forwarded-For": f"192.0.2.{i}"})
+        assert response.status_code == 429
+
+
+def test_forwarded_address_is_trusted_only_through_proxy_fix():
+    from flask import Flask
+    from werkzeug.middleware.proxy_fix import ProxyFix
+    from components.admissionControl import client_identity
+
+    app = Flask(__name__)
+    app.add_url_rule('/whoami', 'whoami', client_identity)
+    headers = {"X-Forwarded-For": "203.0.113.7"}
+    environ = {"REMOTE_ADDR": "10.0.0.4"}
+
+    assert app.test_client().get('/whoami', headers=headers, environ_base=environ).get_data(as_text=True) == "10.0.0.4"
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+    assert app.test_client().get('/whoami', headers=headers, environ_base=environ).get_data(as_text=True) == "203.0.113.7"
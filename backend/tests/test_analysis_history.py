@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from components.analysisHistory import AnalysisHistory, domain_of, parse_time
+
+HTML = "<html><body><h1>Title</h1><p>Read a review</p><button>Go</button></body></html>"
+
+
+@pytest.fixture
+def history(tmp_path):
+    return AnalysisHistory(str(tmp_path / "history.sqlite3"))
+
+
+def test_domain_and_time_parsing():
+    assert domain_of("https://WWW.Example.com/pricing?x=1") == "example.com"
+    assert domain_of(None) is None
+    assert parse_time("1700000000") == 1700000000.0
+    assert parse_time("2023-11-14T22:13:20Z") == 1700000000.0
+    with pytest.raises(ValueError):
+        parse_time("yesterday")
+
+
+def test_query_filters_and_paginates(history):
+    for i in range(5):
+        history.record("components", {"source": "x", "category": "SaaS" if i % 2 else "Blog", "website_score": 50 + i * 10},
+                       url=f"https://www.shop{i % 2}.com/page{i}", features=[i, 0, 0, 0, 0], model_version="abc")
+
+    assert [item["website_score"] for item in history.query(domain="shop1.com")["items"]] == [80, 60]
+    assert len(history.query(category="saas")["items"]) == 2
+    assert [item["website_score"] for item in history.query(min_score=60, max_score=80)["items"]] == [80, 70, 60]
+    assert history.query(since=time.time() + 60)["items"] == []
+
+    first = history.query(limit=2)
+    second = history.query(limit=2, cursor=first["next_cursor"])
+    third = history.query(limit=2, cursor=second["next_cursor"])
+    ids = [item["id"] for page in (first, second, third) for item in page["items"]]
+    assert ids == [5, 4, 3, 2, 1]
+    assert third["next_cursor"] is None
+
+
+def test_get_returns_the_full_record(history):
+    history_id = history.record("components", {"category": "SaaS", "analysis": {"cta": {}}},
+                                features=[1, 2, 3, 4, 5], timings={"total_seconds": 1.5})
+
+    record = history.get(history_id)
+
+    assert record["features"] == [1, 2, 3, 4, 5]
+    assert record["result"]["analysis"] == {"cta": {}}
+    assert record["timings"] == {"total_seconds": 1.5}
+    assert history.get(999) is None
+
+
+def test_components_results_are_recorded_and_served(client, analyzer):
+    body = client.post('/components', json={"html": HTML, "page_url": "https://www.example.com/"}).get_json()
+    calls = len(analyzer.genai.GenerativeModel.prompts)
+
+    listing = client.get('/history?domain=example.com&kind=components').get_json()
+    record = client.get(f'/history/{body["history_id"]}').get_json()
+
+    assert [item["id"] for item in listing["items"]] == [body["history_id"]]
+    assert listing["items"][0]["category"] == "SaaS"
+    assert "model_version" in listing["items"][0]
+    assert record["features"] == [1, 3, 1, 0, 1]
+    assert record["result"]["analysis"] == body["analysis"]
+    assert "total_seconds" in record["timings"]
+    assert len(analyzer.genai.GenerativeModel.prompts) == calls
+
+
+def test_train_model_results_are_recorded(client, analyzer, monkeypatch):
+    monkeypatch.setattr(analyzer, "train_from_user_data", lambda html, score, feedback: {
+        "old_score": 55.0, "new_score": 70.0, "model_updated": True, "features": [1, 3, 1, 0, 1]
+    })
+
+    body = client.post('/train-model', json={"html": HTML, "user_score": 70}).get_json()
+
+    record = client.get(f'/history/{body["history_id"]}').get_json()
+    assert record["kind"] == "train-model"
+    assert record["website_score"] == 70.0
+    assert record["result"]["user_score"] == 70.0
+
+
+def test_invalid_filters_are_rejected(client):
+    assert client.get('/history?min_score=high').status_code == 400
+    assert client.get('/history?since=someday').status_code == 400
+    assert client.get('/history/12345').status_code == 404
@@ -0,0 +1,94 @@
+import csv
+import json
+import tarfile
+
+import pytest
+
+import bulk_score
+
+
+class SumModel:
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, X):
+        self.batches.append(len(X))
+        return X.sum(axis=1)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = SumModel()
+    monkeypatch.setattr(bulk_score, "load_model", lambda: model)
+    return model
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / "corpus"
+    (root / "nested").mkdir(parents=True)
+    for i in range(5):
+        (root / f"page{i}.html").write_text(f"<h1>Page</h1>{'<p>x</p>' * i}")
+    (root / "nested" / "deep.htm").write_text("<a href='/'>Home</a><p>A review</p>")
+    (root / "notes.txt").write_text("not html")
+    return root
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_scores_directory_in_batches(corpus, tmp_path, model):
+    output = tmp_path / "out.jsonl"
+
+    bulk_score.main([str(corpus), "--output", str(output), "--workers", "2", "--batch-size", "4"])
+
+    rows = {row["id"]: row for row in read_jsonl(output)}
+    assert set(rows) == {f"page{i}.html" for i in range(5)} | {"nested/deep.htm"}
+    assert rows["page3.html"]["p_count"] == 3
+    assert rows["page3.html"]["website_score"] == 6.0
+    assert rows["nested/deep.htm"]["testimonials"] == 1
+    assert model.batches == [4, 2]
+
+
+def test_resume_skips_written_rows_and_repairs_partial_line(corpus, tmp_path, model):
+    output = tmp_path / "out.jsonl"
+    bulk_score.main([str(corpus), "--output", str(output), "--workers", "1"])
+    lines = output.read_text().splitlines()
+    output.write_text("\n".join(lines[:2]) + "\n" + lines[2][:10])
+
+    bulk_score.main([str(corpus), "--output", str(output), "--workers", "1"])
+
+    ids = [row["id"] for row in read_jsonl(output)]
+    assert sorted(ids) == sorted(set(ids))
+    assert len(ids) == 6
+
+
+def test_tarball_to_csv(corpus, tmp_path, model):
+    archive = tmp_path / "corpus.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add(corpus, arcname="site")
+    output = tmp_path / "out.csv"
+
+    bulk_score.main([str(archive), "--output", str(output), "--workers", "2"])
+    bulk_score.main([str(archive), "--output", str(output), "--workers", "2"])
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 6
+    assert {row["id"] for row in rows} >= {"site/page0.html", "site/nested/deep.htm"}
+
+
+def test_unreadable_documents_are_reported(tmp_path, model):
+    root = tmp_path / "corpus"
+    root.mkdir()
+    (root / "good.html").write_text("<p>ok</p>")
+    (root / "broken.html").symlink_to(tmp_path / "does-not-exist.html")
+    output = tmp_path / "out.jsonl"
+
+    scored, skipped, failed = bulk_score.score_corpus(str(root), str(output), workers=1)
+
+    assert (scored, skipped, failed) == (2, 0, 1)
+    broken = next(row for row in read_jsonl(output) if row["id"] == "broken.html")
+    assert broken["website_score"] is None
+    assert "No such file" in broken["error"]
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+import train_category_model
+from components.categoryClassifier import CategoryClassifier, LabelStore, normalize_category, train_classifier
+
+HTML = "<html><body><h1>Title</h1><p>Read a review</p><button>Go</button></body></html>"
+
+TEMPLATES = {
+    "E-commerce": "add to cart free shipping checkout buy now {} price sale discount",
+    "Blog": "posted by author read more comments archive {} article category",
+    "SaaS": "start free trial pricing plans dashboard integrations api {} sign up teams",
+}
+
+
+def corpus(per_class=12):
+    texts, labels = [], []
+    for label, template in TEMPLATES.items():
+        for i in range(per_class):
+            texts.append(template.format(f"item{i}"))
+            labels.append(label if i % 3 else label.lower() + ".")
+    return texts, labels
+
+
+def test_normalize_category_merges_spellings():
+    assert normalize_category("E-commerce") == normalize_category("ecommerce.") == "ecommerce"
+
+
+def test_untrained_classifier_has_no_confidence(tmp_path):
+    assert CategoryClassifier(str(tmp_path / "missing.pkl")).predict("anything") == (None, 0.0)
+
+
+def test_train_and_predict(tmp_path):
+    texts, labels = corpus()
+    path = str(tmp_path / "model.pkl")
+
+    report = train_classifier(texts, labels, path, min_examples=5, threshold=0.5)
+    label, confidence = CategoryClassifier(path).predict("checkout now with free shipping and add to cart")
+
+    assert set(report["categories"]) == {"E-commerce", "Blog", "SaaS"}
+    assert report["accuracy"] == 1.0
+    assert label == "E-commerce"
+    assert 0 < confidence <= 1
+
+
+def test_training_needs_two_categories(tmp_path):
+    with pytest.raises(ValueError):
+        train_classifier(["a"] * 10, ["Blog"] * 10, str(tmp_path / "model.pkl"))
+
+
+def test_llm_answers_are_recorded_as_labels(client, analyzer):
+    client.post('/components', json={"html": HTML})
+
+    texts, labels = analyzer.category_labels.labelled()
+    assert labels == ["SaaS"]
+    assert "Read a review" in texts[0]
+
+
+def test_confident_local_prediction_skips_the_llm(client, analyzer, monkeypatch):
+    monkeypatch.setattr(analyzer.category_classifier, "predict", lambda text: ("Blog", 0.97))
+
+    body = client.post('/components', json={"html": HTML}).get_json()
+
+    assert body["category"] == "Blog"
+    prompts = analyzer.genai.GenerativeModel.prompts
+    assert not any("Return ONLY the category name" in prompt for prompt in prompts)
+    assert analyzer.category_labels.labelled() == ([], [])
+
+
+def test_unsure_local_prediction_falls_back_to_the_llm(client, analyzer, monkeypatch):
+    monkeypatch.setattr(analyzer.category_classifier, "predict", lambda text: ("Blog", 0.4))
+
+    assert client.post('/components', json={"html": HTML}).get_json()["category"] == "SaaS"
+
+
+def test_cli_trains_from_the_label_store(tmp_path, capsys):
+    store = LabelStore(str(tmp_path / "labels.sqlite3"))
+    for text, label in zip(*corpus()):
+        store.record(text, label)
+
+    status = train_category_model.main([
+        "--labels-db", str(tmp_path / "labels.sqlite3"), "--output", str(tmp_path / "model.pkl")
+    ])
+
+    assert status == 0
+    assert json.loads(capsys.readouterr().out)["examples"] == 36
+    assert CategoryClassifier(str(tmp_path / "model.pkl")).predict("posted by author, read more")[0] == "Blog"
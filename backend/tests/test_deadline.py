@@ -0,0 +1,171 @@
+import time
+
+import pytest
+
+from components import deadline as deadline_module
+from components.deadline import Deadline
+
+HTML = "<html><body><h1>Title</h1><p>Read a review</p><button>Go</button></body></html>"
+
+
+def test_budget_header_is_parsed_and_capped():
+    assert Deadline.from_headers({"X-Request-Budget-Ms": "1500"}).budget == 1.5
+    assert Deadline.from_headers({"X-Request-Budget-Ms": "999999999"}).budget == deadline_module.MAX_REQUEST_BUDGET_SECONDS
+    assert Deadline.from_headers({"X-Request-Budget-Ms": "soon"}).budget == deadline_module.REQUEST_BUDGET_SECONDS
+    assert Deadline.from_headers({}).budget == deadline_module.REQUEST_BUDGET_SECONDS
+
+
+def test_unbudgeted_deadline_never_limits():
+    deadline = Deadline()
+
+    assert deadline.can_run("suggestions")
+    assert deadline.stage_timeout("components") is None
+    assert deadline.stage_timeout("fetch", cap=10) == 10
+    assert deadline.run_stage("category", lambda timeout: timeout, "skipped") is None
+
+
+def test_stage_timeout_is_a_share_of_the_remaining_budget():
+    deadline = Deadline(10)
+
+    assert deadline.stage_timeout("components") == pytest.approx(6, abs=0.05)
+    assert deadline.stage_timeout("fetch", cap=2) == 2
+
+
+def test_run_stage_skips_when_too_little_budget_remains():
+    deadline = Deadline(1.5)
+    calls = []
+
+    result = deadline.run_stage("components", lambda timeout: calls.append(timeout), {})
+
+    assert result == {}
+    assert calls == []
+    assert deadline.report()["skipped_stages"] == ["components"]
+    assert deadline.report()["degraded"] is True
+
+
+def test_run_stage_discards_a_result_that_overran_the_budget(monkeypatch):
+    deadline = Deadline(5)
+    now = [deadline.started]
+    monkeypatch.setattr(deadline_module.time, "monotonic", lambda: now[0])
+
+    def slow(timeout):
+        now[0] += 6
+        return {"cta": {}}
+
+    assert deadline.run_stage("category", slow, "fallback") == "fallback"
+    assert deadline.skipped == ["category"]
+
+
+def test_route_drops_suggestions_first_under_a_tight_budget(client, analyzer, monkeypatch):
+    monkeypatch.setitem(deadline_module.STAGE_BUDGETS, "suggestions", (1.0, 10.0))
+
+    response = client.post('/components', json={"html": HTML}, headers={"X-Request-Budget-Ms": "5000"})
+
+    body = response.get_json()
+    assert body["category"] == "SaaS"
+    assert set(body["analysis"]) == {"cta", "visual_hierarchy", "copy_effectiveness", "trust_signals"}
+    assert body["suggestions"] == {}
+    assert body["skipped_stages"] == ["suggestions"]
+    assert body["degraded"] is True
+    assert not any("high_priority" in prompt for prompt in analyzer.genai.GenerativeModel.prompts)
+
+
+def test_route_enforces_stage_timeouts_around_the_llm(client, analyzer, monkeypatch):
+    timeouts = []
+
+    def recording_call(func, timeout=None):
+        timeouts.append(timeout)
+        return func()
+
+    monkeypatch.setattr(analyzer, "call_with_timeout", recording_call)
+
+    response = client.post('/components', json={"html": HTML}, headers={"X-Request-Budget-Ms": "20000"})
+
+    body = response.get_json()
+    assert body["degraded"] is False
+    assert body["skipped_stages"] == []
+    assert len(timeouts) == 3
+    assert all(0 < timeout <= 20 for timeout in timeouts)
+    assert analyzer.genai.GenerativeModel.options == [{}, {}, {}]
+
+
+def test_call_with_timeout_abandons_slow_calls():
+    assert deadline_module.call_with_timeout(lambda: "done", 1) == "done"
+    assert deadline_module.call_with_timeout(lambda: "inline") == "inline"
+    with pytest.raises(TimeoutError):
+        deadline_module.call_with_timeout(lambda: time.sleep(0.5), 0.05)
+
+
+def test_run_stage_reports_failed_and_raising_stages():
+    deadline = Deadline(10)
+
+    def broken(timeout):
+        raise TimeoutError("too slow")
+
+    assert deadline.run_stage("category", broken, "fallback") == "fallback"
+    assert deadline.run_stage("components", lambda timeout: {"error": True}, {}, lambda result: "error" in result) == {"error": True}
+    assert deadline.run_stage("suggestions", lambda timeout: {"ok": True}, {}, lambda result: "error" in result) == {"ok": True}
+    assert deadline.skipped == ["category", "components"]
+
+
+def test_timed_out_components_stage_is_reported(client, analyzer, monkeypatch):
+    monkeypatch.setitem(deadline_module.STAGE_BUDGETS, "components", (0.05, 0.0))
+    fake_generate = analyzer.genai.GenerativeModel.generate_content
+
+    def slow_components(self, contents, **kwargs):
+        if "observations" in contents:
+            time.sleep(0.5)
+        return fake_generate(self, contents, **kwargs)
+
+    monkeypatch.setattr(analyzer.genai.GenerativeModel, "generate_content", slow_components)
+
+    response = client.post('/components', json={"html": HTML}, headers={"X-Request-Budget-Ms": "5000"})
+
+    body = response.get_json()
+    assert body["analysis"]["cta"]["observations"][0].startswith("Error analyzing")
+    assert body["suggestions"] == {}
+    assert body["skipped_stages"] == ["components", "suggestions"]
+    assert body["degraded"] is True
+
+
+def test_image_stages_run_within_the_deadline(client, analyzer):
+    payload = {"image": "aGVsbG8=", "image_mime_type": "image/png"}
+
+    response = client.post('/components', json=payload, headers={"X-Request-Budget-Ms": "1500"})
+
+    body = response.get_json()
+    assert body["category"] == "SaaS"
+    assert body["analysis"] == {}
+    assert body["skipped_stages"] == ["components", "suggestions"]
+    assert len(analyzer.genai.GenerativeModel.prompts) == 1
+
+
+def test_generate_passes_no_unsupported_options_to_the_real_sdk(app_module):
+    import google.ai.generativelanguage as glm
+    import google.generativeai as genai
+
+    class RecordingClient:
+        def __init__(self):
+            self.calls = []
+
+        def generate_content(self, request, **kwargs):
+            self.calls.append(kwargs)
+            return glm.GenerateContentResponse(candidates=[{"content": {"parts": [{"text": "SaaS"}]}}])
+
+    model = genai.GenerativeModel('gemini-2.0-flash')
+    model._client = RecordingClient()
+
+    assert app_module.generate(model, "Return ONLY the category name", timeout=5).text == "SaaS"
+    # Any per-call option would reach the client here, and 0.3.1 rejects them all
+    assert model._client.calls == [{}]
+
+
+def test_skipped_stages_are_not_cached_for_incremental_reuse(client, analyzer, monkeypatch):
+    monkeypatch.setitem(deadline_module.STAGE_BUDGETS, "suggestions", (1.0, 10.0))
+
+    payload = {"html": HTML, "page_url": "https://example.com/"}
+    body = client.post('/components', json=payload, headers={"X-Request-Budget-Ms": "5000"}).get_json()
+
+    assert body["skipped_stages"] == ["suggestions"]
+
+    assert analyzer.section_cache.get("https://example.com/") is None
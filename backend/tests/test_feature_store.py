@@ -0,0 +1,128 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import bulk_score
+import rescore
+from components.analysisHistory import AnalysisHistory
+from components.featureStore import FeatureStore, rescore as rescore_store
+from components.scoringModel import FEATURE_NAMES
+
+HTML = "<html><body><h1>Title</h1><p>Read a review</p><button>Go</button></body></html>"
+
+
+class SumModel:
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, X):
+        self.batches.append(len(X))
+        return X.sum(axis=1) * 10
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FeatureStore(str(tmp_path / "features"))
+
+
+def test_append_builds_aligned_columns(store):
+    store.append(["a", "b"], [[1, 2, 3, 4, 5], [6, 7]])
+    store.append(["c"], [[1, 1, 1, 1, 1, 9]])
+
+    columns = store.columns()
+    assert store.rows() == 3
+    assert store.ids() == ["a", "b", "c"]
+    assert list(columns) == FEATURE_NAMES
+    assert columns["cta_count"].tolist() == [1, 6, 1]
+    assert columns["testimonials"].tolist() == [5, 0, 1]
+    starts = [start for start, _ in store.iter_chunks(2)]
+    assert starts == [0, 2]
+
+
+def test_unfinished_append_is_ignored_and_overwritten(store):
+    store.append(["a"], [[1, 1, 1, 1, 1]])
+    with open(os.path.join(store.directory, "cta_count.f32"), 'ab') as f:
+        f.write(np.float32(42).tobytes())
+    with open(os.path.join(store.directory, "ids.txt"), 'ab') as f:
+        f.write(b"partial")
+
+    assert store.rows() == 1
+    assert store.ids() == ["a"]
+    store.append(["b"], [[2, 2, 2, 2, 2]])
+    assert store.ids() == ["a", "b"]
+    assert store.columns()["cta_count"].tolist() == [1, 2]
+
+
+def test_rescore_writes_scores_per_model_version(store):
+    store.append([str(i) for i in range(5)], [[i, 0, 0, 0, 1] for i in range(5)])
+    model = SumModel()
+
+    summary = rescore_store(store, model, "v1", chunk_rows=2)
+
+    assert model.batches == [2, 2, 1]
+    assert summary["rows"] == 5
+    assert store.scores("v1").tolist() == [10, 20, 30, 40, 50]
+    assert store.scores("v2") is None
+    with open(store.scores_path("v1")[:-len(".f32")] + ".json") as f:
+        assert json.load(f)["model_version"] == "v1"
+
+
+def test_rows_appended_during_rescore_are_left_out(store):
+    store.append([str(i) for i in range(3)], [[i, 0, 0, 0, 1] for i in range(3)])
+
+    class AppendingModel(SumModel):
+        def predict(self, X):
+            if not self.batches:
+                store.append(["late"], [[9, 9, 9, 9, 9]])
+            return super().predict(X)
+
+    model = AppendingModel()
+    summary = rescore_store(store, model, "v1", chunk_rows=2)
+
+    assert model.batches == [2, 1]
+    assert summary["rows"] == 3
+    assert store.scores("v1").tolist() == [10, 20, 30]
+    assert store.rows() == 4
+    assert [len(X) for _, X in store.iter_chunks(10, rows=3)] == [3]
+
+
+def test_empty_store_rescore(store):
+    assert rescore_store(store, SumModel(), "v1")["rows"] == 0
+    assert store.scores("v1").tolist() == []
+
+
+def test_import_history_skips_known_rows(store, tmp_path):
+    history = AnalysisHistory(str(tmp_path / "history.sqlite3"))
+    first = history.record("components", {}, features=[1, 2, 3, 4, 5])
+    history.record("train", {})
+    store.append([f"history:{first}"], [[1, 2, 3, 4, 5]])
+    second = history.record("components", {}, features=[5, 4, 3, 2, 1])
+
+    assert rescore.import_history(store, history.db_path) == 1
+    assert store.ids() == [f"history:{first}", f"history:{second}"]
+    assert rescore.import_history(store, history.db_path) == 0
+
+
+def test_components_results_are_stored(client, analyzer):
+    body = client.post('/components', json={"html": HTML, "page_url": "https://www.example.com/"}).get_json()
+
+    assert analyzer.feature_store.ids() == [f"history:{body['history_id']}"]
+    assert analyzer.feature_store.columns()["cta_count"].tolist() == [1]
+
+
+def test_bulk_score_appends_to_feature_store(tmp_path, monkeypatch):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for i in range(3):
+        (corpus / f"page{i}.html").write_text(f"<h1>Page</h1>{'<p>x</p>' * i}")
+    monkeypatch.setattr(bulk_score, "load_model", SumModel)
+    directory = tmp_path / "features"
+
+    bulk_score.main([str(corpus), "--output", str(tmp_path / "out.jsonl"), "--workers", "1",
+                     "--feature-store", str(directory)])
+
+    store = FeatureStore(str(directory))
+    assert sorted(store.ids()) == [f"page{i}.html" for i in range(3)]
+    assert sorted(store.columns()["p_count"].tolist()) == [0, 1, 2]
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+from bs4 import BeautifulSoup
+
+import parser_parity
+from components import htmlParser
+from components.htmlParser import make_soup, resolve_backend, visible_text
+
+PAGES = {
+    "landing.html": "<html><body><h1>Shop</h1><p>Fast delivery</p><ul><li>One</li></ul>"
+                    "<a href='/buy'>Buy</a><button>Sign up</button><p>A trusted review</p></body></html>",
+    "fragment.htm": "<h2>Heading</h2><p>First<p>Second <b>bold</b><script>track()</script>",
+    "nested/plain.html": "<div>No headings, just <a href='#'>a link</a> &amp; text</div>",
+}
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / "corpus"
+    for name, html in PAGES.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(html)
+    return root
+
+
+def test_resolve_backend_prefers_fast_backends(monkeypatch):
+    monkeypatch.setattr(htmlParser, "FAST_BACKENDS", ("missing", "html.parser"))
+    assert resolve_backend("auto") == "html.parser"
+    monkeypatch.setattr(htmlParser, "FAST_BACKENDS", ("missing",))
+    assert resolve_backend("auto") == "html.parser"
+
+
+def test_reference_backend_is_the_default():
+    assert htmlParser.PARSER_BACKEND == "html.parser"
+    assert resolve_backend() == "html.parser"
+
+
+def test_unknown_backend_falls_back_to_reference(capsys):
+    assert resolve_backend("no-such-parser") == "html.parser"
+    assert "no-such-parser" in capsys.readouterr().out
+
+
+def test_make_soup_and_visible_text():
+    soup = make_soup("<p>Hello <b>there</b></p><script>x()</script><style>p {}</style>", "html.parser")
+    assert isinstance(soup, BeautifulSoup)
+    assert visible_text(soup) == "Hello there"
+
+
+def test_parity_against_itself(corpus, tmp_path):
+    report_path = tmp_path / "report.json"
+
+    status = parser_parity.main([str(corpus), "--backend", "html.parser", "--report", str(report_path)])
+
+    report = json.loads(report_path.read_text())
+    assert status == 0
+    assert report["pages"] == 3
+    assert report["mismatches"] == []
+
+
+def test_mismatches_are_reported(corpus, monkeypatch):
+    def make_soup_with_extra_button(html, backend=None):
+        if backend == "broken":
+            html = html + (b"<button>Extra</button>" if isinstance(html, bytes) else "<button>Extra</button>")
+        return make_soup(html, "html.parser")
+
+    monkeypatch.setattr(parser_parity, "make_soup", make_soup_with_extra_button)
+
+    report = parser_parity.check_corpus(str(corpus), "broken")
+    assert report["mismatched"] == 3
+    assert all(item["feature_differences"] == {"cta_count": 1} for item in report["mismatches"])
+    assert report["mismatches"][0]["text_similarity"] < 1
+
+    assert parser_parity.check_corpus(str(corpus), "broken", feature_tolerance=1, min_text_similarity=0.5)["mismatched"] == 0
+
+
+def test_missing_backend_exits_with_error(corpus):
+    assert parser_parity.main([str(corpus), "--backend", "no-such-parser"]) == 2
+
+
+@pytest.mark.parametrize("backend", htmlParser.FAST_BACKENDS)
+def test_fast_backend_parity(corpus, backend):
+    pytest.importorskip(backend)
+    report = parser_parity.check_corpus(str(corpus), backend)
+    assert report["mismatches"] == []
@@ -0,0 +1,175 @@
+import os
+import pickle
+import socket
+import subprocess
+import time
+
+import pytest
+
+from components import jobQueue
+from components.jobQueue import JobManager, JobStore, execute_job, validate_callback_url
+
+
+def echo_runner(payload):
+    return {"echo": payload["html"]}
+
+
+def failing_runner(payload):
+    raise RuntimeError("pipeline exploded")
+
+
+def crash_once_runner(payload):
+    """Kills its worker process the first time, as a segfaulting parser would"""
+    if not os.path.exists(payload["marker"]):
+        open(payload["marker"], 'w').close()
+        os._exit(1)
+    return {"echo": payload["html"]}
+
+
+def dead_pid():
+    process = subprocess.Popen(["true"])
+    process.wait()
+    return process.pid
+
+
+def wait_for(manager, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs" / "jobs.sqlite3")
+
+
+def test_store_round_trip_and_single_claim(db_path):
+    store = JobStore(db_path)
+    job_id = store.create({"html": "<p>x</p>"}, "http://example.com/hook")
+
+    assert store.get(job_id)["status"] == "queued"
+    assert store.claim(job_id) is True
+    assert store.claim(job_id) is False
+
+    store.finish(job_id, result={"website_score": 70})
+    job = store.get(job_id, include_payload=True)
+    assert job["status"] == "completed"
+    assert job["result"] == {"website_score": 70}
+    assert job["payload"] == {"html": "<p>x</p>"}
+    assert store.get("missing") is None
+
+
+def test_execute_job_records_failures_and_sends_callback(db_path, monkeypatch):
+    sent = []
+    monkeypatch.setattr(jobQueue, "_send_callback", lambda url, job: sent.append((url, job)))
+    store = JobStore(db_path)
+    job_id = store.create({"html": "x"}, "http://example.com/hook")
+
+    execute_job(db_path, job_id, failing_runner)
+
+    job = store.get(job_id)
+    assert job["status"] == "failed"
+    assert "pipeline exploded" in job["error"]
+    assert sent == [("http://example.com/hook", job)]
+
+
+def test_manager_runs_jobs_in_worker_processes(db_path):
+    manager = JobManager(echo_runner, db_path=db_path, max_workers=2)
+    try:
+        job_ids = [manager.submit({"html": f"page {i}"}) for i in range(3)]
+        jobs = [wait_for(manager, job_id) for job_id in job_ids]
+    finally:
+        manager.shutdown()
+
+    assert [job["result"] for job in jobs] == [{"echo": f"page {i}"} for i in range(3)]
+
+
+def test_start_resumes_queued_jobs_and_jobs_of_dead_workers(db_path):
+    store = JobStore(db_path)
+    queued = store.create({"html": "left queued"})
+    orphaned = store.create({"html": "left running"})
+    store.claim(orphaned)
+    with store._connect() as conn:
+        conn.execute("UPDATE jobs SET worker_pid = ? WHERE id = ?", (dead_pid(), orphaned))
+
+    manager = JobManager(echo_runner, db_path=db_path, max_workers=1)
+    try:
+        manager.start()
+        assert wait_for(manager, queued)["result"] == {"echo": "left queued"}
+        assert wait_for(manager, orphaned)["result"] == {"echo": "left running"}
+    finally:
+        manager.shutdown()
+
+
+def test_recover_orphans_leaves_live_workers_and_gives_up_after_max_attempts(db_path):
+    store = JobStore(db_path)
+    live, exhausted = store.create({"html": "a"}), store.create({"html": "b"})
+    for job_id in (live, exhausted):
+        store.claim(job_id)
+    with store._connect() as conn:
+        conn.execute("UPDATE jobs SET worker_pid = ?, attempts = 3 WHERE id = ?", (dead_pid(), exhausted))
+
+    assert store.recover_orphans(max_attempts=3) == []
+    assert store.get(live)["status"] == "running"
+    assert store.get(exhausted)["status"] == "failed"
+    assert "died" in store.get(exhausted)["error"]
+
+
+def test_crashed_worker_is_replaced_and_its_job_retried(db_path, tmp_path):
+    manager = JobManager(crash_once_runner, db_path=db_path, max_workers=1)
+    try:
+        job_id = manager.submit({"html": "crashy", "marker": str(tmp_path / "crashed")})
+        job = wait_for(manager, job_id, timeout=30)
+        later = manager.submit({"html": "after", "marker": str(tmp_path / "crashed")})
+        assert wait_for(manager, later, timeout=30)["result"] == {"echo": "after"}
+    finally:
+        manager.shutdown()
+
+    assert job["status"] == "completed"
+    assert job["result"] == {"echo": "crashy"}
+
+
+def test_callback_urls_must_be_public(monkeypatch):
+    def fake_getaddrinfo(host, port, proto=0):
+        address = {"hooks.example.com": "93.184.216.34", "internal.example.com": "10.0.0.5"}.get(host, host)
+        return [(socket.AF_INET, socket.SOCK_STREAM, proto, "", (address, port))]
+
+    monkeypatch.setattr(jobQueue.socket, "getaddrinfo", fake_getaddrinfo)
+
+    validate_callback_url("https://hooks.example.com/done")
+    for url in ("ftp://hooks.example.com/", "http://127.0.0.1/hook", "http://169.254.169.254/latest/meta-data",
+                "http://[::1]:8080/", "https://internal.example.com/hook"):
+        with pytest.raises(ValueError):
+            validate_callback_url(url)
+
+    monkeypatch.setattr(jobQueue, "CALLBACK_ALLOWED_HOSTS", ["example.com"])
+    validate_callback_url("https://internal.example.com/hook")
+    with pytest.raises(ValueError):
+        validate_callback_url("https://example.org/hook")
+
+
+def test_jobs_routes(client, analyzer, db_path, monkeypatch):
+    # Spawned workers import the runner by name, so the app's runner must pickle by reference
+    assert pickle.loads(pickle.dumps(analyzer.run_analysis)) is analyzer.run_analysis
+    manager = JobManager(echo_runner, db_path=db_path, max_workers=1)
+    monkeypatch.setattr(analyzer, "job_manager", manager)
+    try:
+        response = client.post('/jobs', json={"html": "<h1>Hi</h1><p>Some review</p>"})
+        assert response.status_code == 202
+        job_id = response.get_json()["job_id"]
+
+        wait_for(manager, job_id)
+        job = client.get(f'/jobs/{job_id}').get_json()
+    finally:
+        manager.shutdown()
+
+    assert job["status"] == "completed"
+    assert job["result"] == {"echo": "<h1>Hi</h1><p>Some review</p>"}
+    assert client.get('/jobs/unknown').status_code == 404
+    assert client.post('/jobs', json={"nothing": 1}).status_code == 400
+    assert client.post('/jobs', json={"html": "x", "callback_url": "ftp://x"}).status_code == 400
+    assert client.post('/jobs', json={"html": "x", "callback_url": "http://169.254.169.254/"}).status_code == 400
@@ -0,0 +1,122 @@
+import json
+
+import joblib
+import numpy as np
+
+import train_model
+from components import scoringModel
+from components.modelSelection import build_report, search_models, select_model
+from components.scoringModel import generate_synthetic_dataset
+
+SMALL_GRID = [
+    {"n_estimators": 3, "max_depth": 2, "min_samples_leaf": 1},
+    {"n_estimators": 3, "max_depth": None, "min_samples_leaf": 1},
+    {"n_estimators": 10, "max_depth": None, "min_samples_leaf": 1},
+]
+
+
+def test_synthetic_dataset_is_deterministic_and_in_range():
+    X, y = generate_synthetic_dataset(5000, seed=7)
+    X_again, y_again = generate_synthetic_dataset(5000, seed=7)
+
+    assert X.shape == (5000, 5)
+    assert np.array_equal(X, X_again) and np.array_equal(y, y_again)
+    assert X[:, 0].min() >= 0 and X[:, 0].max() <= 5
+    assert X[:, 2].min() >= 1 and X[:, 2].max() <= 19
+    assert set(np.unique(X[:, 4])) == {0, 1}
+    assert y.min() >= 40 and y.max() <= 100
+
+
+def test_noise_keeps_scores_clamped():
+    _, y = generate_synthetic_dataset(2000, seed=1, noise=50)
+
+    assert y.min() >= 0 and y.max() <= 100
+
+
+def result(nodes, mae, latency):
+    return {"params": {"nodes": nodes}, "model": object(), "nodes": nodes, "mae": mae, "single_row_ms": latency}
+
+
+def test_select_model_prefers_the_smallest_model_meeting_both_targets():
+    results = [result(5000, 0.5, 1.0), result(300, 1.5, 0.5), result(100, 4.0, 0.2), result(200, 1.0, 9.0)]
+
+    selected, targets_met = select_model(results, target_mae=2.0, latency_budget_ms=2.0)
+
+    assert targets_met is True
+    assert selected["nodes"] == 300
+
+
+def test_select_model_falls_back_to_the_most_accurate():
+    results = [result(5000, 3.0, 1.0), result(300, 5.0, 0.5)]
+
+    selected, targets_met = select_model(results, target_mae=1.0, latency_budget_ms=2.0)
+
+    assert targets_met is False
+    assert selected["nodes"] == 5000
+
+
+def test_search_measures_every_candidate_and_report_is_json():
+    X, y = generate_synthetic_dataset(400, seed=3)
+
+    results = search_models(X, y, grid=SMALL_GRID, n_jobs=2, latency_repeats=3)
+    selected, targets_met = select_model(results, target_mae=100, latency_budget_ms=1000)
+    report = build_report(results, selected, targets_met, {"synthetic_rows": 400})
+
+    assert len(results) == 3
+    assert all(r["mae"] >= 0 and r["single_row_ms"] > 0 and r["bytes"] > 0 for r in results)
+    assert selected["params"] == SMALL_GRID[0]
+    encoded = json.loads(json.dumps(report))
+    assert [c["nodes"] for c in encoded["candidates"]] == sorted(r["nodes"] for r in results)
+    assert "model" not in encoded["selected"]
+
+
+def test_cli_writes_model_and_report_with_feedback(tmp_path, monkeypatch):
+    feedback = tmp_path / "feedback.jsonl"
+    feedback.write_text(
+        json.dumps({"features": [1, 2, 3, 0, 1], "user_score": 90}) + "\n"
+        + json.dumps({"cta_count": 0, "hierarchy_score": 0, "p_count": 1, "lists": 0, "testimonials": 0, "user_score": 10}) + "\n"
+    )
+    monkeypatch.setattr(train_model, "search_models",
+                        lambda X, y, n_jobs, seed: search_models(X, y, grid=SMALL_GRID, n_jobs=n_jobs, seed=seed, latency_repeats=3))
+
+    status = train_model.main([
+        "--samples", "300", "--feedback", str(feedback), "--feedback-weight", "2",
+        "--target-mae", "100", "--latency-budget-ms", "1000", "--jobs", "1",
+        "--output", str(tmp_path / "model.pkl"), "--report", str(tmp_path / "report.json")
+    ])
+
+    assert status == 0
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["dataset"]["feedback_rows"] == 2
+    assert report["targets_met"] is True
+    assert len(joblib.load(tmp_path / "model.pkl").predict(np.zeros((2, 5)))) == 2
+
+
+def test_cli_keeps_the_current_model_when_no_candidate_meets_the_targets(tmp_path, monkeypatch):
+    monkeypatch.setattr(train_model, "search_models",
+                        lambda X, y, n_jobs, seed: search_models(X, y, grid=SMALL_GRID, n_jobs=n_jobs, seed=seed, latency_repeats=3))
+    output = tmp_path / "model.pkl"
+    output.write_bytes(b"current")
+
+    status = train_model.main([
+        "--samples", "300", "--target-mae", "0", "--jobs", "1",
+        "--output", str(output), "--report", str(tmp_path / "report.json")
+    ])
+
+    assert status == 1
+    assert output.read_bytes() == b"current"
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["targets_met"] is False
+    assert report["model_path"] is None
+
+
+def test_ensure_model_only_bootstraps_a_missing_model(tmp_path, monkeypatch):
+    path = tmp_path / "score_model.pkl"
+    monkeypatch.setattr(scoringModel, "MODEL_PATH", str(path))
+
+    assert scoringModel.ensure_model() is True
+    assert len(joblib.load(path).estimators_) == scoringModel.DUMMY_MODEL_PARAMS["n_estimators"]
+
+    path.write_bytes(b"selected")
+    assert scoringModel.ensure_model() is False
+    assert path.read_bytes() == b"selected"
@@ -0,0 +1,87 @@
+import pytest
+
+from components.observationScorer import ObservationScorer, blend_scores, load_scorer
+
+OBSERVATIONS = [
+    "CTA is clear and prominent",
+    "Missing trust badges",
+    "The layout is unclear",
+    "Headlines are well written",
+    "No testimonials",
+    "Unable to analyze copy",
+    "Typography could be stronger",
+    "Neutral remark",
+]
+
+
+def reference_score(observations):
+    """The loop process_image_content used before the scorer existed"""
+    positive = negative = 0
+    for observation in observations:
+        lower_obs = observation.lower()
+        if "unable to analyze" in lower_obs:
+            continue
+        if any(term in lower_obs for term in ["missing", "lack", "no ", "poor", "weak", "confusing", "unclear",
+                                             "ineffective", "absent", "could be", "should be", "not"]):
+            negative += 1
+        elif any(term in lower_obs for term in ["clear", "effective", "good", "strong", "well", "present",
+                                               "prominent", "visible", "professional"]):
+            positive += 1
+    if positive + negative == 0:
+        return 50
+    return min(100, max(0, 50 + 30 * (positive / (positive + negative) - 0.5)))
+
+
+def as_analysis(observations):
+    return {"cta": {"observations": observations[:3]}, "copy_effectiveness": {"observations": observations[3:]}}
+
+
+@pytest.mark.parametrize("observations", [
+    OBSERVATIONS,
+    OBSERVATIONS[:1],
+    ["Unable to analyze CTAs"],
+    [],
+    ["nothing here", "no", "Buttons are visible", "Testimonials present"],
+])
+def test_default_weights_match_reference(observations):
+    assert ObservationScorer().score(as_analysis(observations)) == pytest.approx(reference_score(observations))
+
+
+def test_score_many_matches_individual_scores():
+    scorer = ObservationScorer()
+    analyses = [as_analysis(OBSERVATIONS), as_analysis(OBSERVATIONS[:2]), {}, as_analysis(["Strong headline"])]
+
+    assert scorer.score_many(analyses) == [scorer.score(analysis) for analysis in analyses]
+
+
+def test_custom_weights_use_heaviest_matching_term():
+    scorer = ObservationScorer(negative_terms={"missing": 3.0}, positive_terms={"clear": 1.0})
+
+    # one negative weighing 3 against one positive weighing 1
+    assert scorer.score({"cta": {"observations": ["missing badge", "clear copy"]}}) == pytest.approx(50 + 30 * (0.25 - 0.5))
+
+
+def test_blend_scores():
+    assert blend_scores(80, 40, weight=0.0) == 80
+    assert blend_scores(80, 40, weight=0.25) == pytest.approx(70)
+    assert blend_scores(None, 40, weight=0.0) == 40
+
+
+def test_load_scorer_from_file(tmp_path):
+    path = tmp_path / "weights.json"
+    path.write_text('{"negative": {"bad": 2}, "positive": {"great": 1}}')
+
+    scorer = load_scorer(str(path))
+
+    assert scorer.score({"cta": {"observations": ["bad", "great"]}}) == pytest.approx(50 + 30 * (1 / 3 - 0.5))
+    assert load_scorer(str(tmp_path / "missing.json")).negative_terms["missing"] == 1.0
+
+
+def test_text_and_image_paths_report_observation_score(client):
+    text = client.post('/components', json={"html": "<h1>Hi</h1>"}).get_json()
+    image = client.post('/components', json={"image": "data:image/png;base64,aGVsbG8="}).get_json()
+
+    # the fake LLM returns one positive and one negative observation per component
+    assert text["observation_score"] == 50
+    assert text["website_score"] == 60.0
+    assert image["website_score"] == 50
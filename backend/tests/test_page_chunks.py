@@ -0,0 +1,126 @@
+import threading
+import time
+
+from bs4 import BeautifulSoup
+
+from components.pageChunks import merge_analyses, pack_chunks
+from components.sectionCache import section_texts
+
+
+def long_page(sections=6, words=120):
+    body = "".join(
+        f"<h2>Section {i}</h2><p>{' '.join(f'word{i}x{j}' for j in range(words))}</p>" for i in range(sections)
+    )
+    return f"<html><body>{body}<h2>Reviews</h2><p>Trusted by 5000 customers, rated 4.9 stars</p></body></html>"
+
+
+def test_section_texts_start_with_their_heading():
+    texts = section_texts(BeautifulSoup("<h1>Hi</h1><p>One</p><script>x()</script><h2>Next</h2><p>Two</p>", 'html.parser'))
+
+    assert texts == ["Hi One", "Next Two"]
+
+
+def test_chunks_keep_sections_whole_and_cover_everything():
+    sections = ["a" * 1000, "b" * 1000, "c" * 1000, "d" * 500]
+
+    chunks = pack_chunks(sections, chunk_chars=2100, max_chunks=8)
+
+    assert chunks == ["a" * 1000 + "\n" + "b" * 1000, "c" * 1000 + "\n" + "d" * 500]
+
+
+def test_oversized_sections_split_at_words():
+    chunks = pack_chunks([" ".join(["word"] * 500)], chunk_chars=500, max_chunks=8)
+
+    assert len(chunks) == 5
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert sum(chunk.count("word") for chunk in chunks) == 500
+
+
+def test_long_pages_are_trimmed_to_the_chunk_cap():
+    chunks = pack_chunks(["x" * 1000] * 20, chunk_chars=1000, max_chunks=4)
+
+    assert len(chunks) == 4
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    # every section keeps an equal share instead of the tail being dropped
+    assert "\n".join(chunks).split("\n") == ["x" * 199] * 20
+
+
+def test_trimming_cuts_the_longest_sections_at_words():
+    sections = ["Hero " + "copy " * 2000, "Pricing plans", "Reviews: trusted by 5000 customers"]
+
+    chunks = pack_chunks(sections, chunk_chars=500, max_chunks=2)
+
+    text = "\n".join(chunks)
+    assert len(chunks) <= 2 and all(len(chunk) <= 500 for chunk in chunks)
+    assert "Pricing plans" in text and "Reviews: trusted by 5000 customers" in text
+    assert text.startswith("Hero copy") and "cop\n" not in text
+
+
+def test_merge_dedupes_and_handles_failed_and_empty_components():
+    analyses = [
+        {"cta": {"observations": ["The signup button is clear and visible"]},
+         "trust_signals": {"observations": ["Error analyzing trust signals: API unavailable"]}},
+        {"cta": {"observations": ["The signup button is clear and visible!", "Footer CTA is weak"]},
+         "trust_signals": {"observations": ["Error analyzing trust signals: API unavailable"]}},
+    ]
+
+    merged = merge_analyses(analyses, ["cta", "trust_signals", "visual_hierarchy"], {"visual_hierarchy": "Visual Hierarchy"})
+
+    assert merged["cta"]["observations"] == ["The signup button is clear and visible", "Footer CTA is weak"]
+    assert merged["trust_signals"]["observations"] == ["Error analyzing trust signals: API unavailable"]
+    assert merged["visual_hierarchy"]["observations"] == ["No Visual Hierarchy elements were found on the page"]
+
+
+def test_merge_drops_fallbacks_when_another_chunk_succeeded():
+    analyses = [
+        {"cta": {"observations": ["Unable to analyze CTAs"]}},
+        {"cta": {"observations": ["Hero CTA is prominent"]}},
+    ]
+
+    assert merge_analyses(analyses, ["cta"])["cta"]["observations"] == ["Hero CTA is prominent"]
+
+
+def component_prompts(analyzer):
+    return [p for p in analyzer.genai.GenerativeModel.prompts if 'extract the following components' in p]
+
+
+def test_full_page_analyzes_every_chunk(client, analyzer):
+    body = client.post('/components', json={"html": long_page(), "full_page": True}).get_json()
+
+    prompts = component_prompts(analyzer)
+    assert body["chunks_analyzed"] == len(prompts) > 1
+    assert "Trusted by 5000 customers" in "".join(prompts)
+    assert all(f"of {len(prompts)} of the page" in prompt for prompt in prompts)
+    assert body["analysis"]["cta"]["observations"] == ["cta is clear", "cta is missing detail"]
+    assert set(body["suggestions"]) == {"cta", "visual_hierarchy", "copy_effectiveness", "trust_signals"}
+
+
+def test_default_mode_keeps_a_single_prefix_call(client, analyzer):
+    body = client.post('/components', json={"html": long_page()}).get_json()
+
+    prompts = component_prompts(analyzer)
+    assert len(prompts) == 1
+    assert "Trusted by 5000 customers" not in prompts[0]
+    assert "chunks_analyzed" not in body
+
+
+def test_chunk_calls_respect_the_concurrency_cap(client, analyzer, monkeypatch):
+    monkeypatch.setattr(analyzer, "MAP_REDUCE_CONCURRENCY", 2)
+    lock = threading.Lock()
+    active = [0, 0]
+
+    def slow_extract(content, category, components=None, timeout=None, part=None):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return {component: {"observations": [f"{component} seen in part {part[0]}"]} for component in components}
+
+    monkeypatch.setattr(analyzer, "extract_website_components", slow_extract)
+
+    body = client.post('/components', json={"html": long_page(), "full_page": True}).get_json()
+
+    assert active[1] == 2
+    assert len(body["analysis"]["cta"]["observations"]) == body["chunks_analyzed"]
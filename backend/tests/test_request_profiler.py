@@ -0,0 +1,81 @@
+import pytest
+
+from components.requestProfiler import RequestProfiler
+
+HTML = "<html><body><h1>Title</h1><p>Read a review</p><button>Go</button></body></html>"
+TOKEN = "s3cret"
+
+
+@pytest.fixture
+def profiler(analyzer, monkeypatch, tmp_path):
+    profiler = analyzer.request_profiler
+    monkeypatch.setattr(profiler, "directory", str(tmp_path / "profiles"))
+    monkeypatch.setattr(profiler, "token", TOKEN)
+    monkeypatch.setattr(profiler, "sample_rate", 0.0)
+    monkeypatch.setattr(profiler, "keep", 2)
+    return profiler
+
+
+def profile(client):
+    return client.post('/components', json={"html": HTML}, headers={"X-Profile-Token": TOKEN})
+
+
+def test_requests_are_not_profiled_without_the_token(client, profiler):
+    response = client.post('/components', json={"html": HTML}, headers={"X-Profile-Token": "wrong"})
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_profiled_request_records_stages_and_allocations(client, profiler):
+    response = profile(client)
+
+    assert response.get_json()["category"] == "SaaS"
+    profile_id = response.headers["X-Profile-Id"]
+
+    summary = client.get(f'/profiles/{profile_id}', headers={"X-Profile-Token": TOKEN}).get_json()
+    assert summary["route"] == "components"
+    assert summary["stages"]["html_parse"] > 0
+    assert summary["stages"]["feature_extraction"] > 0
+    assert summary["stages"]["json"] > 0
+    assert summary["functions"] and summary["allocations"]
+    assert summary["peak_memory_bytes"] > 0
+
+
+def test_profile_retrieval_formats_and_access(client, profiler):
+    profile_id = profile(client).headers["X-Profile-Id"]
+    headers = {"X-Profile-Token": TOKEN}
+
+    assert client.get(f'/profiles/{profile_id}').status_code == 403
+    assert "cumulative" in client.get(f'/profiles/{profile_id}?format=text', headers=headers).get_data(as_text=True)
+    assert client.get(f'/profiles/{profile_id}?format=pstats', headers=headers).data
+    assert client.get('/profiles/../../etc/passwd', headers=headers).status_code == 404
+    assert client.get('/profiles/' + "0" * 32, headers=headers).status_code == 404
+    assert [p["id"] for p in client.get('/profiles', headers=headers).get_json()["profiles"]] == [profile_id]
+
+
+def test_old_profiles_are_pruned(client, profiler):
+    ids = [profile(client).headers["X-Profile-Id"] for _ in range(3)]
+
+    listed = {p["id"] for p in client.get('/profiles', headers={"X-Profile-Token": TOKEN}).get_json()["profiles"]}
+    assert len(listed) == 2
+    assert ids[0] not in listed
+
+
+def test_sampling_profiles_without_a_token(client, profiler, monkeypatch):
+    monkeypatch.setattr(profiler, "sample_rate", 1.0)
+
+    response = client.post('/components', json={"html": HTML})
+
+    assert "X-Profile-Id" in response.headers
+
+
+def test_concurrent_profile_runs_unprofiled(tmp_path):
+    profiler = RequestProfiler(directory=str(tmp_path), token=TOKEN)
+    profiler._lock.acquire()
+
+    assert profiler.run("components", lambda: "ok") == ("ok", None)
+
+
+def test_disabled_without_token():
+    assert RequestProfiler(token="").authorized({"X-Profile-Token": ""}) is False
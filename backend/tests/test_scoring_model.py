@@ -0,0 +1,49 @@
+import pytest
+
+from components import scoringModel
+from components.scoringModel import extract_features_from_html, predict_score, predict_scores
+
+
+class SumModel:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return X.sum(axis=1)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = SumModel()
+    monkeypatch.setattr(scoringModel, "load_model", lambda: model)
+    return model
+
+
+def test_predict_scores_uses_one_model_call(model):
+    scores = predict_scores([[1, 2, 3, 4, 5], [10, 0, 0, 0, 0], [200, 0, 0, 0, 0]])
+
+    assert scores == [15.0, 10.0, 100]
+    assert model.calls == 1
+
+
+def test_predict_scores_matches_single_row_predict(model):
+    rows = [[1, 2, 3, 4, 0], [0, 0, 1, 0, 1]]
+
+    assert predict_scores(rows) == [predict_score(features=row) for row in rows]
+
+
+def test_predict_scores_pads_and_truncates_rows(model):
+    assert predict_scores([[1, 2]]) == [3.0]
+    assert predict_scores([[1, 1, 1, 1, 1, 50]]) == [5.0]
+
+
+def test_predict_scores_empty_input(model):
+    assert predict_scores([]) == []
+    assert model.calls == 0
+
+
+def test_extract_features_from_html():
+    html = "<h1>a</h1><h2>b</h2><p>Customer review</p><ol></ol><a href='#'>x</a><button>y</button>"
+
+    assert extract_features_from_html(html) == [2, 5, 1, 1, 1]
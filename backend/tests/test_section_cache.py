@@ -0,0 +1,90 @@
+from bs4 import BeautifulSoup
+
+from components.sectionCache import SectionCache, changed_components, split_sections
+
+PAGE = """
+<html><body>
+  <h1>Grow faster</h1><p>All-in-one analytics.</p><a href="/signup">Start free trial</a>
+  <h2>Features</h2><p>Dashboards and alerts.</p>
+  <h2>What customers say</h2><p>"Great tool" - a happy customer review</p>
+  <script>var tracking = true;</script>
+</body></html>
+"""
+
+
+def sections_of(html):
+    return split_sections(BeautifulSoup(html, 'html.parser'))
+
+
+def test_split_sections_tags_components():
+    sections = sections_of(PAGE)
+
+    assert [s["heading"] for s in sections] == ["Grow faster", "Features", "What customers say"]
+    assert sections[0]["components"] == ["copy_effectiveness", "cta"]
+    assert sections[1]["components"] == ["copy_effectiveness"]
+    assert sections[2]["components"] == ["copy_effectiveness", "trust_signals"]
+
+
+def test_unchanged_page_and_script_edits_change_nothing():
+    edited = PAGE.replace("var tracking = true", "var tracking = false")
+
+    assert changed_components(sections_of(PAGE), sections_of(edited)) == set()
+
+
+def test_body_edit_only_touches_components_of_that_section():
+    edited = PAGE.replace("Great tool", "Amazing tool")
+
+    assert changed_components(sections_of(PAGE), sections_of(edited)) == {"copy_effectiveness", "trust_signals"}
+
+
+def test_cta_and_heading_edits():
+    cta_edit = PAGE.replace("Start free trial", "Get started")
+    heading_edit = PAGE.replace("<h2>Features</h2>", "<h2>Capabilities</h2>")
+
+    assert changed_components(sections_of(PAGE), sections_of(cta_edit)) == {"copy_effectiveness", "cta"}
+    assert changed_components(sections_of(PAGE), sections_of(heading_edit)) == {
+        "copy_effectiveness", "visual_hierarchy"
+    }
+
+
+def test_cache_round_trip(tmp_path):
+    cache = SectionCache(str(tmp_path / "cache" / "sections.sqlite3"))
+    sections = sections_of(PAGE)
+
+    assert cache.get("https://example.com/") is None
+    cache.put("https://example.com/", sections, "SaaS", {"cta": {"observations": ["ok"]}}, {"cta": {}})
+
+    cached = cache.get("https://example.com/")
+    assert cached["sections"] == sections
+    assert cached["category"] == "SaaS"
+
+
+def test_resubmission_only_reanalyzes_changed_components(client, analyzer):
+    prompts = analyzer.genai.GenerativeModel.prompts
+
+    first = client.post('/components', json={"html": PAGE, "page_url": "https://example.com/"}).get_json()
+    assert first["incremental"]["reanalyzed"] == ["cta", "visual_hierarchy", "copy_effectiveness", "trust_signals"]
+    calls_after_first = len(prompts)
+
+    edited = PAGE.replace("Great tool", "Amazing tool")
+    second = client.post('/components', json={"html": edited, "page_url": "https://example.com/"}).get_json()
+
+    assert second["incremental"] == {
+        "reanalyzed": ["copy_effectiveness", "trust_signals"],
+        "reused": ["cta", "visual_hierarchy"]
+    }
+    new_prompts = prompts[calls_after_first:]
+    assert len(new_prompts) == 2
+    assert '"cta"' not in new_prompts[0]
+    assert second["analysis"]["cta"] == first["analysis"]["cta"]
+    assert set(second["suggestions"]) == {"cta", "visual_hierarchy", "copy_effectiveness", "trust_signals"}
+
+    third = client.post('/components', json={"html": edited, "page_url": "https://example.com/"}).get_json()
+    assert third["incremental"]["reanalyzed"] == []
+    assert len(prompts) == calls_after_first + 2
+
+
+def test_incremental_can_be_disabled(client, analyzer):
+    payload = {"html": PAGE, "page_url": "https://example.com/", "incremental": False}
+
+    assert "incremental" not in client.post('/components', json=payload).get_json()
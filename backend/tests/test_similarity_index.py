@@ -0,0 +1,98 @@
+import random
+
+from components.similarityIndex import SimilarityIndex, band_values, similarity, simhash
+
+WORDS = ("launch grow team plan invoice report secure cloud fast simple pricing customer support data "
+         "workflow automate insight dashboard mobile trial").split()
+
+
+def page_text(seed, length=300):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randint(0, 50)) for _ in range(length))
+
+
+def variant(text, replacements=3):
+    words = text.split()
+    for i in range(replacements):
+        words[40 + i * 60] = "localized"
+    return " ".join(words)
+
+
+def html_page(text):
+    return f"<html><body><h1>Offer</h1><p>{text}</p><button>Start</button></body></html>"
+
+
+def test_simhash_is_close_for_variants_and_far_for_other_pages():
+    base = page_text(1)
+
+    assert simhash(base) == simhash(base)
+    assert similarity(simhash(base), simhash(variant(base))) >= 0.92
+    assert similarity(simhash(base), simhash(page_text(2))) < 0.8
+
+
+def test_short_texts_are_not_fingerprinted():
+    assert simhash("Buy now") is None
+
+
+def test_bands_cover_every_bit():
+    value = (1 << 64) - 1
+    widths = [bin(band_value).count("1") for _, band_value in band_values(value)]
+
+    assert sum(widths) == 64
+
+
+def test_index_finds_near_duplicates_only(tmp_path):
+    index = SimilarityIndex(str(tmp_path / "similarity.sqlite3"), threshold=0.92)
+    base = page_text(1)
+    index.add(simhash(base), "https://example.com/en", "SaaS", {"cta": {"observations": ["ok"]}}, {})
+    index.add(simhash(page_text(2)), "https://other.com/", "Blog", {}, {})
+
+    match = index.find(simhash(variant(base)))
+
+    assert match["page_key"] == "https://example.com/en"
+    assert match["category"] == "SaaS"
+    assert index.find(simhash(page_text(3))) is None
+    assert index.find(None) is None
+
+
+def test_adding_a_page_again_replaces_its_entry(tmp_path):
+    index = SimilarityIndex(str(tmp_path / "similarity.sqlite3"))
+    base = page_text(1)
+    index.add(simhash(base), "https://example.com/", "SaaS", {}, {})
+    index.add(simhash(base), "https://example.com/", "Blog", {}, {})
+
+    assert index.find(simhash(base))["category"] == "Blog"
+    with index._connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM similar_page_bands").fetchone()[0] == 6
+
+
+def test_templated_variant_reuses_the_stored_analysis(client, analyzer):
+    base = page_text(1)
+    first = client.post('/components', json={"html": html_page(base)}).get_json()
+    calls = len(analyzer.genai.GenerativeModel.prompts)
+
+    second = client.post('/components', json={"html": html_page(variant(base))}).get_json()
+
+    assert len(analyzer.genai.GenerativeModel.prompts) == calls
+    assert second["analysis"] == first["analysis"]
+    assert second["near_duplicate"]["similarity"] >= 0.92
+    assert second["source"] == "HTML input"
+
+
+def test_reuse_can_be_disabled_per_request(client, analyzer):
+    base = page_text(1)
+    client.post('/components', json={"html": html_page(base)})
+
+    body = client.post('/components', json={"html": html_page(variant(base)), "reuse_similar": False}).get_json()
+
+    assert "near_duplicate" not in body
+
+
+def test_different_pages_run_the_full_chain(client, analyzer):
+    client.post('/components', json={"html": html_page(page_text(1))})
+    calls = len(analyzer.genai.GenerativeModel.prompts)
+
+    body = client.post('/components', json={"html": html_page(page_text(2))}).get_json()
+
+    assert "near_duplicate" not in body
+    assert len(analyzer.genai.GenerativeModel.prompts) > calls
@@ -0,0 +1,181 @@
+import pytest
+
+from components import siteCrawler
+from components.siteCrawler import crawl_site, select_representative_pages
+
+ROOT = "http://example.com/"
+
+
+class FakeResponse:
+    def __init__(self, url, text="", status_code=200, content_type="text/html"):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+        self.headers = {"Content-Type": content_type}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"{self.status_code} Error")
+
+
+class FakeSession:
+    def __init__(self, routes, redirects=None):
+        self.routes = routes
+        self.redirects = redirects or {}
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        self.requested.append(url)
+        final_url = self.redirects.get(url, url)
+        if final_url not in self.routes:
+            return FakeResponse(final_url, status_code=404)
+        return FakeResponse(final_url, self.routes[final_url])
+
+    def close(self):
+        pass
+
+
+def page(body, *links):
+    anchors = "".join(f'<a href="{link}">link</a>' for link in links)
+    return f"<html><body>{body}{anchors}</body></html>"
+
+
+@pytest.fixture
+def use_session(monkeypatch):
+    def install(session):
+        monkeypatch.setattr(siteCrawler, "create_session", lambda pool_size: session)
+        return session
+    return install
+
+
+def test_robots_disallowed_pages_are_not_fetched(use_session):
+    session = use_session(FakeSession({
+        ROOT + "robots.txt": "User-agent: *\nDisallow: /private/\n",
+        ROOT: page("<h1>Home</h1>", "/about", "/private/admin"),
+        ROOT + "about": page("<p>About us</p>"),
+        ROOT + "private/admin": page("<p>Secret</p>"),
+    }))
+
+    result = crawl_site(ROOT, max_pages=10)
+
+    assert [p["url"] for p in result["pages"]] == [ROOT, ROOT + "about"]
+    assert result["blocked"] == [ROOT + "private/admin"]
+    assert ROOT + "private/admin" not in session.requested
+
+
+def test_identical_content_is_deduplicated(use_session):
+    use_session(FakeSession({
+        ROOT: page("<h1>Home</h1>", "/a", "/b"),
+        ROOT + "a": page("<p>Same text</p>"),
+        ROOT + "b": page("<p>Same text</p>"),
+    }))
+
+    result = crawl_site(ROOT, max_pages=10)
+
+    assert [p["url"] for p in result["pages"]] == [ROOT, ROOT + "a"]
+    assert result["duplicates"] == [{"url": ROOT + "b", "duplicate_of": ROOT + "a"}]
+
+
+def test_page_cap_is_respected(use_session):
+    links = [f"/p{i}" for i in range(10)]
+    routes = {ROOT: page("<h1>Home</h1>", *links)}
+    routes.update({ROOT + link[1:]: page(f"<p>Page {link}</p>") for link in links})
+    session = use_session(FakeSession(routes))
+
+    result = crawl_site(ROOT, max_pages=4)
+
+    assert len(result["pages"]) == 4
+    # robots.txt plus exactly one fetch per returned page
+    assert len(session.requested) == 5
+
+
+def test_failed_fetches_leave_queued_links_for_later_rounds(use_session):
+    use_session(FakeSession({
+        ROOT: page("<h1>Home</h1>", "/broken", "/dup", "/a", "/b", "/c"),
+        ROOT + "dup": page("<h1>Home</h1>", "/broken", "/dup", "/a", "/b", "/c"),
+        ROOT + "a": page("<p>A</p>"),
+        ROOT + "b": page("<p>B</p>"),
+        ROOT + "c": page("<p>C</p>"),
+    }))
+
+    result = crawl_site(ROOT, max_pages=3)
+
+    assert [p["url"] for p in result["pages"]] == [ROOT, ROOT + "a", ROOT + "b"]
+    assert result["errors"][0]["url"] == ROOT + "broken"
+
+
+def test_fetch_budget_stops_crawls_of_broken_sites(use_session):
+    links = [f"/missing{i}" for i in range(20)]
+    session = use_session(FakeSession({ROOT: page("<h1>Home</h1>", *links)}))
+
+    result = crawl_site(ROOT, max_pages=5, max_fetches=8)
+
+    assert [p["url"] for p in result["pages"]] == [ROOT]
+    assert result["fetches"] == 8
+    assert len(result["errors"]) == 7
+    # robots.txt plus the budgeted page fetches
+    assert len(session.requested) == 9
+
+
+def test_default_fetch_budget_scales_with_page_cap(use_session):
+    links = [f"/missing{i}" for i in range(20)]
+    use_session(FakeSession({ROOT: page("<h1>Home</h1>", *links)}))
+
+    assert crawl_site(ROOT, max_pages=2)["fetches"] == 2 * siteCrawler.FETCHES_PER_PAGE
+
+
+def test_duplicate_pages_do_not_expand_links(use_session):
+    session = use_session(FakeSession({
+        ROOT: page("<h1>Home</h1>", "/mirror"),
+        ROOT + "mirror": page("<h1>Home</h1>", "/mirror-only"),
+        ROOT + "mirror-only": page("<p>Only linked from the mirror</p>"),
+    }))
+
+    result = crawl_site(ROOT, max_pages=10)
+
+    assert result["duplicates"] == [{"url": ROOT + "mirror", "duplicate_of": ROOT}]
+    assert ROOT + "mirror-only" not in session.requested
+
+
+def test_offsite_redirects_are_rejected(use_session):
+    use_session(FakeSession(
+        {
+            ROOT: page("<h1>Home</h1>", "/out"),
+            "http://other.com/landing": page("<p>Elsewhere</p>"),
+        },
+        redirects={ROOT + "out": "http://other.com/landing"},
+    ))
+
+    result = crawl_site(ROOT, max_pages=10)
+
+    assert [p["url"] for p in result["pages"]] == [ROOT]
+    assert "other.com" in result["errors"][0]["error"]
+
+
+def test_pages_carry_features_from_the_crawl_parse(use_session):
+    use_session(FakeSession({
+        ROOT: page("<h1>Home</h1><p>Read a review</p><ul><li>x</li></ul><button>Go</button>"),
+    }))
+
+    result = crawl_site(ROOT, max_pages=1)
+
+    assert result["pages"][0]["features"] == [1, 3, 1, 1, 1]
+    # The raw HTML is dropped once parsed
+    assert set(result["pages"][0]) == {"url", "text", "features"}
+
+
+def test_representative_selection_keeps_root_and_spans_scores():
+    pages = [{"url": str(i)} for i in range(6)]
+    scores = [50, 90, 10, 70, 30, 60]
+
+    selected = select_representative_pages(pages, scores, 3)
+
+    assert selected[0] == 0
+    assert set(selected) == {0, 2, 1}
+
+
+def test_representative_selection_small_site_and_zero_limit():
+    pages = [{"url": "a"}, {"url": "b"}]
+
+    assert select_representative_pages(pages, [1, 2], 5) == [0, 1]
+    assert select_representative_pages(pages, [1, 2], 0) == []
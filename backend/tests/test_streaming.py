@@ -0,0 +1,92 @@
+import json
+
+HTML = "<html><body><h1>Title</h1><p>Read a review</p><script>var x = 1;</script><button>Go</button></body></html>"
+
+
+def read_events(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+
+
+def test_stream_emits_stages_in_order(client):
+    response = client.post('/components?stream=1', json={"html": HTML})
+
+    assert response.mimetype == 'application/x-ndjson'
+    events = read_events(response)
+    stages = [event["stage"] for event in events]
+    assert stages[:2] == ["score", "category"]
+    assert stages[2:6] == ["component"] * 4
+    assert stages[6:] == ["suggestions", "done"]
+
+    assert events[0]["features"] == [1, 3, 1, 0, 1]
+    assert events[0]["website_score"] == 60.0
+    assert events[1]["category"] == "SaaS"
+    assert {event["component"] for event in events[2:6]} == {
+        "cta", "visual_hierarchy", "copy_effectiveness", "trust_signals"
+    }
+    assert set(events[6]["suggestions"]) == {"cta", "visual_hierarchy", "copy_effectiveness", "trust_signals"}
+
+
+def test_stream_uses_the_same_llm_calls_as_the_blocking_path(client, analyzer):
+    events = read_events(client.post("/components", json={"html": HTML, "stream": True}))
+    streamed_prompts = list(analyzer.genai.GenerativeModel.prompts)
+
+    analyzer.genai.GenerativeModel.prompts.clear()
+    body = client.post("/components", json={"html": HTML, "reuse_similar": False}).get_json()
+
+    assert streamed_prompts == analyzer.genai.GenerativeModel.prompts
+    component_prompts = [p for p in streamed_prompts if 'extract the following components' in p]
+    assert len(component_prompts) == 1
+    assert "var x" not in component_prompts[0]
+
+    result = events[-1]["result"]
+    assert result["analysis"] == body["analysis"]
+    assert result["website_score"] == body["website_score"]
+    assert "observation_score" in result
+
+
+def test_stream_reuses_cached_sections_and_records_history(client, analyzer):
+    payload = {"html": HTML, "page_url": "https://example.com/", "stream": True}
+    first = read_events(client.post("/components", json=payload))
+    calls = len(analyzer.genai.GenerativeModel.prompts)
+
+    second = read_events(client.post("/components", json=payload))
+
+    assert len(analyzer.genai.GenerativeModel.prompts) == calls
+    assert [event["stage"] for event in second] == [event["stage"] for event in first]
+    assert second[-1]["result"]["incremental"]["reanalyzed"] == []
+    listing = client.get('/history?kind=components').get_json()
+    assert [item["id"] for item in listing["items"]] == [second[-1]["result"]["history_id"], first[-1]["result"]["history_id"]]
+
+
+def test_stream_honors_the_request_deadline(client, analyzer):
+    events = read_events(client.post('/components?stream=1', json={"html": HTML}, headers={"X-Request-Budget-Ms": "1500"}))
+
+    assert [event["stage"] for event in events] == ["score", "category", "suggestions", "done"]
+    assert events[-1]["result"]["skipped_stages"] == ["components", "suggestions"]
+
+
+def test_stream_accept_header_selects_ndjson(client):
+    response = client.post('/components', json={"html": HTML}, headers={"Accept": "application/x-ndjson"})
+
+    assert read_events(response)[-1]["stage"] == "done"
+
+
+def test_stream_reports_errors_as_an_event(client, analyzer, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("scorer down")
+
+    monkeypatch.setattr(analyzer, "apply_observation_score", broken)
+
+    events = read_events(client.post('/components?stream=1', json={"html": HTML}))
+
+    assert [event["stage"] for event in events] == ["score", "category"] + ["component"] * 4 + ["suggestions", "error"]
+    assert "scorer down" in events[-1]["error"]
+
+
+def test_non_streaming_response_is_unchanged(client):
+    response = client.post('/components', json={"html": HTML})
+
+    body = response.get_json()
+    assert body["category"] == "SaaS"
+    assert set(body["analysis"]) == {"cta", "visual_hierarchy", "copy_effectiveness", "trust_signals"}
+    assert body["website_score"] == 60.0
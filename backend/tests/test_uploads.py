@@ -0,0 +1,123 @@
+import io
+
+import pytest
+
+from components.uploadHandling import UploadTooLarge, read_upload, spool_stream
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 2048
+HTML = b"<html><body><h1>Uploaded</h1><p>Customer review</p></body></html>"
+
+
+class UnseekableStream:
+    def __init__(self, data):
+        self._buffer = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._buffer.read(size)
+
+
+def sent_image_parts(analyzer):
+    return [part for contents in analyzer.genai.GenerativeModel.contents
+            if isinstance(contents, list) for part in contents[1:]]
+
+
+def test_spool_stream_enforces_limit_and_declared_length():
+    assert spool_stream(UnseekableStream(b"abc"), limit=3).read() == b"abc"
+
+    with pytest.raises(UploadTooLarge):
+        spool_stream(UnseekableStream(b"abcd"), limit=3)
+    with pytest.raises(UploadTooLarge):
+        spool_stream(UnseekableStream(b""), limit=3, declared_length=10)
+
+
+def test_read_upload_handles_seekable_and_unseekable_streams():
+    assert read_upload(io.BytesIO(b"payload"), limit=10) == b"payload"
+    assert read_upload(UnseekableStream(b"payload"), limit=10) == b"payload"
+
+    with pytest.raises(UploadTooLarge):
+        read_upload(io.BytesIO(b"payload"), limit=3)
+
+
+def test_multipart_image_is_sent_as_raw_bytes(client, analyzer):
+    response = client.post('/components', data={"image": (io.BytesIO(PNG_BYTES), "shot.png", "image/png")},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert response.get_json()["category"] == "SaaS"
+    parts = sent_image_parts(analyzer)
+    assert parts and all(part["inline_data"] == {"mime_type": "image/png", "data": PNG_BYTES} for part in parts)
+
+
+def test_raw_image_body(client, analyzer):
+    response = client.post('/components', data=PNG_BYTES, content_type='image/webp')
+
+    assert response.status_code == 200
+    assert sent_image_parts(analyzer)[0]["inline_data"]["mime_type"] == "image/webp"
+
+
+def test_raw_html_body_with_query_flags(client):
+    response = client.post('/components?stream=1', data=HTML, content_type='text/html')
+
+    lines = response.get_data(as_text=True).splitlines()
+    assert '"features": [0, 3, 1, 0, 1]' in lines[0]
+
+
+def test_multipart_html_with_form_fields(client):
+    response = client.post('/components', data={
+        "html": (io.BytesIO(HTML), "page.html", "text/html"),
+        "page_url": "https://example.com/",
+        "incremental": "false",
+    }, content_type='multipart/form-data')
+
+    body = response.get_json()
+    assert body["website_score"] == 60.0
+    assert "incremental" not in body
+
+
+def test_oversized_upload_is_rejected(client, analyzer, monkeypatch):
+    monkeypatch.setattr(analyzer, "MAX_UPLOAD_BYTES", 100)
+
+    multipart = client.post('/components', data={"image": (io.BytesIO(PNG_BYTES), "shot.png", "image/png")},
+                            content_type='multipart/form-data')
+    raw = client.post('/components', data=PNG_BYTES, content_type='image/png')
+
+    assert multipart.status_code == 413
+    assert raw.status_code == 413
+    assert analyzer.genai.GenerativeModel.contents == []
+
+
+class CountingStream(UnseekableStream):
+    def __init__(self, data):
+        super().__init__(data)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.consumed += len(chunk)
+        return chunk
+
+
+def test_unseekable_upload_stops_reading_at_the_limit():
+    stream = CountingStream(b"x" * 1_000_000)
+
+    with pytest.raises(UploadTooLarge):
+        read_upload(stream, limit=1000)
+
+    assert stream.consumed == 1001
+
+
+def test_request_over_max_content_length_is_refused_before_parsing(client, analyzer, monkeypatch):
+    monkeypatch.setitem(analyzer.app.config, "MAX_CONTENT_LENGTH", 1000)
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("the upload should not be read")
+
+    monkeypatch.setattr(analyzer, "read_upload", unexpected)
+
+    multipart = client.post('/components', data={"image": (io.BytesIO(PNG_BYTES), "shot.png", "image/png")},
+                            content_type='multipart/form-data')
+    raw = client.post('/components', data=PNG_BYTES, content_type='image/png')
+    as_json = client.post('/components', json={"html": "x" * 2000})
+
+    assert [response.status_code for response in (multipart, raw, as_json)] == [413, 413, 413]
+    assert analyzer.genai.GenerativeModel.contents == []
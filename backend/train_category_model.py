@@ -0,0 +1,42 @@
+"""
+Train the local website-category classifier from the labels the service
+has collected.
+
+Every category the LLM assigns is recorded with the page text it saw.
+This fits a hashed n-gram logistic regression on those labels and saves
+it where the running service picks it up without a restart. Pages the
+model is not confident about still go to the LLM.
+
+Usage:
+    python train_category_model.py --min-examples 20
+"""
+
+import argparse
+import json
+import sys
+
+from components.categoryClassifier import (
+    CATEGORY_CONFIDENCE_THRESHOLD, CATEGORY_LABELS_DB_PATH, CATEGORY_MODEL_PATH, LabelStore, train_classifier
+)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the local website-category classifier")
+    parser.add_argument("--labels-db", default=CATEGORY_LABELS_DB_PATH, help="SQLite file of collected labels")
+    parser.add_argument("--output", default=CATEGORY_MODEL_PATH, help="Where to save the classifier")
+    parser.add_argument("--min-examples", type=int, default=5, help="Pages needed before a category is learned")
+    parser.add_argument("--threshold", type=float, default=CATEGORY_CONFIDENCE_THRESHOLD,
+                        help="Confidence used to report coverage; the service reads CATEGORY_CONFIDENCE_THRESHOLD")
+    args = parser.parse_args(argv)
+
+    texts, labels = LabelStore(args.labels_db).labelled()
+    try:
+        report = train_classifier(texts, labels, args.output, args.min_examples, args.threshold)
+    except ValueError as e:
+        print(f"Error training category classifier: {str(e)} ({len(labels)} labels collected)")
+        return 1
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Train and select the landing page scoring model offline.
+
+Builds a dataset from vectorized synthetic rows plus any collected
+feedback, fits a grid of forest sizes in parallel, and keeps the smallest
+model that meets the accuracy target and the per-row latency budget. If no
+candidate meets both, nothing is saved and the current model stays in
+place. A JSON report of every candidate is written either way.
+
+Usage:
+    python train_model.py --samples 20000 --feedback feedback.jsonl --report training_report.json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import joblib
+import numpy as np
+
+from components.modelSelection import LATENCY_BUDGET_MS, TARGET_MAE, build_report, search_models, select_model
+from components.scoringModel import FEATURE_NAMES, MODEL_PATH, generate_synthetic_dataset
+
+def load_feedback(path):
+    """
+    Read labelled rows from a JSONL file
+
+    Each line holds either {"features": [...], "user_score": n}, the shape
+    /train-model receives, or the feature columns by name plus "user_score".
+    """
+    X = []
+    y = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            features = row.get("features") or [row[name] for name in FEATURE_NAMES]
+            X.append([float(value) for value in features[:len(FEATURE_NAMES)]])
+            y.append(float(row["user_score"]))
+    return np.array(X).reshape(len(X), len(FEATURE_NAMES)), np.array(y)
+
+def build_dataset(samples, seed=42, noise=0.0, feedback=None, feedback_weight=1):
+    """Synthetic rows plus feedback rows, the latter repeated feedback_weight times"""
+    X, y = generate_synthetic_dataset(samples, seed=seed, noise=noise)
+    dataset = {"synthetic_rows": int(len(y)), "feedback_rows": 0, "noise": noise, "seed": seed}
+    if feedback:
+        feedback_X, feedback_y = load_feedback(feedback)
+        dataset["feedback_rows"] = int(len(feedback_y))
+        X = np.vstack([X] + [feedback_X] * feedback_weight)
+        y = np.concatenate([y] + [feedback_y] * feedback_weight)
+    return X, y, dataset
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Select the smallest scoring model that meets the accuracy and latency targets")
+    parser.add_argument("--samples", type=int, default=20000, help="Synthetic training rows to generate")
+    parser.add_argument("--noise", type=float, default=2.0, help="Standard deviation of noise added to synthetic scores")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--feedback", help="JSONL file of labelled pages to add to the dataset")
+    parser.add_argument("--feedback-weight", type=int, default=5, help="Times each feedback row is repeated")
+    parser.add_argument("--target-mae", type=float, default=TARGET_MAE, help="Maximum held-out mean absolute error")
+    parser.add_argument("--latency-budget-ms", type=float, default=LATENCY_BUDGET_MS, help="Maximum single-row predict time")
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel fits (default: all cores)")
+    parser.add_argument("--output", default=MODEL_PATH, help="Where to save the selected model")
+    parser.add_argument("--report", default="training_report.json", help="Where to write the JSON report")
+    parser.add_argument("--dry-run", action="store_true", help="Write the report but keep the current model")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    X, y, dataset = build_dataset(args.samples, args.seed, args.noise, args.feedback, args.feedback_weight)
+    results = search_models(X, y, n_jobs=args.jobs, seed=args.seed)
+    selected, targets_met = select_model(results, args.target_mae, args.latency_budget_ms)
+
+    report = build_report(results, selected, targets_met, dataset, args.target_mae, args.latency_budget_ms)
+    report["seconds"] = round(time.time() - start, 1)
+    save = targets_met and not args.dry_run
+    report["model_path"] = args.output if save else None
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if save:
+        joblib.dump(selected["model"], args.output)
+
+    if targets_met:
+        print(f"Selected {selected['params']} ({selected['nodes']} nodes, MAE {selected['mae']:.2f}, "
+              f"{selected['single_row_ms']:.2f} ms/row). Report: {args.report}")
+        return 0
+    print(f"No candidate meets MAE <= {args.target_mae} and {args.latency_budget_ms} ms/row; the most accurate, "
+          f"{selected['params']}, has MAE {selected['mae']:.2f} and {selected['single_row_ms']:.2f} ms/row. "
+          f"The current model was kept. Report: {args.report}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
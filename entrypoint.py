@@ -41,7 +41,7 @@ def start_app():
             sys.exit(1)
             
         print("Starting gunicorn server...")
-        cmd = ["gunicorn", "--chdir", "backend", "app:app", "--bind", f"0.0.0.0:{os.environ.get('PORT', '5050')}", "--log-level", "debug"]
+        cmd = ["gunicorn", "--chdir", "backend", "app:app", "--bind", f"0.0.0.0:{os.environ.get('PORT', '5050')}", "--threads", os.environ.get('GUNICORN_THREADS', '8'), "--log-level", "debug"]
         print("Running command:", " ".join(cmd))
         subprocess.run(cmd)
     except Exception as e:
@@ -1,3 +1,3 @@
 #!/bin/bash
 cd backend
-gunicorn app:app --bind 0.0.0.0:${PORT:-5050} --log-level debug 
\ No newline at end of file
+gunicorn app:app --bind 0.0.0.0:${PORT:-5050} --threads ${GUNICORN_THREADS:-8} --log-level debug 
\ No newline at end of file